@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
+import json
 import os
-from typing import Any
+from typing import Any, Callable
 
 import requests
 import streamlit as st
@@ -60,14 +61,29 @@ def create_ticket(payload: dict[str, Any]) -> dict[str, Any]:
     return response.json()
 
 
-def trigger_draft(ticket_id: int) -> dict[str, Any]:
-    response = requests.post(
-        f"{API_BASE_URL}/api/tickets/{ticket_id}/generate-draft",
-        timeout=60,
-    )
-    if response.status_code >= 400:
-        raise RuntimeError(_extract_api_error(response))
-    return response.json()["draft"]
+def trigger_draft(ticket_id: int, on_event: Callable[[str, dict[str, Any]], None]) -> dict[str, Any]:
+    """Consume the SSE draft stream, forwarding progress events until the draft arrives."""
+    with requests.get(
+        f"{API_BASE_URL}/api/tickets/{ticket_id}/generate-draft/stream",
+        stream=True,
+        timeout=(10, 120),
+    ) as response:
+        if response.status_code >= 400:
+            raise RuntimeError(_extract_api_error(response))
+
+        event_name: str | None = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event_name = line[len("event: ") :]
+            elif line.startswith("data: ") and event_name:
+                data = json.loads(line[len("data: ") :])
+                if event_name == "draft":
+                    return data
+                if event_name == "error":
+                    raise RuntimeError(data.get("detail") or "Draft generation failed")
+                on_event(event_name, data)
+
+    raise RuntimeError("Draft stream ended before a draft was produced")
 
 
 def update_draft(draft_id: int, content: str, status: str) -> dict[str, Any]:
@@ -105,6 +121,19 @@ def search_memory(customer_id: int, query: str, limit: int = 8) -> list[dict[str
     return payload.get("results", [])
 
 
+def render_memory_write(memory_write: dict[str, Any]) -> None:
+    status = memory_write["status"]
+    attempts = f"attempt {memory_write['attempts']}/{memory_write['max_attempts']}"
+    if status == "succeeded":
+        st.success("Memory updated with this resolution")
+    elif status == "failed":
+        st.error(f"Memory update failed ({attempts}): {memory_write.get('last_error') or 'unknown error'}")
+    elif memory_write.get("last_error"):
+        st.warning(f"Memory update retrying ({attempts}): {memory_write['last_error']}")
+    else:
+        st.info(f"Memory update {status}")
+
+
 def render_context(context: dict[str, Any] | None) -> None:
     if not context:
         st.info("No context captured for this draft.")
@@ -275,8 +304,28 @@ else:
         st.write(selected_ticket["description"])
 
     if st.button("Generate Draft", use_container_width=True):
+        progress = st.empty()
+        preview = st.empty()
+        streamed: list[str] = []
+
+        def show_event(event_name: str, data: dict[str, Any]) -> None:
+            if event_name == "token":
+                streamed.append(data.get("text", ""))
+                preview.markdown("".join(streamed))
+            elif event_name == "retrieval":
+                progress.caption(
+                    f"Context ready: {data.get('memory_hit_count', 0)} memories, "
+                    f"{data.get('knowledge_hit_count', 0)} KB chunks"
+                )
+            elif event_name == "tool_start":
+                progress.caption(f"Running tool: {data.get('tool_name')}")
+            elif event_name == "tool_end":
+                progress.caption(f"Tool {data.get('tool_name')} finished ({data.get('status')})")
+
         try:
-            new_draft = trigger_draft(selected_ticket["id"])
+            new_draft = trigger_draft(selected_ticket["id"], on_event=show_event)
+            progress.empty()
+            preview.empty()
             st.session_state[f"draft_{selected_ticket['id']}"] = new_draft
             st.success("Draft generated")
         except Exception as exc:
@@ -304,7 +353,7 @@ else:
                 try:
                     updated = update_draft(draft_data["id"], edited_content, "accepted")
                     st.session_state[f"draft_{selected_ticket['id']}"] = updated
-                    st.success("Draft accepted and memory updated")
+                    st.success("Draft accepted; memory update queued")
                 except Exception as exc:
                     st.error(f"Failed to accept draft: {exc}")
 
@@ -317,6 +366,17 @@ else:
                 except Exception as exc:
                     st.error(f"Failed to discard draft: {exc}")
 
+        memory_write = draft_data.get("memory_write")
+        if memory_write:
+            render_memory_write(memory_write)
+            if memory_write["status"] in {"queued", "running"} and st.button(
+                "Refresh memory status", use_container_width=True
+            ):
+                refreshed = fetch_draft(selected_ticket["id"])
+                if refreshed:
+                    st.session_state[f"draft_{selected_ticket['id']}"] = refreshed
+                st.rerun()
+
         with st.expander("Context used"):
             render_context(draft_data.get("context_used"))
 
@@ -0,0 +1,125 @@
+"""Cold-start cost of importing the API, and a guard against import-time regressions.
+
+Usage (from the repository root):
+
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --repeat 10 --max-import-s 1.5 --json cold_start.json
+
+Each module in ``--modules`` is imported in a fresh interpreter ``--repeat``
+times. The report gives the median and worst import time, the heavy
+packages (LLM, vector and memory stacks) that ended up in ``sys.modules``,
+and the slowest imports from ``python -X importtime``.
+
+The first module is the guarded one; ``main`` by default. The command exits
+with status 1 if its median import time exceeds ``--max-import-s``, or if
+it loads any heavy package. Those packages should only load during the
+startup warmup or on the first draft request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_PACKAGES = ("langchain", "langchain_core", "langchain_groq", "langgraph", "chromadb", "mem0", "numpy")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"import_s": elapsed, "heavy": heavy}}))
+"""
+
+
+def _probe(module: str) -> dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_PACKAGES)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _slowest_imports(module: str, top: int) -> list[dict[str, Any]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append({"module": parts[2].strip(), "cumulative_ms": round(int(parts[1]) / 1000, 1)})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+def measure(module: str, repeat: int, top: int) -> dict[str, Any]:
+    probes = [_probe(module) for _ in range(repeat)]
+    times = sorted(probe["import_s"] for probe in probes)
+    return {
+        "module": module,
+        "repeat": repeat,
+        "median_s": round(statistics.median(times), 3),
+        "max_s": round(times[-1], 3),
+        "heavy_packages": probes[-1]["heavy"],
+        "slowest_imports": _slowest_imports(module, top) if top else [],
+    }
+
+
+def _print(results: list[dict[str, Any]]) -> None:
+    for result in results:
+        heavy = ", ".join(result["heavy_packages"]) or "none"
+        print(f"{result['module']}: median {result['median_s']:.3f}s, max {result['max_s']:.3f}s, heavy: {heavy}")
+        for row in result["slowest_imports"]:
+            print(f"  {row['cumulative_ms']:>9.1f}ms  {row['module']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=["main", "customer_support_agent.services.copilot_service"],
+        help="Modules to import; the first one is guarded.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per module.")
+    parser.add_argument("--max-import-s", type=float, default=None, help="Fail if the guarded import is slower.")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for raw results.")
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeat, args.top) for module in args.modules]
+    _print(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    guarded = results[0]
+    failures = []
+    if guarded["heavy_packages"]:
+        failures.append(f"{guarded['module']} loads {', '.join(guarded['heavy_packages'])} at import time")
+    if args.max_import_s is not None and guarded["median_s"] > args.max_import_s:
+        failures.append(f"{guarded['module']} imports in {guarded['median_s']:.3f}s > {args.max_import_s:.3f}s")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
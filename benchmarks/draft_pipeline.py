@@ -0,0 +1,321 @@
+"""Offline latency, throughput and memory of the draft pipeline.
+
+Usage (from the repository root):
+
+    python -m benchmarks.draft_pipeline
+    python -m benchmarks.draft_pipeline --iterations 50 --llm-latency-ms 300 --save-baseline baseline.json
+    python -m benchmarks.draft_pipeline --compare baseline.json --tolerance 0.25
+
+Groq, the embedding model and Mem0 are replaced by the deterministic fakes
+in ``benchmarks.fakes`` (each with a configurable latency), so the suite runs
+without network access or API keys. Covered: knowledge-base ingest (full
+rebuild and no-op) and search, the SQLite repositories,
+``SupportCopilot.generate_draft`` and the main API routes through
+``TestClient``.
+
+Each benchmark reports p50/p95/p99 and mean latency, throughput, and peak
+traced memory. The memory is measured in a short separate pass under
+``tracemalloc``, so tracing does not inflate the latency samples.
+``--save-baseline`` writes the results as JSON. ``--compare`` reports
+percentiles that regressed by more than ``--tolerance`` against a saved
+baseline and exits with status 1 when any did.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from fastapi.testclient import TestClient
+
+from benchmarks.fakes import offline_copilot
+from customer_support_agent.api.app_factory import create_app
+from customer_support_agent.api.dependencies import get_copilot_or_503
+from customer_support_agent.core.settings import Settings, ensure_directories
+from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+from customer_support_agent.repositories.sqlite import (
+    CustomersRepository,
+    DraftsRepository,
+    TicketsRepository,
+    close_pool,
+    configure_pool,
+    init_db,
+)
+from customer_support_agent.services.copilot_service import SupportCopilot
+
+PERCENTILES = ("p50_ms", "p95_ms", "p99_ms")
+TOPICS = (
+    ("ATM cash not dispensed", "The ATM did not dispense cash but my account was debited."),
+    ("KYC update pending", "I uploaded my documents for the KYC update a week ago."),
+    ("Card blocked abroad", "My debit card was blocked while travelling overseas."),
+    ("Refund not received", "The merchant refund has not reached my account yet."),
+    ("UPI payment failed", "A UPI transfer failed but the amount is still on hold."),
+)
+
+
+def _settings(workspace: Path) -> Settings:
+    return Settings(
+        workspace_dir=workspace,
+        data_dir=Path("data"),
+        db_path=Path("data/bench.db"),
+        chroma_rag_dir=Path("data/chroma_rag"),
+        chroma_mem0_dir=Path("data/chroma_mem0"),
+        knowledge_base_dir=Path("knowledge_base"),
+        groq_api_key="offline-benchmark",
+        google_api_key="",
+        kb_watch_mode="off",
+        startup_warmup_enabled=False,
+    )
+
+
+def _write_knowledge_base(directory: Path, documents: int) -> None:
+    for index in range(documents):
+        subject, description = TOPICS[index % len(TOPICS)]
+        body = "\n\n".join(
+            f"{subject} policy section {section} for document {index}. {description} "
+            f"Resolution steps are tracked under case code KB-{index:04d}-{section}."
+            for section in range(6)
+        )
+        (directory / f"policy_{index:04d}.md").write_text(f"# {subject}\n\n{body}\n", encoding="utf-8")
+
+
+def _percentile(samples: list[float], quantile: float) -> float:
+    return samples[min(len(samples) - 1, max(0, math.ceil(quantile * len(samples)) - 1))]
+
+
+def _bench(fn: Callable[[int], Any], iterations: int, memory_iterations: int = 3) -> dict[str, Any]:
+    """Time ``fn(i)`` for ``iterations`` calls, then trace peak memory over a few more."""
+    samples: list[float] = []
+    started = time.perf_counter()
+    for index in range(iterations):
+        call_started = time.perf_counter()
+        fn(index)
+        samples.append((time.perf_counter() - call_started) * 1000)
+    wall_s = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        for index in range(iterations, iterations + memory_iterations):
+            fn(index)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(samples, 0.50), 4),
+        "p95_ms": round(_percentile(samples, 0.95), 4),
+        "p99_ms": round(_percentile(samples, 0.99), 4),
+        "mean_ms": round(sum(samples) / len(samples), 4),
+        "throughput_per_s": round(iterations / wall_s, 2) if wall_s else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def _ticket_payload(index: int) -> dict[str, Any]:
+    subject, description = TOPICS[index % len(TOPICS)]
+    return {
+        "customer_email": f"customer{index % 10}@example.com",
+        "customer_name": f"Customer {index % 10}",
+        "customer_company": f"Company {index % 3}",
+        "subject": f"{subject} #{index}",
+        "description": description,
+        "priority": "high",
+        "auto_generate": False,
+    }
+
+
+def run(
+    iterations: int,
+    kb_documents: int,
+    llm_latency_ms: float,
+    embed_latency_ms: float,
+    memory_latency_ms: float,
+) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    ingest_iterations = max(1, iterations // 10)
+    with tempfile.TemporaryDirectory() as tmp, offline_copilot(
+        llm_latency_s=llm_latency_ms / 1000,
+        embed_latency_s=embed_latency_ms / 1000,
+        memory_latency_s=memory_latency_ms / 1000,
+    ):
+        settings = _settings(Path(tmp))
+        ensure_directories(settings)
+        _write_knowledge_base(settings.knowledge_base_path, kb_documents)
+        configure_pool(settings)
+        init_db()
+        try:
+            kb = KnowledgeBaseService(settings=settings)
+            kb_dir = settings.knowledge_base_path
+            results["kb.ingest_full"] = _bench(
+                lambda _: kb.ingest_directory(kb_dir, clear_existing=True), ingest_iterations, memory_iterations=1
+            )
+            results["kb.ingest_noop"] = _bench(lambda _: kb.ingest_directory(kb_dir), iterations)
+            results["kb.search"] = _bench(
+                lambda i: kb.search(f"{TOPICS[i % len(TOPICS)][1]} case {i}"), iterations
+            )
+            results["kb.search_many[16]"] = _bench(
+                lambda i: kb.search_many([f"{TOPICS[j % len(TOPICS)][1]} case {i}-{j}" for j in range(16)]),
+                iterations,
+            )
+
+            customers, tickets, drafts = CustomersRepository(), TicketsRepository(), DraftsRepository()
+            customer_ids: list[int] = []
+            ticket_ids: list[int] = []
+
+            def create_customer(i: int) -> None:
+                payload = _ticket_payload(i)
+                customer = customers.create_or_get(
+                    email=payload["customer_email"], name=payload["customer_name"], company=payload["customer_company"]
+                )
+                customer_ids.append(customer["id"])
+
+            def create_ticket(i: int) -> None:
+                payload = _ticket_payload(i)
+                ticket = tickets.create(
+                    customer_id=customer_ids[i % len(customer_ids)],
+                    subject=payload["subject"],
+                    description=payload["description"],
+                    priority=payload["priority"],
+                )
+                ticket_ids.append(ticket["id"])
+
+            results["repo.customers.create_or_get"] = _bench(create_customer, iterations)
+            results["repo.tickets.create"] = _bench(create_ticket, iterations)
+            results["repo.tickets.list"] = _bench(lambda _: tickets.list(limit=50), iterations)
+            results["repo.tickets.get_by_id"] = _bench(
+                lambda i: tickets.get_by_id(ticket_ids[i % len(ticket_ids)]), iterations
+            )
+            results["repo.drafts.create"] = _bench(
+                lambda i: drafts.create(
+                    ticket_id=ticket_ids[i % len(ticket_ids)],
+                    content="Draft reply",
+                    context_used="{}",
+                    status="pending",
+                ),
+                iterations,
+            )
+            results["repo.drafts.get_latest_for_ticket"] = _bench(
+                lambda i: drafts.get_latest_for_ticket(ticket_ids[i % len(ticket_ids)]), iterations
+            )
+
+            copilot = SupportCopilot(settings=settings)
+
+            def generate(i: int) -> None:
+                ticket = tickets.get_by_id(ticket_ids[i % len(ticket_ids)])
+                copilot.generate_draft(ticket=ticket, customer=customers.get_by_id(ticket["customer_id"]))
+
+            results["copilot.generate_draft"] = _bench(generate, iterations)
+
+            app = create_app(settings=settings)
+            app.dependency_overrides[get_copilot_or_503] = lambda: copilot
+            with TestClient(app) as client:
+                results["api.POST /api/tickets"] = _bench(
+                    lambda i: client.post("/api/tickets", json=_ticket_payload(10_000 + i)), iterations
+                )
+                results["api.GET /api/tickets"] = _bench(
+                    lambda _: client.get("/api/tickets", params={"limit": 50}), iterations
+                )
+                results["api.GET /api/tickets/{id}"] = _bench(
+                    lambda i: client.get(f"/api/tickets/{ticket_ids[i % len(ticket_ids)]}"), iterations
+                )
+                results["api.POST /api/tickets/{id}/generate-draft"] = _bench(
+                    lambda i: client.post(f"/api/tickets/{ticket_ids[i % len(ticket_ids)]}/generate-draft"),
+                    iterations,
+                )
+                results["api.GET /api/drafts/{ticket_id}"] = _bench(
+                    lambda i: client.get(f"/api/drafts/{ticket_ids[i % len(ticket_ids)]}"), iterations
+                )
+        finally:
+            close_pool()
+    return results
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Describe every percentile that is more than ``tolerance`` slower than the baseline."""
+    regressions: list[str] = []
+    for name, row in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in PERCENTILES:
+            before, after = previous.get(metric), row[metric]
+            if before and after > before * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {before:.3f}ms -> {after:.3f}ms (+{after / before - 1:.0%})")
+    return regressions
+
+
+def _print(results: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    header = f"{'benchmark':<44}{'p50':>11}{'p95':>11}{'p99':>11}{'ops/s':>10}{'peak':>11}"
+    print(header + (f"{'p50 vs base':>13}" if baseline else ""))
+    for name, row in results.items():
+        line = (
+            f"{name:<44}{row['p50_ms']:>9.3f}ms{row['p95_ms']:>9.3f}ms{row['p99_ms']:>9.3f}ms"
+            f"{row['throughput_per_s'] or 0:>10.1f}{row['peak_kib']:>8.0f}KiB"
+        )
+        previous = (baseline or {}).get(name)
+        if previous and previous.get("p50_ms"):
+            line += f"{row['p50_ms'] / previous['p50_ms'] - 1:>+12.0%}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--kb-documents", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Sleep per fake Groq call.")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Sleep per fake embedding batch.")
+    parser.add_argument("--memory-latency-ms", type=float, default=0.0, help="Sleep per fake Mem0 call.")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write results and run config as JSON.")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    config = {
+        "iterations": args.iterations,
+        "kb_documents": args.kb_documents,
+        "llm_latency_ms": args.llm_latency_ms,
+        "embed_latency_ms": args.embed_latency_ms,
+        "memory_latency_ms": args.memory_latency_ms,
+    }
+    results = run(**config)
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    _print(results, baseline["results"] if baseline else None)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(
+            json.dumps(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "config": config,
+                    "results": results,
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+
+    if baseline:
+        if baseline.get("config") != config:
+            print(f"warning: baseline was recorded with {baseline.get('config')}", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
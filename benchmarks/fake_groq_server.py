@@ -0,0 +1,163 @@
+"""Local stand-in for the Groq chat-completions API, for load tests and replays.
+
+Usage (from the repository root):
+
+    python -m benchmarks.fake_groq_server --port 8765 --latency-ms 250
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=offline uvicorn main:app
+
+Serves ``POST /openai/v1/chat/completions`` in both plain and streaming
+form, so ``ChatGroq`` and Mem0's Groq client work against it unchanged. The
+replies are canned:
+
+- If tools are offered and the conversation has no tool result yet, it calls
+  the first tool. Every required argument is set to the first email address
+  found in the prompt.
+- If JSON mode is requested, as for Mem0 fact extraction, it returns an empty
+  fact list.
+- Otherwise it returns a fixed support reply.
+
+``--latency-ms`` delays each response before the first byte.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import time
+import uuid
+from typing import Any, Iterator
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CANNED_REPLY = (
+    "Hi there, thanks for reaching out. We have checked your account and raised the request with "
+    "the payments team; you will receive an update within 2 working days."
+)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+def _prompt_text(messages: list[dict[str, Any]]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    return "\n".join(parts)
+
+
+def _tool_call(tools: list[dict[str, Any]], prompt: str) -> dict[str, Any]:
+    function = tools[0].get("function", {})
+    email = _EMAIL_RE.search(prompt)
+    required = (function.get("parameters") or {}).get("required") or []
+    arguments = {name: email.group(0) if email else "customer@example.com" for name in required}
+    return {
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {"name": function.get("name", "unknown_tool"), "arguments": json.dumps(arguments)},
+    }
+
+
+def completion_message(body: dict[str, Any]) -> dict[str, Any]:
+    """Canned assistant message for a chat-completions request body."""
+    messages = body.get("messages") or []
+    tools = body.get("tools") or []
+    if tools and not any(message.get("role") == "tool" for message in messages):
+        return {"role": "assistant", "content": None, "tool_calls": [_tool_call(tools, _prompt_text(messages))]}
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return {"role": "assistant", "content": json.dumps({"facts": []})}
+    return {"role": "assistant", "content": CANNED_REPLY}
+
+
+def _usage(body: dict[str, Any], message: dict[str, Any]) -> dict[str, int]:
+    prompt_tokens = len(_prompt_text(body.get("messages") or []).split())
+    completion_tokens = len(str(message.get("content") or "").split()) or 1
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _stream_chunks(body: dict[str, Any], message: dict[str, Any], completion_id: str) -> Iterator[str]:
+    base = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+    }
+
+    def chunk(delta: dict[str, Any], finish_reason: str | None = None, **extra: Any) -> str:
+        payload = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra}
+        return f"data: {json.dumps(payload)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    if message.get("tool_calls"):
+        yield chunk({"tool_calls": [{"index": 0, **call} for call in message["tool_calls"]]})
+        finish_reason = "tool_calls"
+    else:
+        for word in re.findall(r"\S+\s*", message["content"] or ""):
+            yield chunk({"content": word})
+        finish_reason = "stop"
+    yield chunk({}, finish_reason, x_groq={"id": completion_id, "usage": _usage(body, message)})
+    yield "data: [DONE]\n\n"
+
+
+def create_fake_groq_app(latency_ms: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake Groq")
+    stats = {"requests": 0, "streamed": 0, "tool_calls": 0}
+
+    @app.get("/stats")
+    def get_stats() -> dict[str, int]:
+        return stats
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(body: dict[str, Any]) -> Any:
+        await asyncio.sleep(latency_ms / 1000)
+        message = completion_message(body)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:16]}"
+        stats["requests"] += 1
+        stats["tool_calls"] += bool(message.get("tool_calls"))
+        if body.get("stream"):
+            stats["streamed"] += 1
+            return StreamingResponse(
+                _stream_chunks(body, message, completion_id),
+                media_type="text/event-stream",
+            )
+        return JSONResponse(
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": message,
+                        "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+                    }
+                ],
+                "usage": _usage(body, message),
+            }
+        )
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before each response.")
+    args = parser.parse_args()
+    uvicorn.run(create_fake_groq_app(latency_ms=args.latency_ms), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
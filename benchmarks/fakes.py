@@ -0,0 +1,179 @@
+"""Deterministic offline stand-ins for Groq, the embedding model and Mem0.
+
+Each fake sleeps for a configurable latency so the benchmarks can model a
+remote provider while staying reproducible and network-free. Install them
+with ``offline_copilot(...)``, which patches the names ``SupportCopilot`` and
+``KnowledgeBaseService`` resolve at construction time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from contextlib import contextmanager
+from itertools import count
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+from customer_support_agent.services import copilot_service
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_call_ids = count(1)
+
+
+class FakeChatGroq(BaseChatModel):
+    """Chat model that answers after ``latency_s``.
+
+    When tools are bound, the first turn of a conversation calls
+    ``lookup_customer_plan`` for the customer email found in the prompt, so
+    the agent's tool path is exercised; the next turn returns a reply built
+    from a hash of the prompt.
+    """
+
+    latency_s: float = 0.0
+    tools_bound: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> FakeChatGroq:
+        return self.model_copy(update={"tools_bound": True})
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency_s)
+        prompt = next((str(message.content) for message in reversed(messages) if isinstance(message, HumanMessage)), "")
+        if self.tools_bound and not any(isinstance(message, ToolMessage) for message in messages):
+            email = _EMAIL_RE.search(prompt)
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "lookup_customer_plan",
+                        "args": {"customer_email": email.group(0) if email else "unknown@example.com"},
+                        "id": f"call_{next(_call_ids)}",
+                    }
+                ],
+            )
+        else:
+            digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+            message = AIMessage(
+                content=(
+                    f"Hi there, thanks for reaching out. We have reviewed your request (ref {digest}) "
+                    "and the reversal will reach your account within 5 working days."
+                )
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Bag-of-words hash embeddings; one ``latency_s`` sleep per batch call."""
+
+    def __init__(self, dim: int = 64, latency_s: float = 0.0) -> None:
+        self._dim = dim
+        self._latency_s = latency_s
+
+    def __call__(self, input: Documents) -> Embeddings:
+        time.sleep(self._latency_s)
+        vectors = []
+        for text in input:
+            vector = np.zeros(self._dim, dtype=np.float32)
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self._dim] += 1.0
+            vectors.append(vector / (np.linalg.norm(vector) or 1.0))
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "fake-benchmark"
+
+    def get_config(self) -> dict[str, Any]:
+        return {"dim": self._dim, "latency_s": self._latency_s}
+
+    @staticmethod
+    def build_from_config(config: dict[str, Any]) -> FakeEmbeddingFunction:
+        return FakeEmbeddingFunction(**config)
+
+
+class FakeMemoryStore:
+    """In-process replacement for ``CustomerMemoryStore`` with a per-call latency."""
+
+    def __init__(self, latency_s: float = 0.0) -> None:
+        self._latency_s = latency_s
+        self._memories: dict[str, list[dict[str, Any]]] = {}
+
+    def search(self, query: str, user_id: str, limit: int = 5) -> list[dict[str, Any]]:
+        time.sleep(self._latency_s)
+        return self._memories.get(user_id, [])[:limit]
+
+    def list_memories(self, user_id: str, limit: int = 20, offset: int = 0) -> list[dict[str, Any]]:
+        return self._memories.get(user_id, [])[offset : offset + limit]
+
+    def add_resolution(
+        self,
+        user_id: str,
+        ticket_subject: str,
+        ticket_description: str,
+        accepted_draft: str,
+        entity_links: list[str] | None = None,
+    ) -> None:
+        self.add_resolutions(
+            user_id,
+            [{"ticket_subject": ticket_subject, "accepted_draft": accepted_draft, "entity_links": entity_links}],
+        )
+
+    def add_resolutions(
+        self,
+        user_id: str,
+        resolutions: list[dict[str, Any]],
+        fan_out_user_ids: Sequence[str] = (),
+    ) -> None:
+        time.sleep(self._latency_s)
+        for scope_user_id in (user_id, *fan_out_user_ids):
+            for resolution in resolutions:
+                self._memories.setdefault(scope_user_id, []).insert(
+                    0,
+                    {
+                        "memory": f"Resolved '{resolution['ticket_subject']}': {resolution['accepted_draft'][:120]}",
+                        "score": 0.9,
+                        "metadata": {},
+                    },
+                )
+
+
+@contextmanager
+def offline_copilot(
+    llm_latency_s: float = 0.0,
+    embed_latency_s: float = 0.0,
+    memory_latency_s: float = 0.0,
+) -> Iterator[None]:
+    """Patch Groq, the KB embedder and Mem0 with fakes for the duration of the block."""
+    originals = (
+        copilot_service.ChatGroq,
+        copilot_service.CustomerMemoryStore,
+        KnowledgeBaseService._build_embedding_function,
+    )
+    copilot_service.ChatGroq = lambda **_: FakeChatGroq(latency_s=llm_latency_s)
+    copilot_service.CustomerMemoryStore = lambda **_: FakeMemoryStore(latency_s=memory_latency_s)
+    KnowledgeBaseService._build_embedding_function = lambda self: FakeEmbeddingFunction(latency_s=embed_latency_s)
+    try:
+        yield
+    finally:
+        (
+            copilot_service.ChatGroq,
+            copilot_service.CustomerMemoryStore,
+            KnowledgeBaseService._build_embedding_function,
+        ) = originals
@@ -0,0 +1,139 @@
+"""Duplicate text in KB context: plain ranking versus MMR and adjacent-chunk merging.
+
+Usage (from the repository root):
+
+    python -m benchmarks.kb_context
+    python -m benchmarks.kb_context --documents 200 --top-k 4 --json kb_context.json
+    python -m benchmarks.kb_context --kb-dir knowledge_base
+
+The knowledge base is ingested with the production chunk size and overlap,
+either from ``--kb-dir`` or from synthetic policy documents. Embeddings come
+from the offline fake in ``benchmarks.fakes``. Each ticket-style query is
+searched with every combination of ``mmr`` and ``merge_adjacent``, and the
+hits are rendered the way the system prompt renders them. Reported per
+variant:
+
+- ``prompt_tokens``: tokens in the rendered KB section.
+- ``unique_tokens``: words not inside an 8-word run seen earlier in that
+  section, i.e. the section minus repeated splitter overlap.
+- ``unique_ratio``: the share of unique words.
+- ``distinct_sources``: files represented in the hits.
+- ``search_ms``: median search latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.draft_pipeline import TOPICS, _write_knowledge_base
+from benchmarks.fakes import offline_copilot
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+from customer_support_agent.services.context_packer import get_token_counter, knowledge_line
+
+VARIANTS = {
+    "plain": {"mmr": False, "merge_adjacent": False},
+    "mmr": {"mmr": True, "merge_adjacent": False},
+    "merge": {"mmr": False, "merge_adjacent": True},
+    "mmr+merge": {"mmr": True, "merge_adjacent": True},
+}
+SHINGLE = 8
+
+
+def unique_words(text: str) -> tuple[int, int]:
+    """``(unique, total)`` words, where a word is repeated if it ends an already seen 8-word run."""
+    words = text.lower().split()
+    seen: set[tuple[str, ...]] = set()
+    repeated: set[int] = set()
+    for end in range(SHINGLE, len(words) + 1):
+        shingle = tuple(words[end - SHINGLE : end])
+        if shingle in seen:
+            repeated.update(range(end - SHINGLE, end))
+        seen.add(shingle)
+    return len(words) - len(repeated), len(words)
+
+
+def _queries() -> list[str]:
+    return [f"{subject}\n{description}" for subject, description in TOPICS] + [
+        description for _, description in TOPICS
+    ]
+
+
+def measure(kb: KnowledgeBaseService, top_k: int, repeat: int) -> dict[str, Any]:
+    counter = get_token_counter()
+    results: dict[str, Any] = {}
+    for name, options in VARIANTS.items():
+        rows = []
+        for query in _queries():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                hits = kb.search(query, top_k=top_k, **options)
+                timings.append((time.perf_counter() - started) * 1000)
+            section = "\n".join(knowledge_line(hit) for hit in hits)
+            unique, total = unique_words(section)
+            rows.append(
+                {
+                    "prompt_tokens": counter.count(section),
+                    "unique_tokens": unique,
+                    "unique_ratio": unique / total if total else 1.0,
+                    "distinct_sources": len({hit["source"] for hit in hits}),
+                    "search_ms": statistics.median(timings),
+                }
+            )
+        results[name] = {key: round(statistics.mean(row[key] for row in rows), 3) for key in rows[0]}
+    return {"tokenizer": counter.name, "top_k": top_k, "queries": len(_queries()), "variants": results}
+
+
+def _print(report: dict[str, Any]) -> None:
+    print(f"top_k={report['top_k']}  queries={report['queries']}  tokenizer={report['tokenizer']}")
+    print(f"{'variant':<12}{'tokens':>9}{'unique':>9}{'ratio':>8}{'sources':>9}{'search':>10}")
+    for name, row in report["variants"].items():
+        print(
+            f"{name:<12}{row['prompt_tokens']:>9.1f}{row['unique_tokens']:>9.1f}{row['unique_ratio']:>8.3f}"
+            f"{row['distinct_sources']:>9.2f}{row['search_ms']:>8.2f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kb-dir", type=Path, default=None, help="Ingest these .md/.txt files instead.")
+    parser.add_argument("--documents", type=int, default=40, help="Synthetic documents when --kb-dir is unset.")
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--retrieval-mode", choices=["dense", "sparse", "hybrid"], default="hybrid")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for raw results.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, offline_copilot():
+        settings = Settings(
+            workspace_dir=Path(tmp),
+            chroma_rag_dir=Path("chroma_rag"),
+            knowledge_base_dir=Path("knowledge_base"),
+            embedding_cache_enabled=False,
+            retrieval_mode=args.retrieval_mode,
+        )
+        settings.chroma_rag_path.mkdir(parents=True)
+        if args.kb_dir is not None:
+            shutil.copytree(args.kb_dir, settings.knowledge_base_path)
+        else:
+            settings.knowledge_base_path.mkdir(parents=True)
+            _write_knowledge_base(settings.knowledge_base_path, args.documents)
+        kb = KnowledgeBaseService(settings=settings)
+        kb.ingest_directory(settings.knowledge_base_path)
+        report = measure(kb, top_k=args.top_k, repeat=args.repeat)
+
+    _print(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
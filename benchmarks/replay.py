@@ -0,0 +1,222 @@
+"""Replay captured API traffic against a running instance at N times its recorded rate.
+
+Usage (from the repository root):
+
+    # 1. Record real traffic (TRAFFIC_CAPTURE_ENABLED=true) into data/traffic_capture.ndjson.
+    # 2. Serve a target that talks to the local Groq stand-in:
+    python -m benchmarks.fake_groq_server --port 8765 --latency-ms 250 &
+    GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=offline uvicorn main:app --port 8000 &
+    # 3. Replay:
+    python -m benchmarks.replay data/traffic_capture.ndjson --target http://127.0.0.1:8000 \\
+        --speed 10 --concurrency 1 4 16 64 --json replay.json
+
+Requests are sent on the captured schedule compressed by ``--speed``. For
+each ``--concurrency`` level, at most that many requests are in flight. The
+result is a latency-versus-concurrency curve: p50/p95/p99 per level, plus
+achieved throughput and error counts by route and cause.
+
+Ids in the capture belong to the recording database. Each response that
+creates a ticket, customer or draft on the target maps the captured id to the
+target's new id. Later paths are rewritten through that map, and ids that
+were never mapped are sent unchanged.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+_ID_SEGMENT_RE = re.compile(r"/(\d+)(?=/|$)")
+
+
+def load_capture(path: Path, limit: int | None = None) -> list[dict[str, Any]]:
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    records.sort(key=lambda record: record["ts"])
+    return records[:limit] if limit else records
+
+
+def route_template(path: str) -> str:
+    return _ID_SEGMENT_RE.sub("/{id}", path)
+
+
+def _path_id_kind(method: str, path: str) -> str | None:
+    if path.startswith("/api/tickets/"):
+        return "ticket"
+    if path.startswith("/api/customers/"):
+        return "customer"
+    if path.startswith("/api/drafts/"):
+        # GET /api/drafts/{ticket_id}; PATCH /api/drafts/{draft_id}
+        return "draft" if method == "PATCH" else "ticket"
+    return None
+
+
+def _response_id_kinds(method: str, path: str) -> dict[str, str]:
+    kinds = {"ticket_id": "ticket", "customer_id": "customer", "draft_id": "draft"}
+    if path.startswith("/api/drafts/"):
+        kinds["id"] = "draft"
+    elif path.startswith("/api/tickets") and not path.endswith("/generate-draft"):
+        kinds["id"] = "ticket"
+    return kinds
+
+
+class IdMap:
+    def __init__(self) -> None:
+        self._ids: dict[str, dict[int, int]] = {"ticket": {}, "customer": {}, "draft": {}}
+
+    def rewrite(self, method: str, path: str) -> str:
+        kind = _path_id_kind(method, path)
+        if kind is None:
+            return path
+        mapping = self._ids[kind]
+        match = _ID_SEGMENT_RE.search(path)
+        if match is None:
+            return path
+        captured = int(match.group(1))
+        return f"{path[: match.start(1)]}{mapping.get(captured, captured)}{path[match.end(1):]}"
+
+    def learn(self, method: str, path: str, captured: dict[str, int], response: httpx.Response) -> None:
+        if not captured or not response.headers.get("content-type", "").startswith("application/json"):
+            return
+        try:
+            payload = response.json()
+        except ValueError:
+            return
+        if not isinstance(payload, dict):
+            return
+        replayed = {key: payload.get(key) for key in ("id", "ticket_id", "customer_id")}
+        if isinstance(payload.get("draft"), dict):
+            replayed["draft_id"] = payload["draft"].get("id")
+        for key, kind in _response_id_kinds(method, path).items():
+            if isinstance(captured.get(key), int) and isinstance(replayed.get(key), int):
+                self._ids[kind][captured[key]] = replayed[key]
+
+
+def _percentile(samples: list[float], quantile: float) -> float | None:
+    if not samples:
+        return None
+    return round(samples[min(len(samples) - 1, max(0, math.ceil(quantile * len(samples)) - 1))], 3)
+
+
+async def replay_level(
+    records: list[dict[str, Any]],
+    target: str,
+    speed: float,
+    concurrency: int,
+    timeout_s: float,
+) -> dict[str, Any]:
+    gate = asyncio.Semaphore(concurrency)
+    ids = IdMap()
+    latencies: list[float] = []
+    errors: Counter[str] = Counter()
+    first_ts = records[0]["ts"] if records else 0.0
+    loop = asyncio.get_running_loop()
+
+    async with httpx.AsyncClient(
+        base_url=target,
+        timeout=timeout_s,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+        started = loop.time()
+
+        async def send(record: dict[str, Any]) -> None:
+            await asyncio.sleep(max(0.0, started + (record["ts"] - first_ts) / speed - loop.time()))
+            method, path = record["method"], record["path"]
+            route = f"{method} {route_template(path)}"
+            async with gate:
+                request_started = time.perf_counter()
+                try:
+                    response = await client.request(
+                        method,
+                        ids.rewrite(method, path),
+                        params=record.get("query") or None,
+                        json=record.get("body"),
+                    )
+                except httpx.TimeoutException:
+                    errors[f"{route} timeout"] += 1
+                    return
+                except httpx.HTTPError as exc:
+                    errors[f"{route} {type(exc).__name__}"] += 1
+                    return
+                latencies.append((time.perf_counter() - request_started) * 1000)
+            if response.status_code >= 400:
+                errors[f"{route} http_{response.status_code}"] += 1
+            else:
+                ids.learn(method, path, (record.get("response") or {}).get("ids") or {}, response)
+
+        await asyncio.gather(*(send(record) for record in records))
+        wall_s = loop.time() - started
+
+    latencies.sort()
+    error_count = sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "requests": len(records),
+        "completed": len(latencies),
+        "errors": error_count,
+        "error_rate": round(error_count / len(records), 4) if records else 0.0,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "throughput_per_s": round(len(latencies) / wall_s, 2) if wall_s else None,
+        "error_breakdown": dict(errors.most_common()),
+    }
+
+
+def run(
+    records: list[dict[str, Any]],
+    target: str,
+    speed: float,
+    concurrency_levels: list[int],
+    timeout_s: float,
+) -> list[dict[str, Any]]:
+    return [
+        asyncio.run(replay_level(records, target, speed, concurrency, timeout_s))
+        for concurrency in concurrency_levels
+    ]
+
+
+def _print(curve: list[dict[str, Any]]) -> None:
+    def ms(value: float | None) -> str:
+        return f"{value:>9.1f}ms" if value is not None else f"{'-':>11}"
+
+    print(f"{'conc':>6}{'sent':>8}{'ok':>8}{'p50':>11}{'p95':>11}{'p99':>11}{'req/s':>9}{'errors':>8}")
+    for level in curve:
+        print(
+            f"{level['concurrency']:>6}{level['requests']:>8}{level['completed']:>8}"
+            f"{ms(level['p50_ms'])}{ms(level['p95_ms'])}{ms(level['p99_ms'])}"
+            f"{level['throughput_per_s'] or 0:>9.1f}{level['errors']:>8}"
+        )
+    for level in curve:
+        for cause, count in level["error_breakdown"].items():
+            print(f"  c={level['concurrency']:<4} {count:>5}  {cause}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", type=Path, help="NDJSON written by the traffic capture middleware.")
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay rate as a multiple of the recorded rate.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N captured requests.")
+    parser.add_argument("--timeout-s", type=float, default=60.0)
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for the raw curve.")
+    args = parser.parse_args()
+
+    records = load_capture(args.capture, limit=args.limit)
+    curve = run(records, args.target, args.speed, args.concurrency, args.timeout_s)
+    _print(curve)
+    if args.json:
+        args.json.write_text(json.dumps(curve, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Query latency for the repository hot paths before and after the index migrations.
+
+Usage (from the repository root):
+
+    python -m benchmarks.sqlite_indexes
+    python -m benchmarks.sqlite_indexes --sizes 10000 100000 --repeat 50 --json out.json
+
+For each ticket count a fresh database is built at schema version 1 (the
+original tables and trigger, no secondary indexes), the repository queries are
+timed, the remaining migrations are applied and the same queries are timed again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.repositories.sqlite import (
+    DraftsRepository,
+    TicketsRepository,
+    close_pool,
+    configure_pool,
+    get_pool,
+)
+from customer_support_agent.repositories.sqlite.migrations import MIGRATIONS, run_migrations
+
+STATUSES = ("open", "open", "pending", "resolved", "resolved", "resolved")
+PRIORITIES = ("low", "medium", "medium", "high", "urgent")
+
+
+def _settings(workspace: Path) -> Settings:
+    return Settings(
+        workspace_dir=workspace,
+        data_dir=Path("data"),
+        db_path=Path("data/bench.db"),
+        chroma_rag_dir=Path("data/chroma_rag"),
+        chroma_mem0_dir=Path("data/chroma_mem0"),
+        knowledge_base_dir=Path("knowledge_base"),
+    )
+
+
+def _seed(ticket_count: int, rng: random.Random) -> int:
+    customer_count = max(10, ticket_count // 20)
+    batch = 50_000
+    with get_pool().connection() as conn:
+        conn.executemany(
+            "INSERT INTO customers (email, name, company) VALUES (?, ?, ?)",
+            (
+                (f"customer{i}@example.com", f"Customer {i}", f"Company {i % 500}")
+                for i in range(customer_count)
+            ),
+        )
+        for start in range(0, ticket_count, batch):
+            rows = []
+            for i in range(start, min(start + batch, ticket_count)):
+                created = f"2025-{1 + i * 12 // ticket_count:02d}-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00"
+                rows.append(
+                    (
+                        rng.randint(1, customer_count),
+                        f"Ticket {i}",
+                        "ATM withdrawal failed but the account was debited. " * 3,
+                        rng.choice(STATUSES),
+                        rng.choice(PRIORITIES),
+                        created,
+                        created,
+                    )
+                )
+            conn.executemany(
+                """
+                INSERT INTO tickets (customer_id, subject, description, status, priority, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.executemany(
+                "INSERT INTO drafts (ticket_id, content, status, created_at) VALUES (?, ?, 'pending', ?)",
+                ((start + offset + 1, "Draft reply", row[5]) for offset, row in enumerate(rows)),
+            )
+    return customer_count
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    samples: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+    }
+
+
+def _measure(ticket_count: int, customer_count: int, repeat: int, rng: random.Random) -> dict[str, Any]:
+    tickets = TicketsRepository()
+    drafts = DraftsRepository()
+    return {
+        "tickets.list": _time(lambda: tickets.list(limit=100), repeat),
+        "tickets.count_open_for_customer": _time(
+            lambda: tickets.count_open_for_customer(
+                f"customer{rng.randrange(customer_count)}@example.com"
+            ),
+            repeat,
+        ),
+        "drafts.get_latest_for_ticket": _time(
+            lambda: drafts.get_latest_for_ticket(rng.randint(1, ticket_count)),
+            repeat,
+        ),
+        "tickets.set_status": _time(
+            lambda: tickets.set_status(rng.randint(1, ticket_count), "pending"),
+            repeat,
+        ),
+    }
+
+
+def run(sizes: list[int], repeat: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    baseline_version = MIGRATIONS[0].version
+    for size in sizes:
+        rng = random.Random(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            configure_pool(_settings(Path(tmp)))
+            try:
+                with get_pool().connection() as conn:
+                    run_migrations(conn, target_version=baseline_version)
+                customer_count = _seed(size, rng)
+                before = _measure(size, customer_count, repeat, rng)
+                with get_pool().connection() as conn:
+                    run_migrations(conn)
+                    conn.execute("ANALYZE")
+                after = _measure(size, customer_count, repeat, rng)
+            finally:
+                close_pool()
+        results[str(size)] = {"before": before, "after": after}
+    return results
+
+
+def _print(results: dict[str, Any]) -> None:
+    print(f"{'tickets':>9}  {'query':<34}{'before p50':>12}{'after p50':>12}{'speedup':>10}")
+    for size, data in results.items():
+        for query, before in data["before"].items():
+            after = data["after"][query]
+            speedup = before["p50_ms"] / after["p50_ms"] if after["p50_ms"] else float("inf")
+            print(
+                f"{int(size):>9}  {query:<34}{before['p50_ms']:>10.3f}ms"
+                f"{after['p50_ms']:>10.3f}ms{speedup:>9.1f}x"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for raw results.")
+    args = parser.parse_args()
+
+    results = run(sizes=args.sizes, repeat=args.repeat)
+    _print(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
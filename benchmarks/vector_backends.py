@@ -0,0 +1,120 @@
+"""Knowledge-base search latency: Chroma vs the embedded NumPy backend.
+
+Usage (from the repository root):
+
+    python -m benchmarks.vector_backends
+    python -m benchmarks.vector_backends --sizes 1000 10000 --dim 768 --repeat 200 --json out.json
+
+For each chunk count both stores are filled with the same random unit
+vectors (so no embedding model is needed) and ``KnowledgeBaseService.search``'s
+store work is timed: ``count()`` followed by a top-k ``query()``. Query
+embedding is excluded because it is identical for both backends.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import chromadb
+import numpy as np
+
+from customer_support_agent.integrations.rag.vector_store import (
+    ChromaVectorStore,
+    NumpyVectorStore,
+    VectorStore,
+)
+
+
+def _vectors(count: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _fill(store: Any, vectors: np.ndarray) -> float:
+    ids = [f"chunk-{index}" for index in range(len(vectors))]
+    documents = [f"Knowledge-base chunk {index}" for index in range(len(vectors))]
+    metadatas = [{"source": f"doc{index % 50}.md", "chunk_index": index} for index in range(len(vectors))]
+    started = time.perf_counter()
+    store.upsert_embeddings(ids, vectors, documents, metadatas)
+    return round(time.perf_counter() - started, 3)
+
+
+def _time_search(store: VectorStore, queries: np.ndarray, top_k: int) -> dict[str, float]:
+    samples: list[float] = []
+    for query in queries:
+        started = time.perf_counter()
+        if store.count():
+            store.query(query, top_k)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+    }
+
+
+def _recall(chroma: VectorStore, numpy_store: VectorStore, queries: np.ndarray, top_k: int) -> float:
+    """Share of Chroma's (approximate) top-k that the exact NumPy search also returns."""
+    overlap = 0
+    for query in queries:
+        expected = {match["id"] for match in chroma.query(query, top_k)}
+        overlap += len(expected & {match["id"] for match in numpy_store.query(query, top_k)})
+    return round(overlap / (len(queries) * top_k), 4)
+
+
+def run(sizes: list[int], dim: int, repeat: int, top_k: int) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for size in sizes:
+        rng = np.random.default_rng(size)
+        vectors = _vectors(size, dim, rng)
+        queries = _vectors(repeat, dim, rng)
+        with tempfile.TemporaryDirectory() as tmp:
+            chroma = ChromaVectorStore(
+                client=chromadb.PersistentClient(path=str(Path(tmp) / "chroma")),
+                name="bench_kb",
+                embedding_function=None,
+            )
+            numpy_store = NumpyVectorStore(Path(tmp) / "numpy", "bench_kb", embed_documents=lambda texts: [])
+            results[str(size)] = {
+                "chroma": {"build_s": _fill(chroma, vectors), **_time_search(chroma, queries, top_k)},
+                "numpy": {"build_s": _fill(numpy_store, vectors), **_time_search(numpy_store, queries, top_k)},
+                "recall_vs_chroma": _recall(chroma, numpy_store, queries[: min(20, repeat)], top_k),
+            }
+    return results
+
+
+def _print(results: dict[str, Any]) -> None:
+    print(f"{'chunks':>8}  {'backend':<8}{'build':>9}{'p50':>11}{'p95':>11}{'speedup':>10}")
+    for size, data in results.items():
+        for backend in ("chroma", "numpy"):
+            row = data[backend]
+            speedup = data["chroma"]["p50_ms"] / row["p50_ms"] if row["p50_ms"] else float("inf")
+            print(
+                f"{int(size):>8}  {backend:<8}{row['build_s']:>8.2f}s"
+                f"{row['p50_ms']:>9.3f}ms{row['p95_ms']:>9.3f}ms{speedup:>9.1f}x"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=768, help="Embedding width (gemini-embedding-001 truncated: 768).")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for raw results.")
+    args = parser.parse_args()
+
+    results = run(sizes=args.sizes, dim=args.dim, repeat=args.repeat, top_k=args.top_k)
+    _print(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,101 @@
 from __future__ import annotations
 
+import importlib
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from customer_support_agent.api.dependencies import get_copilot, get_job_queue, get_knowledge_base
 from customer_support_agent.api.routers import (
+    customers_router,
     drafts_router,
     health_router,
+    jobs_router,
     knowledge_router,
     memory_router,
+    metrics_router,
     tickets_router,
 )
+from customer_support_agent.api.traffic_capture import (
+    PIIHasher,
+    TrafficCaptureMiddleware,
+    TrafficCaptureWriter,
+)
 from customer_support_agent.core.settings import Settings, ensure_directories, get_settings
-from customer_support_agent.repositories.sqlite import init_db
+from customer_support_agent.repositories.sqlite import close_pool, configure_pool, init_db
+from customer_support_agent.services.context_packer import get_token_counter
+from customer_support_agent.services.knowledge_service import KnowledgeService
+from customer_support_agent.services.warmup import StartupWarmup
+
+logger = logging.getLogger(__name__)
 
 
+def build_startup_warmup(settings: Settings) -> StartupWarmup:
+    # Without a Groq key the copilot cannot be built; ticket CRUD and KB search still
+    # work, so that step is reported as disabled instead of failing readiness.
+    llm_configured = bool(settings.groq_api_key)
+    return StartupWarmup(
+        steps=[
+            ("llm_stack", lambda: importlib.import_module("customer_support_agent.services.copilot_service")),
+            ("copilot", get_copilot if llm_configured else None),
+            (
+                "embedding_model",
+                (lambda: get_copilot().rag.warm_up()) if llm_configured else (lambda: get_knowledge_base().warm_up()),
+            ),
+            ("tokenizer", get_token_counter),
+        ],
+        logger=logger,
+    )
 
 def create_app(settings: Settings | None = None) -> FastAPI:
     resolved_settings = settings or get_settings()
+    capture_writer = None
+    if resolved_settings.traffic_capture_enabled:
+        # Built first so a missing salt fails startup before the capture file is opened.
+        capture_hasher = PIIHasher(resolved_settings.traffic_capture_salt)
+        capture_writer = TrafficCaptureWriter(resolved_settings.traffic_capture_file)
 
     @asynccontextmanager
-    async def lifespan(_: FastAPI):
+    async def lifespan(app: FastAPI):
         ensure_directories(resolved_settings)
+        configure_pool(resolved_settings)
         init_db()
+        job_queue = get_job_queue()
+        job_queue.start()
+        kb_watcher = KnowledgeService(settings=resolved_settings).build_watcher(logger)
+        if kb_watcher is not None:
+            kb_watcher.start()
+        app.state.warmup = build_startup_warmup(resolved_settings) if resolved_settings.startup_warmup_enabled else None
+        if app.state.warmup is not None:
+            app.state.warmup.start()
         yield
+        if kb_watcher is not None:
+            kb_watcher.stop()
+        if job_queue.shutdown():
+            close_pool()
+        else:
+            # Jobs past the drain deadline still hold the pool; closing it would fail their
+            # writes. Their leases lapse and another process retries them.
+            logger.warning("Leaving the SQLite pool open for jobs still running at shutdown.")
+        if capture_writer is not None:
+            capture_writer.close()
 
     app = FastAPI(title=resolved_settings.app_name, lifespan=lifespan)
+    if capture_writer is not None:
+        app.add_middleware(
+            TrafficCaptureMiddleware,
+            writer=capture_writer,
+            hasher=capture_hasher,
+        )
 
     app.include_router(health_router)
     app.include_router(tickets_router)
     app.include_router(drafts_router)
+    app.include_router(jobs_router)
     app.include_router(knowledge_router)
     app.include_router(memory_router)
+    app.include_router(customers_router)
+    app.include_router(metrics_router)
 
     return app
\ No newline at end of file
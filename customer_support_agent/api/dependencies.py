@@ -1,20 +1,38 @@
 from __future__ import annotations
 
+import json
+import logging
 from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
 from fastapi import Depends, HTTPException
 
 from customer_support_agent.core.settings import Settings, get_settings
 from customer_support_agent.repositories.sqlite.customers import CustomersRepository
 from customer_support_agent.repositories.sqlite.drafts import DraftsRepository
+from customer_support_agent.repositories.sqlite.jobs import JobsRepository
 from customer_support_agent.repositories.sqlite.tickets import TicketsRepository
-from customer_support_agent.services.copilot_service import SupportCopilot
-from customer_support_agent.services.draft_service import DraftService
+from customer_support_agent.services.draft_service import (
+    DRAFT_BATCH_JOB_KIND,
+    DRAFT_JOB_KIND,
+    MEMORY_WRITE_JOB_KIND,
+    DraftService,
+)
+from customer_support_agent.services.job_queue import JobQueue
 from customer_support_agent.services.knowledge_service import KnowledgeService
 
+if TYPE_CHECKING:
+    from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+    from customer_support_agent.services.copilot_service import SupportCopilot
+
+logger = logging.getLogger(__name__)
+
 
 @lru_cache
 def get_copilot() -> SupportCopilot:
+    # Deferred: the copilot module pulls in langchain, langgraph, chromadb and mem0.
+    from customer_support_agent.services.copilot_service import SupportCopilot
+
     return SupportCopilot(settings=get_settings())
 
 
@@ -25,6 +43,86 @@ def get_copilot_or_503() -> SupportCopilot:
         raise HTTPException(status_code=503, detail=f"Copilot unavailable: {exc}") from exc
 
 
+@lru_cache
+def get_knowledge_base() -> KnowledgeBaseService:
+    from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+
+    return KnowledgeBaseService(settings=get_settings())
+
+
+def get_knowledge_base_or_503() -> KnowledgeBaseService:
+    try:
+        return get_knowledge_base()
+    except Exception as exc:
+        raise HTTPException(status_code=503, detail=f"Knowledge base unavailable: {exc}") from exc
+
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    jobs_repo = JobsRepository()
+    queue = JobQueue(settings=get_settings(), jobs_repo=jobs_repo, logger=logger)
+    draft_service = DraftService()
+    tickets_repo = TicketsRepository()
+    drafts_repo = DraftsRepository()
+
+    def run_draft_jobs(jobs: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        drafts = draft_service.generate_and_store_for_tickets(
+            ticket_ids=[job["payload"]["ticket_id"] for job in jobs],
+            tickets_repo=tickets_repo,
+            drafts_repo=drafts_repo,
+            copilot_factory=get_copilot,
+            logger=logger,
+            max_parallel=get_settings().draft_batch_concurrency,
+        )
+        return [
+            draft if isinstance(draft, Exception) else {"draft_id": draft["id"] if draft else None}
+            for draft in drafts
+        ]
+
+    def store_failed_draft(job: dict[str, Any], error: str) -> None:
+        draft_service.store_failed_draft(
+            ticket_id=job["payload"]["ticket_id"],
+            drafts_repo=drafts_repo,
+            error_text=error,
+        )
+
+    def run_draft_batch(job: dict[str, Any]) -> dict[str, Any]:
+        settings = get_settings()
+        return draft_service.generate_batch(
+            ticket_ids=job["payload"]["ticket_ids"],
+            tickets_repo=tickets_repo,
+            drafts_repo=drafts_repo,
+            copilot_factory=get_copilot,
+            logger=logger,
+            max_parallel=settings.draft_batch_concurrency,
+            chunk_size=settings.draft_batch_chunk_size,
+            # A retried job resumes after the chunks its earlier attempts stored.
+            progress=json.loads(job["result"]) if job.get("result") else None,
+            on_progress=lambda progress: jobs_repo.update_result(job["id"], progress),
+        )
+
+    def run_memory_writes(jobs: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+        return draft_service.write_accepted_memories(
+            payloads=[job["payload"] for job in jobs],
+            copilot=get_copilot(),
+            logger=logger,
+        )
+
+    queue.register_batch(
+        DRAFT_JOB_KIND,
+        run_draft_jobs,
+        batch_size=get_settings().draft_job_batch_size,
+        on_failure=store_failed_draft,
+    )
+    queue.register(DRAFT_BATCH_JOB_KIND, run_draft_batch)
+    queue.register_batch(
+        MEMORY_WRITE_JOB_KIND,
+        run_memory_writes,
+        batch_size=get_settings().memory_write_batch_size,
+    )
+    return queue
+
+
 def get_settings_dep() -> Settings:
     return get_settings()
 
@@ -41,6 +139,10 @@ def get_drafts_repository() -> DraftsRepository:
     return DraftsRepository()
 
 
+def get_jobs_repository() -> JobsRepository:
+    return JobsRepository()
+
+
 def get_draft_service() -> DraftService:
     return DraftService()
 
@@ -1,13 +1,19 @@
+from customer_support_agent.api.routers.customers import router as customers_router
 from customer_support_agent.api.routers.drafts import router as drafts_router
 from customer_support_agent.api.routers.health import router as health_router
+from customer_support_agent.api.routers.jobs import router as jobs_router
 from customer_support_agent.api.routers.knowledge import router as knowledge_router
 from customer_support_agent.api.routers.memory import router as memory_router
+from customer_support_agent.api.routers.metrics import router as metrics_router
 from customer_support_agent.api.routers.tickets import router as tickets_router
 
 __all__ = [
     "health_router",
     "tickets_router",
     "drafts_router",
+    "jobs_router",
     "knowledge_router",
     "memory_router",
+    "customers_router",
+    "metrics_router",
 ]
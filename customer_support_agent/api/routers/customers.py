@@ -0,0 +1,24 @@
+"""Customer routes."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from customer_support_agent.api.dependencies import get_customers_repository
+from customer_support_agent.repositories.sqlite.customers import CustomersRepository
+from customer_support_agent.schemas.api import CustomerStatsResponse
+
+router = APIRouter()
+
+
+@router.get("/api/customers/{customer_id}/stats", response_model=CustomerStatsResponse)
+def customer_stats_route(
+    customer_id: int,
+    customers_repo: CustomersRepository = Depends(get_customers_repository),
+) -> dict[str, Any]:
+    stats = customers_repo.get_ticket_stats(customer_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return stats
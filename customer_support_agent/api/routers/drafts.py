@@ -1,31 +1,83 @@
 from __future__ import annotations
 
+from typing import Any
+
 from fastapi import APIRouter, Depends, HTTPException
 
 from customer_support_agent.api.dependencies import (
-    get_copilot,
     get_draft_service,
     get_drafts_repository,
+    get_job_queue,
+    get_jobs_repository,
+    get_settings_dep,
     get_tickets_repository,
 )
+from customer_support_agent.core.settings import Settings
 from customer_support_agent.repositories.sqlite.drafts import DraftsRepository
+from customer_support_agent.repositories.sqlite.jobs import TICKET_PRIORITY_RANK, JobsRepository
 from customer_support_agent.repositories.sqlite.tickets import TicketsRepository
-from customer_support_agent.schemas.api import DraftResponse, DraftUpdateRequest
-from customer_support_agent.services.draft_service import DraftService
+from customer_support_agent.schemas.api import (
+    DraftBatchRequest,
+    DraftBatchResponse,
+    DraftResponse,
+    DraftUpdateRequest,
+)
+from customer_support_agent.services.draft_service import DRAFT_BATCH_JOB_KIND, MEMORY_WRITE_JOB_KIND, DraftService
+from customer_support_agent.services.job_queue import JobQueue
 
 
 router = APIRouter()
 
+
+def _latest_memory_job(draft: dict, jobs_repo: JobsRepository) -> dict | None:
+    if draft["status"] != "accepted":
+        return None
+    return jobs_repo.get_latest_for_resource(f"draft:{draft['id']}", kind=MEMORY_WRITE_JOB_KIND)
+
+
+@router.post("/api/drafts/batch-generate", response_model=DraftBatchResponse, status_code=202)
+def batch_generate_drafts_route(
+    payload: DraftBatchRequest,
+    settings: Settings = Depends(get_settings_dep),
+    tickets_repo: TicketsRepository = Depends(get_tickets_repository),
+    job_queue: JobQueue = Depends(get_job_queue),
+    draft_service: DraftService = Depends(get_draft_service),
+) -> dict[str, Any]:
+    max_tickets = settings.draft_batch_max_tickets
+    if payload.ticket_ids is not None and len(payload.ticket_ids) > max_tickets:
+        raise HTTPException(status_code=413, detail=f"At most {max_tickets} tickets can be drafted per batch.")
+
+    # The selection is fixed now, so tickets filed while the job runs are not swept in.
+    tickets = tickets_repo.list_for_drafting(
+        ticket_ids=payload.ticket_ids,
+        status=payload.status,
+        priority=payload.priority,
+        limit=min(payload.limit or max_tickets, max_tickets),
+    )
+    if not tickets:
+        raise HTTPException(status_code=404, detail="No tickets match the batch selection")
+
+    ticket_ids = [ticket["id"] for ticket in tickets]
+    # Backlog drafts queue behind single-ticket drafts so new tickets keep their latency.
+    job = job_queue.enqueue(
+        DRAFT_BATCH_JOB_KIND,
+        {"ticket_ids": ticket_ids},
+        priority=TICKET_PRIORITY_RANK["low"],
+    )
+    return {"job_id": job["id"], "status": job["status"], "progress": draft_service.batch_progress(ticket_ids)}
+
+
 @router.get("/api/drafts/{ticket_id}", response_model=DraftResponse)
 def get_draft_route(
     ticket_id: int,
     drafts_repo: DraftsRepository = Depends(get_drafts_repository),
+    jobs_repo: JobsRepository = Depends(get_jobs_repository),
     draft_service: DraftService = Depends(get_draft_service),
 ) -> dict:
     draft = drafts_repo.get_latest_for_ticket(ticket_id)
     if not draft:
         raise HTTPException(status_code=404, detail="Draft not found")
-    return draft_service.serialize_draft(draft)
+    return draft_service.serialize_draft(draft, memory_job=_latest_memory_job(draft, jobs_repo))
 
 
 @router.patch("/api/drafts/{draft_id}", response_model=DraftResponse)
@@ -34,6 +86,8 @@ def update_draft_route(
     payload: DraftUpdateRequest,
     drafts_repo: DraftsRepository = Depends(get_drafts_repository),
     tickets_repo: TicketsRepository = Depends(get_tickets_repository),
+    jobs_repo: JobsRepository = Depends(get_jobs_repository),
+    job_queue: JobQueue = Depends(get_job_queue),
     draft_service: DraftService = Depends(get_draft_service),
 ) -> dict:
     existing = drafts_repo.get_by_id(draft_id)
@@ -44,22 +98,20 @@ def update_draft_route(
     if not updated:
         raise HTTPException(status_code=500, detail="Failed to update draft")
 
+    memory_job = None
     if payload.status == "accepted":
         relation = drafts_repo.get_ticket_and_customer_by_draft(draft_id)
         if relation:
             tickets_repo.set_status(relation["ticket_id"], "resolved")
-            try:
-                context_used = draft_service.parse_context_used(updated.get("context_used"))
-                get_copilot().save_accepted_resolution(
-                    customer_email=relation["customer_email"],
-                    customer_company=relation.get("customer_company"),
-                    ticket_subject=relation["subject"],
-                    ticket_description=relation["description"],
-                    draft_content=updated["content"],
-                    context_used=context_used,
-                )
-            except Exception:
-                # Draft acceptance should still succeed even if memory save fails.
-                pass
-
-    return draft_service.serialize_draft(updated)
\ No newline at end of file
+            # Mem0 writes run LLM fact extraction; the job queue batches and retries them
+            # off the request path. Poll ``memory_write`` on the draft for the outcome.
+            memory_job = job_queue.enqueue(
+                MEMORY_WRITE_JOB_KIND,
+                draft_service.memory_write_payload(updated, relation),
+                resource=f"draft:{draft_id}",
+                priority=TICKET_PRIORITY_RANK["low"],
+            )
+    else:
+        memory_job = _latest_memory_job(updated, jobs_repo)
+
+    return draft_service.serialize_draft(updated, memory_job=memory_job)
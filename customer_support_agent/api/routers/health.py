@@ -1,6 +1,14 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+
+from customer_support_agent.api.dependencies import get_settings_dep
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.integrations.memory import checkpointer_stats
+from customer_support_agent.repositories.sqlite.base import get_pool
 
 router = APIRouter()
 
@@ -8,3 +16,21 @@ router = APIRouter()
 @router.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready(request: Request) -> JSONResponse:
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        return JSONResponse({"status": "ready", "steps": [], "warmup": "disabled"})
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+
+@router.get("/health/db")
+def health_db() -> dict[str, Any]:
+    return {"status": "ok", "pool": get_pool().stats()}
+
+
+@router.get("/health/checkpoints")
+def health_checkpoints(settings: Settings = Depends(get_settings_dep)) -> dict[str, Any]:
+    return {"status": "ok", "checkpointer": checkpointer_stats(settings)}
@@ -0,0 +1,42 @@
+"""Background job status routes."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from customer_support_agent.api.dependencies import get_jobs_repository
+from customer_support_agent.repositories.sqlite.jobs import JobsRepository
+from customer_support_agent.schemas.api import JobResponse
+
+router = APIRouter()
+
+
+def serialize_job(job: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "resource": job.get("resource"),
+        "status": job["status"],
+        "priority": job["priority"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "payload": json.loads(job.get("payload") or "{}"),
+        "result": json.loads(job["result"]) if job.get("result") else None,
+        "last_error": job.get("last_error"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+@router.get("/api/jobs/{job_id}", response_model=JobResponse)
+def get_job_route(
+    job_id: int,
+    jobs_repo: JobsRepository = Depends(get_jobs_repository),
+) -> dict[str, Any]:
+    job = jobs_repo.get_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return serialize_job(job)
@@ -1,11 +1,27 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
+
 from fastapi import APIRouter, Depends, HTTPException
 
-from customer_support_agent.api.dependencies import get_knowledge_service
-from customer_support_agent.schemas.api import KnowledgeIngestRequest, KnowledgeIngestResponse
+from customer_support_agent.api.dependencies import (
+    get_knowledge_base_or_503,
+    get_knowledge_service,
+    get_settings_dep,
+)
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.integrations.rag.embedding_cache import get_query_embedding_cache
+from customer_support_agent.schemas.api import (
+    KnowledgeIngestRequest,
+    KnowledgeIngestResponse,
+    KnowledgeSearchRequest,
+    KnowledgeSearchResponse,
+)
 from customer_support_agent.services.knowledge_service import KnowledgeService
 
+if TYPE_CHECKING:
+    from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+
 router = APIRouter()
 
 @router.post("/api/knowledge/ingest", response_model=KnowledgeIngestResponse)
@@ -17,3 +33,26 @@ def ingest_knowledge_route(
         return knowledge_service.ingest(clear_existing=payload.clear_existing)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {exc}") from exc
+
+
+@router.post("/api/knowledge/search", response_model=KnowledgeSearchResponse)
+def search_knowledge_route(
+    payload: KnowledgeSearchRequest,
+    knowledge_base: KnowledgeBaseService = Depends(get_knowledge_base_or_503),
+) -> dict[str, Any]:
+    try:
+        hits = knowledge_base.search_many(
+            payload.queries,
+            top_k=payload.top_k,
+            mmr=payload.mmr,
+            merge_adjacent=payload.merge_adjacent,
+        )
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Search failed: {exc}") from exc
+    return {"results": [{"query": query, "hits": query_hits} for query, query_hits in zip(payload.queries, hits)]}
+
+
+@router.get("/api/knowledge/embedding-cache")
+def embedding_cache_stats_route(settings: Settings = Depends(get_settings_dep)) -> dict[str, Any]:
+    cache = get_query_embedding_cache(settings)
+    return {"enabled": cache is not None, **(cache.stats() if cache is not None else {})}
@@ -2,15 +2,23 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import TYPE_CHECKING
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from customer_support_agent.api.dependencies import (
     get_copilot_or_503,
     get_customers_repository,
 )
+from customer_support_agent.integrations.memory.mem0_store import (
+    decode_memory_cursor,
+    encode_memory_cursor,
+)
 from customer_support_agent.repositories.sqlite.customers import CustomersRepository
 from customer_support_agent.schemas.api import CustomerMemoriesResponse, CustomerMemorySearchResponse
-from customer_support_agent.services.copilot_service import SupportCopilot
+
+if TYPE_CHECKING:
+    from customer_support_agent.services.copilot_service import SupportCopilot
 
 router = APIRouter()
 
@@ -18,6 +26,8 @@ router = APIRouter()
 @router.get("/api/customers/{customer_id}/memories", response_model=CustomerMemoriesResponse)
 def customer_memories_route(
     customer_id: int,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
     customers_repo: CustomersRepository = Depends(get_customers_repository),
     copilot: SupportCopilot = Depends(get_copilot_or_503),
 ) -> dict:
@@ -26,9 +36,16 @@ def customer_memories_route(
         raise HTTPException(status_code=404, detail="Customer not found")
 
     try:
-        memories = copilot.list_customer_memories(
+        start = decode_memory_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    try:
+        page = copilot.list_customer_memories(
             customer_email=customer["email"],
             customer_company=customer.get("company"),
+            limit=limit,
+            cursor=start,
         )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Failed to load memories: {exc}") from exc
@@ -36,7 +53,8 @@ def customer_memories_route(
     return {
         "customer_id": customer_id,
         "customer_email": customer["email"],
-        "memories": memories,
+        "memories": page["memories"],
+        "next_cursor": encode_memory_cursor(*page["next_cursor"]) if page["next_cursor"] else None,
     }
 
 @router.get("/api/customers/{customer_id}/memory-search", response_model=CustomerMemorySearchResponse)
@@ -54,7 +72,7 @@ def customer_memory_search_route(
         raise HTTPException(status_code=400, detail="Query cannot be empty")
 
     try:
-        results = copilot.search_customer_memories(
+        found = copilot.search_customer_memories(
             customer_email=customer["email"],
             query=query,
             customer_company=customer.get("company"),
@@ -67,5 +85,6 @@ def customer_memory_search_route(
         "customer_id": customer_id,
         "customer_email": customer["email"],
         "query": query,
-        "results": results,
+        "results": found["results"],
+        "branches": found["branches"],
     }
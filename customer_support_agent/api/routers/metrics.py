@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from customer_support_agent.api.dependencies import get_settings_dep
+from customer_support_agent.core.metrics import (
+    CHECKPOINT_STORE_BYTES,
+    CHECKPOINT_THREADS,
+    REGISTRY,
+)
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.integrations.memory import checkpointer_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(settings: Settings = Depends(get_settings_dep)) -> Response:
+    checkpoints = checkpointer_stats(settings)
+    CHECKPOINT_STORE_BYTES.set(checkpoints.get("size_bytes", 0))
+    CHECKPOINT_THREADS.set(checkpoints.get("threads", 0))
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
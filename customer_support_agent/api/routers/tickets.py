@@ -1,54 +1,58 @@
 from __future__ import annotations
 
+import json
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterator, Literal
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from customer_support_agent.api.dependencies import (
-    get_copilot,
     get_copilot_or_503,
     get_customers_repository,
     get_draft_service,
     get_drafts_repository,
+    get_job_queue,
+    get_jobs_repository,
+    get_settings_dep,
     get_tickets_repository,
 )
+from customer_support_agent.core.settings import Settings
 from customer_support_agent.repositories.sqlite.customers import CustomersRepository
 from customer_support_agent.repositories.sqlite.drafts import DraftsRepository
-from customer_support_agent.repositories.sqlite.tickets import TicketsRepository
-from customer_support_agent.schemas.api import GenerateDraftResponse, TicketCreateRequest, TicketResponse
-from customer_support_agent.services.copilot_service import SupportCopilot
-from customer_support_agent.services.draft_service import DraftService
+from customer_support_agent.repositories.sqlite.jobs import JobsRepository, priority_rank
+from customer_support_agent.repositories.sqlite.tickets import (
+    TICKET_LIST_FIELDS,
+    TicketsRepository,
+    decode_ticket_cursor,
+    encode_ticket_cursor,
+)
+from customer_support_agent.schemas.api import (
+    GenerateDraftResponse,
+    TicketBulkCreateRequest,
+    TicketBulkCreateResponse,
+    TicketCreateRequest,
+    TicketListItem,
+    TicketResponse,
+)
+from customer_support_agent.services.draft_service import DRAFT_JOB_KIND, DraftService
+from customer_support_agent.services.job_queue import JobQueue
 
+if TYPE_CHECKING:
+    from customer_support_agent.services.copilot_service import SupportCopilot
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-def _generate_and_store_draft_background(
-    ticket_id: int,
-    tickets_repo: TicketsRepository,
-    customers_repo: CustomersRepository,
-    drafts_repo: DraftsRepository,
-    draft_service: DraftService,
-) -> dict[str, Any] | None:
-    return draft_service.generate_and_store_background(
-        ticket_id=ticket_id,
-        tickets_repo=tickets_repo,
-        customers_repo=customers_repo,
-        drafts_repo=drafts_repo,
-        copilot_factory=get_copilot,
-        logger=logger,
-    )
-
-
 @router.post("/api/tickets", response_model=TicketResponse)
 def create_ticket_route(
     payload: TicketCreateRequest,
-    background_tasks: BackgroundTasks,
     customers_repo: CustomersRepository = Depends(get_customers_repository),
     tickets_repo: TicketsRepository = Depends(get_tickets_repository),
-    drafts_repo: DraftsRepository = Depends(get_drafts_repository),
+    jobs_repo: JobsRepository = Depends(get_jobs_repository),
     draft_service: DraftService = Depends(get_draft_service),
+    job_queue: JobQueue = Depends(get_job_queue),
+    settings: Settings = Depends(get_settings_dep),
 ) -> dict[str, Any]:
     customer = customers_repo.create_or_get(
         email=str(payload.customer_email),
@@ -69,25 +73,117 @@ def create_ticket_route(
         "customer_company": customer.get("company"),
     }
 
-    if payload.auto_generate:
-        background_tasks.add_task(
-            _generate_and_store_draft_background,
-            ticket["id"],
-            tickets_repo,
-            customers_repo,
-            drafts_repo,
-            draft_service,
+    serialized = draft_service.serialize_ticket(merged)
+    # Same backlog cap as the bulk route; a ticket over it is created without a draft job.
+    if payload.auto_generate and jobs_repo.count_pending(DRAFT_JOB_KIND) < settings.draft_queue_max_pending:
+        job = job_queue.enqueue(
+            kind=DRAFT_JOB_KIND,
+            payload={"ticket_id": ticket["id"]},
+            resource=f"ticket:{ticket['id']}",
+            priority=priority_rank(ticket["priority"]),
         )
+        serialized["draft_job_id"] = job["id"]
 
-    return draft_service.serialize_ticket(merged)
+    return serialized
 
 
-@router.get("/api/tickets", response_model=list[TicketResponse])
+@router.post("/api/tickets/bulk", response_model=TicketBulkCreateResponse)
+def bulk_create_tickets_route(
+    payload: TicketBulkCreateRequest,
+    settings: Settings = Depends(get_settings_dep),
+    tickets_repo: TicketsRepository = Depends(get_tickets_repository),
+    jobs_repo: JobsRepository = Depends(get_jobs_repository),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> dict[str, Any]:
+    if len(payload.tickets) > settings.bulk_ticket_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.bulk_ticket_max_items} tickets can be created per request.",
+        )
+
+    created = tickets_repo.create_many(
+        [
+            {
+                "customer_email": str(item.customer_email),
+                "customer_name": item.customer_name,
+                "customer_company": item.customer_company,
+                "subject": item.subject,
+                "description": item.description,
+                "priority": item.priority,
+            }
+            for item in payload.tickets
+        ]
+    )
+    ticket_ids = [ticket["id"] for ticket in created]
+
+    draft_jobs = [
+        {
+            "payload": {"ticket_id": ticket_id},
+            "resource": f"ticket:{ticket_id}",
+            "priority": priority_rank(item.priority),
+        }
+        for ticket_id, item in zip(ticket_ids, payload.tickets)
+        if item.auto_generate
+    ]
+    capacity = max(0, settings.draft_queue_max_pending - jobs_repo.count_pending(DRAFT_JOB_KIND))
+    # Most urgent tickets get the remaining capacity when the backlog is nearly full.
+    accepted = sorted(draft_jobs, key=lambda job: job["priority"])[:capacity]
+    draft_job_ids = job_queue.enqueue_many(DRAFT_JOB_KIND, accepted)
+
+    return {
+        "ticket_ids": ticket_ids,
+        "created_count": len(ticket_ids),
+        "drafts_queued": len(draft_job_ids),
+        "drafts_rejected": len(draft_jobs) - len(draft_job_ids),
+        "draft_job_ids": draft_job_ids,
+    }
+
+
+@router.get(
+    "/api/tickets",
+    response_model=list[TicketListItem],
+    response_model_exclude_unset=True,
+)
 def list_tickets_route(
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = None,
+    status: str | None = None,
+    priority: Literal["low", "medium", "high", "urgent"] | None = None,
+    customer_id: int | None = None,
+    company: str | None = None,
+    fields: str | None = Query(
+        default=None,
+        description="Comma-separated ticket fields to return, e.g. `subject,status,priority`.",
+    ),
     tickets_repo: TicketsRepository = Depends(get_tickets_repository),
     draft_service: DraftService = Depends(get_draft_service),
 ) -> list[dict[str, Any]]:
-    return [draft_service.serialize_ticket(ticket) for ticket in tickets_repo.list()]
+    selected_fields: list[str] | None = None
+    if fields:
+        selected_fields = [item.strip() for item in fields.split(",") if item.strip()]
+        unknown = sorted(set(selected_fields) - set(TICKET_LIST_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown ticket fields: {', '.join(unknown)}")
+
+    try:
+        keyset = decode_ticket_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    tickets = tickets_repo.list(
+        limit=limit,
+        cursor=keyset,
+        status=status,
+        priority=priority,
+        customer_id=customer_id,
+        company=company,
+        fields=selected_fields,
+    )
+    if len(tickets) == limit:
+        response.headers["X-Next-Cursor"] = encode_ticket_cursor(tickets[-1])
+
+    return [draft_service.serialize_ticket(ticket, fields=selected_fields) for ticket in tickets]
 
 
 @router.get("/api/tickets/{ticket_id}", response_model=TicketResponse)
@@ -132,4 +228,42 @@ def generate_draft_route(
     return {
         "ticket_id": ticket_id,
         "draft": draft_service.serialize_draft(draft),
-    }
\ No newline at end of file
+    }
+
+@router.get("/api/tickets/{ticket_id}/generate-draft/stream")
+def stream_draft_route(
+    ticket_id: int,
+    tickets_repo: TicketsRepository = Depends(get_tickets_repository),
+    customers_repo: CustomersRepository = Depends(get_customers_repository),
+    drafts_repo: DraftsRepository = Depends(get_drafts_repository),
+    draft_service: DraftService = Depends(get_draft_service),
+    copilot: SupportCopilot = Depends(get_copilot_or_503),
+) -> StreamingResponse:
+    ticket = tickets_repo.get_by_id(ticket_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    customer = customers_repo.get_by_id(ticket["customer_id"])
+    if not customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+
+    events = draft_service.stream_and_store_manual(
+        ticket_id=ticket_id,
+        ticket=ticket,
+        customer=customer,
+        drafts_repo=drafts_repo,
+        copilot=copilot,
+        logger=logger,
+    )
+    return StreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse_stream(events: Iterator[dict[str, Any]]) -> Iterator[str]:
+    # Flush an initial comment so clients see the response before retrieval finishes.
+    yield ": stream-open\n\n"
+    for event in events:
+        yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
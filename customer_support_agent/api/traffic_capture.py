@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import queue
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl
+
+CAPTURED_PREFIXES = ("/api/tickets", "/api/drafts", "/api/customers")
+PII_EMAIL_KEYS = {"customer_email", "email"}
+PII_NAME_KEYS = {"customer_name", "name"}
+MAX_CAPTURED_BODY_BYTES = 64 * 1024
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+class PIIHasher:
+    """Replace customer identifiers with keyed hashes that stay stable across a capture.
+
+    Emails become ``<digest>@example.com`` so replayed payloads still pass
+    ``EmailStr`` validation and the same customer maps to the same address.
+    Email addresses inside free text are replaced as well; other free text
+    is kept as-is. Digests are HMAC-SHA256 under ``salt``, which is required:
+    without a secret key, hashes of known emails could be matched by lookup.
+    """
+
+    def __init__(self, salt: str):
+        if not salt.strip():
+            raise ValueError("Traffic capture needs TRAFFIC_CAPTURE_SALT set to a secret value.")
+        self._salt = salt.encode("utf-8")
+
+    def _digest(self, value: str) -> str:
+        return hmac.new(self._salt, value.strip().lower().encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+    def email(self, value: str) -> str:
+        return f"u{self._digest(value)}@example.com"
+
+    def name(self, value: str) -> str:
+        return f"Customer {self._digest(value)[:8]}"
+
+    def text(self, value: str) -> str:
+        return _EMAIL_RE.sub(lambda match: self.email(match.group(0)), value)
+
+    def scrub(self, value: Any, key: str | None = None) -> Any:
+        if isinstance(value, dict):
+            return {item_key: self.scrub(item, item_key) for item_key, item in value.items()}
+        if isinstance(value, list):
+            return [self.scrub(item, key) for item in value]
+        if not isinstance(value, str) or not value:
+            return value
+        if key in PII_EMAIL_KEYS:
+            return self.email(value)
+        if key in PII_NAME_KEYS:
+            return self.name(value)
+        return self.text(value)
+
+
+class TrafficCaptureWriter:
+    """NDJSON appender for captured requests.
+
+    ``write`` only queues the record; a daemon thread serialises and
+    appends it, so the middleware never blocks the event loop on disk I/O.
+    The file is flushed whenever the queue runs empty and on ``close``.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        self._queue: queue.SimpleQueue[dict[str, Any] | None] = queue.SimpleQueue()
+        self._handle = open(path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._drain, name="traffic-capture-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def write(self, record: dict[str, Any]) -> None:
+        self._queue.put(record)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._handle.close()
+
+    def _drain(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                self._handle.flush()
+                return
+            self._handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+            if self._queue.empty():
+                self._handle.flush()
+
+
+class TrafficCaptureMiddleware:
+    """ASGI middleware recording ticket, draft and memory API calls for replay.
+
+    Each record holds the arrival time, method, path, query and JSON body
+    (with PII hashed by ``PIIHasher``), plus the response status, size,
+    latency and the resource ids it returned. The replay tool uses those ids
+    to map captured ids onto the ones the target instance creates. Response
+    bodies are not stored. The middleware works on raw ASGI messages, so
+    streamed responses such as the draft SSE endpoint pass through unbuffered.
+    """
+
+    def __init__(self, app: Any, writer: TrafficCaptureWriter, hasher: PIIHasher):
+        self.app = app
+        self._writer = writer
+        self._hasher = hasher
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(CAPTURED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        request_body = bytearray()
+        response: dict[str, Any] = {"status": None, "bytes": 0, "content_type": None, "head": bytearray()}
+
+        async def capture_receive() -> dict[str, Any]:
+            message = await receive()
+            if message["type"] == "http.request" and len(request_body) < MAX_CAPTURED_BODY_BYTES:
+                request_body.extend(message.get("body", b""))
+            return message
+
+        async def capture_send(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                headers = dict(message.get("headers") or [])
+                response["content_type"] = headers.get(b"content-type", b"").decode("latin-1") or None
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                response["bytes"] += len(body)
+                if len(response["head"]) < MAX_CAPTURED_BODY_BYTES:
+                    response["head"].extend(body)
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            self._record(scope, started_at, time.perf_counter() - started, bytes(request_body), response)
+
+    def _record(
+        self,
+        scope: dict[str, Any],
+        started_at: float,
+        elapsed_s: float,
+        request_body: bytes,
+        response: dict[str, Any],
+    ) -> None:
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True))
+        body: Any = None
+        if request_body:
+            try:
+                body = self._hasher.scrub(json.loads(request_body))
+            except (ValueError, UnicodeDecodeError):
+                body = {"unparsed_bytes": len(request_body)}
+        self._writer.write(
+            {
+                "ts": round(started_at, 6),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": self._hasher.scrub(query),
+                "body": body,
+                "response": {
+                    "status": response["status"] or 500,
+                    "bytes": response["bytes"],
+                    "content_type": response["content_type"],
+                    "duration_ms": round(elapsed_s * 1000, 3),
+                    "ids": self._response_ids(response),
+                },
+            }
+        )
+
+    @staticmethod
+    def _response_ids(response: dict[str, Any]) -> dict[str, int]:
+        if not (response["content_type"] or "").startswith("application/json"):
+            return {}
+        try:
+            payload = json.loads(bytes(response["head"]))
+        except ValueError:
+            return {}
+        if not isinstance(payload, dict):
+            return {}
+        ids = {key: payload[key] for key in ("id", "ticket_id", "customer_id") if isinstance(payload.get(key), int)}
+        draft = payload.get("draft")
+        if isinstance(draft, dict) and isinstance(draft.get("id"), int):
+            ids["draft_id"] = draft["id"]
+        return ids
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# The app's own metrics, kept apart from prometheus_client's default process collectors.
+REGISTRY = CollectorRegistry()
+
+
+STAGE_SECONDS = Histogram(
+    "support_stage_duration_seconds",
+    "Time spent in each stage of draft generation and storage.",
+    labelnames=("stage",),
+    buckets=DEFAULT_BUCKETS,
+    registry=REGISTRY,
+)
+DRAFTS_TOTAL = Counter(
+    "support_drafts_generated_total",
+    "Drafts produced by the copilot, by runtime.",
+    labelnames=("runtime",),
+    registry=REGISTRY,
+)
+FALLBACKS_TOTAL = Counter(
+    "support_draft_fallbacks_total",
+    "Drafts whose text came from a fallback instead of the agent's final message.",
+    labelnames=("kind",),
+    registry=REGISTRY,
+)
+TOOL_ERRORS_TOTAL = Counter(
+    "support_tool_errors_total",
+    "Agent tool calls that returned an error.",
+    registry=REGISTRY,
+)
+MEMORY_DISABLED_TOTAL = Counter(
+    "support_memory_disabled_runs_total",
+    "Drafts generated while Mem0 was unavailable.",
+    registry=REGISTRY,
+)
+CHECKPOINT_STORE_BYTES = Gauge(
+    "support_checkpoint_store_bytes",
+    "Size of the agent checkpoint store on disk.",
+    registry=REGISTRY,
+)
+CHECKPOINT_THREADS = Gauge(
+    "support_checkpoint_threads",
+    "Agent conversation threads currently held by the checkpointer.",
+    registry=REGISTRY,
+)
+
+
+def record_stage(stage: str, seconds: float, timings: dict[str, float] | None = None) -> None:
+    """Observe ``seconds`` for ``stage`` and add it to ``timings[f"{stage}_ms"]`` when given."""
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
+    if timings is not None:
+        key = f"{stage}_ms"
+        timings[key] = round(timings.get(key, 0.0) + seconds * 1000, 2)
+
+
+@contextmanager
+def time_stage(stage: str, timings: dict[str, float] | None = None) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started, timings)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -18,6 +19,7 @@ class Settings(BaseSettings):
 
     groq_api_key: str = ""
     groq_model: str = "llama-3.1-8b-instant"
+    groq_base_url: str = ""
     llm_temperature: float = 0.2
 
 
@@ -33,10 +35,74 @@ class Settings(BaseSettings):
     chroma_mem0_dir: Path = Path("data/chroma_mem0")
     knowledge_base_dir: Path = Path("knowledge_base")
 
+    sqlite_pool_size: int = 8
+    sqlite_pool_timeout_s: float = 10.0
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "MEMORY"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_cache_size_kib: int = 16384
+    sqlite_mmap_size: int = 268435456
+    sqlite_busy_timeout_ms: int = 5000
+
+    job_workers: int = 2
+    job_poll_interval_s: float = 1.0
+    job_lease_s: float = 300.0
+    job_max_attempts: int = 3
+    job_retry_backoff_s: float = 5.0
+    job_retry_backoff_max_s: float = 300.0
+    job_drain_timeout_s: float = 30.0
+    draft_queue_max_pending: int = 1000
+    draft_job_batch_size: int = 8
+    memory_write_batch_size: int = 16
+    draft_batch_concurrency: int = 4
+    draft_batch_chunk_size: int = 25
+    draft_batch_max_tickets: int = 1000
+    bulk_ticket_max_items: int = 5000
+
+    agent_checkpointer: Literal["memory", "sqlite", "none"] = "sqlite"
+    checkpoint_db_path: Path = Path("data/checkpoints.db")
+    checkpoint_ttl_s: float = 7 * 24 * 3600
+    checkpoint_max_threads: int = 5000
+
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: Path = Path("data/embedding_cache.sqlite")
+    embedding_cache_max_entries: int = 10000
+
+    draft_cache_enabled: bool = False
+    draft_cache_threshold: float = 0.92
+    draft_cache_scope: Literal["customer", "company"] = "customer"
+    draft_cache_ttl_s: float = 7 * 24 * 3600
+
+    traffic_capture_enabled: bool = False
+    traffic_capture_path: Path = Path("data/traffic_capture.ndjson")
+    # HMAC key for hashed emails/names; required when capture is enabled.
+    traffic_capture_salt: str = ""
+
+    startup_warmup_enabled: bool = True
+
+    kb_watch_mode: Literal["off", "poll", "inotify"] = "off"
+    kb_watch_interval_s: float = 2.0
+    kb_watch_debounce_s: float = 0.5
+
+    rag_backend: Literal["chroma", "numpy"] = "chroma"
     rag_chunk_size: int = 800
     rag_chunk_overlap: int = 120
     rag_top_k: int = 4
+    retrieval_mode: Literal["dense", "sparse", "hybrid"] = "dense"
+    rag_hybrid_candidates: int = 20
+    rag_rrf_k: int = 60
+    rag_mmr_enabled: bool = False
+    rag_mmr_lambda: float = 0.5
+    rag_merge_adjacent: bool = False
     mem0_top_k: int = 5
+    context_token_budget: int = 1000
+    context_memory_min_score: float = 0.0
+    context_kb_max_distance: float | None = None
+    retrieval_max_workers: int = 8
+    retrieval_queue_timeout_s: float = 30.0
+    memory_search_timeout_s: float = 5.0
+    memory_list_cache_ttl_s: float = 30.0
+    memory_list_cache_max_scopes: int = 512
+    rag_search_timeout_s: float = 5.0
 
     api_host: str = "0.0.0.0"
     api_port: int = 8000
@@ -59,6 +125,18 @@ class Settings(BaseSettings):
     def chroma_mem0_path(self) -> Path:
         return self.resolve(self.chroma_mem0_dir)
 
+    @property
+    def traffic_capture_file(self) -> Path:
+        return self.resolve(self.traffic_capture_path)
+
+    @property
+    def checkpoint_db_file(self) -> Path:
+        return self.resolve(self.checkpoint_db_path)
+
+    @property
+    def embedding_cache_file(self) -> Path:
+        return self.resolve(self.embedding_cache_path)
+
     @property
     def knowledge_base_path(self) -> Path:
         return self.resolve(self.knowledge_base_dir)
@@ -1,4 +1,44 @@
+"""Memory integration package.
 
-from customer_support_agent.integrations.memory.mem0_store import CustomerMemoryStore
+Exports are resolved on first access, so importing one submodule does not
+load the others. In particular, ``mem0_store`` does not pull in langgraph.
+"""
 
-__all__ = ["CustomerMemoryStore"]
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from customer_support_agent.core.settings import Settings
+
+if TYPE_CHECKING:
+    from customer_support_agent.integrations.memory.checkpointer import SQLiteCheckpointSaver, get_checkpointer
+    from customer_support_agent.integrations.memory.mem0_store import CustomerMemoryStore
+
+_CHECKPOINTER_MODULE = "customer_support_agent.integrations.memory.checkpointer"
+_EXPORTS = {
+    "CustomerMemoryStore": "customer_support_agent.integrations.memory.mem0_store",
+    "SQLiteCheckpointSaver": _CHECKPOINTER_MODULE,
+    "get_checkpointer": _CHECKPOINTER_MODULE,
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name]), name)
+
+
+def checkpointer_stats(settings: Settings) -> dict[str, Any]:
+    """``checkpointer.checkpointer_stats`` without importing langgraph just to report nothing exists yet."""
+    module = sys.modules.get(_CHECKPOINTER_MODULE)
+    if module is None:
+        stats: dict[str, Any] = {"mode": settings.agent_checkpointer}
+        if settings.agent_checkpointer == "sqlite":
+            stats.update(path=str(settings.checkpoint_db_file), initialized=False)
+        return stats
+    return module.checkpointer_stats(settings)
+
+
+__all__ = ["CustomerMemoryStore", "SQLiteCheckpointSaver", "checkpointer_stats", "get_checkpointer"]
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from customer_support_agent.core.settings import Settings
+
+_THREADS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint_threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoint_threads_updated ON checkpoint_threads(updated_at);
+"""
+
+
+class SQLiteCheckpointSaver(SqliteSaver):
+    """``SqliteSaver`` that bounds the store by thread age and count.
+
+    Storage, serialization and queries are langgraph's own; this class only
+    records when each thread was last written. Threads untouched for
+    ``ttl_s`` seconds, and the least recently used threads beyond
+    ``max_threads``, are deleted on write (at most once every
+    ``evict_interval_s``), which bounds the store instead of letting every
+    ticket's history accumulate.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_s: float,
+        max_threads: int,
+        evict_interval_s: float = 60.0,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        _drop_legacy_tables(conn)
+        super().__init__(conn)
+        self._path = path
+        self._ttl_s = ttl_s
+        self._max_threads = max(1, max_threads)
+        self._evict_interval_s = evict_interval_s
+        self._last_evicted_at = 0.0
+        self._evicted_threads = 0
+        with self.cursor() as cur:
+            cur.executescript(_THREADS_SCHEMA)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        stored = super().put(config, checkpoint, metadata, new_versions)
+        now = time.time()
+        self._touch(config["configurable"]["thread_id"], now)
+        if now - self._last_evicted_at >= self._evict_interval_s:
+            self.evict(now=now)
+        return stored
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        super().put_writes(config, writes, task_id, task_path)
+        self._touch(config["configurable"]["thread_id"], time.time())
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._delete_threads([str(thread_id)])
+
+    def _touch(self, thread_id: str, now: float) -> None:
+        with self.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO checkpoint_threads (thread_id, updated_at) VALUES (?, ?)
+                ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at
+                """,
+                (str(thread_id), now),
+            )
+
+    def _delete_threads(self, thread_ids: list[str]) -> None:
+        if not thread_ids:
+            return
+        params = [(thread_id,) for thread_id in thread_ids]
+        with self.cursor() as cur:
+            cur.executemany("DELETE FROM writes WHERE thread_id = ?", params)
+            cur.executemany("DELETE FROM checkpoints WHERE thread_id = ?", params)
+            cur.executemany("DELETE FROM checkpoint_threads WHERE thread_id = ?", params)
+
+    def evict(self, now: float | None = None) -> int:
+        """Delete expired threads and the least recently used ones beyond ``max_threads``."""
+        now = time.time() if now is None else now
+        with self.cursor(transaction=False) as cur:
+            victims = [
+                row[0]
+                for row in cur.execute(
+                    """
+                    SELECT thread_id FROM checkpoint_threads WHERE updated_at < ?
+                    UNION ALL
+                    SELECT thread_id FROM (
+                        SELECT thread_id FROM checkpoint_threads
+                        WHERE updated_at >= ?
+                        ORDER BY updated_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (now - self._ttl_s, now - self._ttl_s, self._max_threads),
+                ).fetchall()
+            ]
+        self._delete_threads(victims)
+        self._last_evicted_at = now
+        self._evicted_threads += len(victims)
+        return len(victims)
+
+    def stats(self) -> dict[str, Any]:
+        with self.cursor(transaction=False) as cur:
+            threads = cur.execute("SELECT COUNT(*) FROM checkpoint_threads").fetchone()[0]
+            checkpoints = cur.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            writes = cur.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+            page_count = cur.execute("PRAGMA page_count").fetchone()[0]
+            page_size = cur.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "mode": "sqlite",
+            "path": str(self._path),
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "size_bytes": page_count * page_size,
+            "max_threads": self._max_threads,
+            "ttl_s": self._ttl_s,
+            "evicted_threads": self._evicted_threads,
+        }
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def _drop_legacy_tables(conn: sqlite3.Connection) -> None:
+    """Drop tables written by the hand-rolled saver that preceded ``SqliteSaver``.
+
+    Their ``checkpoints`` layout (with ``metadata_type``) clashes with
+    langgraph's. Checkpoints are short-lived conversation state under a TTL,
+    so they are discarded rather than converted.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(checkpoints)")}
+    if "metadata_type" in columns:
+        conn.executescript(
+            """
+            DROP TABLE IF EXISTS checkpoint_writes;
+            DROP TABLE IF EXISTS checkpoints;
+            DROP TABLE IF EXISTS checkpoint_threads;
+            """
+        )
+
+
+_checkpointers: dict[Path, SQLiteCheckpointSaver] = {}
+_memory_saver: InMemorySaver | None = None
+_checkpointers_lock = threading.Lock()
+
+
+def get_checkpointer(settings: Settings) -> BaseCheckpointSaver | None:
+    """Process-wide checkpointer for ``settings.agent_checkpointer``; None means one-shot runs."""
+    global _memory_saver
+
+    mode = settings.agent_checkpointer
+    if mode == "none":
+        return None
+    with _checkpointers_lock:
+        if mode == "memory":
+            if _memory_saver is None:
+                _memory_saver = InMemorySaver()
+            return _memory_saver
+        saver = _checkpointers.get(settings.checkpoint_db_file)
+        if saver is None:
+            saver = SQLiteCheckpointSaver(
+                path=settings.checkpoint_db_file,
+                ttl_s=settings.checkpoint_ttl_s,
+                max_threads=settings.checkpoint_max_threads,
+            )
+            _checkpointers[settings.checkpoint_db_file] = saver
+        return saver
+
+
+def checkpointer_stats(settings: Settings) -> dict[str, Any]:
+    """Size of the configured checkpoint store, without creating one."""
+    mode = settings.agent_checkpointer
+    if mode == "sqlite":
+        saver = _checkpointers.get(settings.checkpoint_db_file)
+        if saver is None:
+            return {"mode": mode, "path": str(settings.checkpoint_db_file), "initialized": False}
+        return saver.stats()
+    if mode == "memory":
+        storage = _memory_saver.storage if _memory_saver is not None else {}
+        return {
+            "mode": mode,
+            "threads": len(storage),
+            "checkpoints": sum(len(checkpoints) for thread in storage.values() for checkpoints in thread.values()),
+        }
+    return {"mode": mode}
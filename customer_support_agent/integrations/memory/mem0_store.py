@@ -1,19 +1,57 @@
 from __future__ import annotations
 
-from typing import Any
+import base64
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Sequence
 
 from customer_support_agent.core.settings import Settings
 
-try:
-    from mem0 import Memory
-except ImportError:
-    Memory = None
+# Payload keys Mem0 manages itself; everything else is caller metadata.
+_MEM0_CORE_KEYS = {
+    "data",
+    "hash",
+    "created_at",
+    "updated_at",
+    "text_lemmatized",
+    "user_id",
+    "agent_id",
+    "run_id",
+    "actor_id",
+    "role",
+    "attributed_to",
+    "expiration_date",
+}
+
+def encode_memory_cursor(scope_index: int, offset: int) -> str:
+    raw = json.dumps([scope_index, offset], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_memory_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        scope_index, offset = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        scope_index, offset = int(scope_index), int(offset)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid memory cursor.") from exc
+    if scope_index < 0 or offset < 0:
+        raise ValueError("Invalid memory cursor.")
+    return scope_index, offset
+
 
 class CustomerMemoryStore:
 
     def __init__(self, settings:Settings, llm:Any):
-        if Memory is None:
-            raise RuntimeError("mem0ai is not installed. Install dependencies with `uv sync`.")
+        try:
+            # Imported here: mem0 loads its LLM and vector-store SDKs at import time.
+            from mem0 import Memory
+        except ImportError as exc:
+            raise RuntimeError("mem0ai is not installed. Install dependencies with `uv sync`.") from exc
         _ = llm
 
         config: dict[str, Any] = {
@@ -33,6 +71,10 @@ class CustomerMemoryStore:
             },
         }
 
+        if settings.groq_base_url:
+            # Mem0's Groq client only reads the base URL from the environment.
+            os.environ.setdefault("GROQ_BASE_URL", settings.groq_base_url)
+
         if settings.google_api_key:
             config["embedder"] = {
                 "provider": "gemini",
@@ -65,6 +107,17 @@ class CustomerMemoryStore:
             )
 
         self._memory = Memory.from_config(config)
+        self._configure_list_cache(
+            ttl_s=settings.memory_list_cache_ttl_s,
+            max_scopes=settings.memory_list_cache_max_scopes,
+        )
+
+    def _configure_list_cache(self, ttl_s: float, max_scopes: int) -> None:
+        # scope -> {(offset, limit): (expires_at, page)}, least recently used scope first.
+        self._list_cache: OrderedDict[str, dict[tuple[int, int], tuple[float, list[dict[str, Any]]]]] = OrderedDict()
+        self._list_cache_ttl_s = ttl_s
+        self._list_cache_max_scopes = max(1, max_scopes)
+        self._list_cache_lock = threading.Lock()
 
     def search(self, query: str, user_id: str, limit: int = 5) -> list[dict[str, Any]]:
         try:
@@ -73,10 +126,64 @@ class CustomerMemoryStore:
             raw = self._memory.search(query, user_id=user_id)
         return self._normalize_results(raw, limit)
 
-    def list_memories(self, user_id: str, limit: int = 20) -> list[dict[str, Any]]:
-        if hasattr(self._memory, "get_all"):
+    def list_memories(self, user_id: str, limit: int = 20, offset: int = 0) -> list[dict[str, Any]]:
+        """Return one page of a scope's memories in storage order.
+
+        Pages are cached per scope for ``memory_list_cache_ttl_s``. Writes
+        through this store drop the cached pages of every scope they touch.
+        """
+        key = (max(0, offset), max(1, limit))
+        now = time.monotonic()
+        with self._list_cache_lock:
+            cached = self._list_cache.get(user_id, {}).get(key)
+            if cached and cached[0] > now:
+                self._list_cache.move_to_end(user_id)
+                return list(cached[1])
+
+        page = self._fetch_page(user_id, offset=key[0], limit=key[1])
+        if self._list_cache_ttl_s > 0:
+            with self._list_cache_lock:
+                self._list_cache.setdefault(user_id, {})[key] = (now + self._list_cache_ttl_s, page)
+                self._list_cache.move_to_end(user_id)
+                while len(self._list_cache) > self._list_cache_max_scopes:
+                    self._list_cache.popitem(last=False)
+        return list(page)
+
+    def _fetch_page(self, user_id: str, offset: int, limit: int) -> list[dict[str, Any]]:
+        collection = getattr(getattr(self._memory, "vector_store", None), "collection", None)
+        if collection is not None:
+            rows = collection.get(where={"user_id": user_id}, limit=limit, offset=offset, include=["metadatas"])
+            return self._normalize_results(
+                [
+                    {
+                        "id": memory_id,
+                        "memory": (payload or {}).get("data", ""),
+                        "metadata": {
+                            meta_key: value
+                            for meta_key, value in (payload or {}).items()
+                            if meta_key not in _MEM0_CORE_KEYS
+                        },
+                    }
+                    for memory_id, payload in zip(rows.get("ids") or [], rows.get("metadatas") or [])
+                ],
+                limit,
+            )
+
+        # Vector stores without direct access: let Mem0 fetch up to the end of the page.
+        if not hasattr(self._memory, "get_all"):
+            return []
+        try:
+            raw = self._memory.get_all(filters={"user_id": user_id}, top_k=offset + limit)
+        except TypeError:
             raw = self._memory.get_all(user_id=user_id)
-            return self._normalize_results(raw, limit)
+        if isinstance(raw, dict) and "results" in raw:
+            raw = raw.get("results") or []
+        return self._normalize_results(raw[offset:] if isinstance(raw, list) else raw, limit)
+
+    def _invalidate_lists(self, user_ids: Sequence[str]) -> None:
+        with self._list_cache_lock:
+            for user_id in user_ids:
+                self._list_cache.pop(user_id, None)
 
     def add_interaction(
         self,
@@ -100,38 +207,138 @@ class CustomerMemoryStore:
         accepted_draft: str,
         entity_links: list[str] | None = None,
     ) -> None:
-        entity_text = ""
-        if entity_links:
-            entity_text = "\nLinked entities: " + ", ".join(entity_links)
+        self.add_resolutions(
+            user_id=user_id,
+            resolutions=[
+                {
+                    "ticket_subject": ticket_subject,
+                    "ticket_description": ticket_description,
+                    "accepted_draft": accepted_draft,
+                    "entity_links": entity_links,
+                }
+            ],
+        )
 
-        messages = [
-            {
-                "role": "user",
-                "content": f"Ticket subject: {ticket_subject}\nProblem: {ticket_description}",
-            },
-            {
-                "role": "assistant",
-                "content": (
-                    "Resolution accepted by support agent:\n"
-                    f"{accepted_draft}{entity_text}"
-                ),
-            },
-        ]
+    def add_resolutions(
+        self,
+        user_id: str,
+        resolutions: list[dict[str, Any]],
+        fan_out_user_ids: Sequence[str] = (),
+    ) -> None:
+        """Store accepted resolutions for ``user_id`` with a single Mem0 ``add``.
+
+        Memories extracted for ``user_id`` are then copied, vectors included,
+        to each of ``fan_out_user_ids``, so fact extraction and embedding run
+        once no matter how many scopes share the resolution.
+        """
+        messages: list[dict[str, str]] = []
+        for resolution in resolutions:
+            entity_text = ""
+            if resolution.get("entity_links"):
+                entity_text = "\nLinked entities: " + ", ".join(resolution["entity_links"])
+
+            messages.extend(
+                [
+                    {
+                        "role": "user",
+                        "content": (
+                            f"Ticket subject: {resolution['ticket_subject']}\n"
+                            f"Problem: {resolution['ticket_description']}"
+                        ),
+                    },
+                    {
+                        "role": "assistant",
+                        "content": (
+                            "Resolution accepted by support agent:\n"
+                            f"{resolution['accepted_draft']}{entity_text}"
+                        ),
+                    },
+                ]
+            )
+        if not messages:
+            return
 
         metadata = {"type": "resolution"}
 
-        self._add_messages(messages=messages, user_id=user_id, metadata=metadata)
+        raw = self._add_messages(messages=messages, user_id=user_id, metadata=metadata)
+        fan_out_user_ids = [scope for scope in fan_out_user_ids if scope != user_id]
+        if not fan_out_user_ids:
+            return
+        if not self._copy_memories(raw, fan_out_user_ids):
+            for scope_user_id in fan_out_user_ids:
+                self._add_messages(messages=messages, user_id=scope_user_id, metadata=metadata)
+
+    def _copy_memories(self, raw: Any, user_ids: list[str]) -> bool:
+        """Duplicate memories added by ``raw`` under ``user_ids`` in one vector-store insert.
+
+        Returns False when the copy is not possible, e.g. a vector store that
+        does not expose stored embeddings. It also returns False when Mem0
+        reconciled the new facts against the customer scope with ``UPDATE``
+        or ``DELETE`` events: those rewrite memories whose copies in the
+        shared scopes cannot be matched by id. The caller then falls back to
+        a full ``add`` per scope, which reconciles each scope on its own.
+        """
+        results = raw.get("results") if isinstance(raw, dict) else raw
+        if not isinstance(results, list):
+            return False
+        events = [entry for entry in results if isinstance(entry, dict) and entry.get("id")]
+        if any(entry.get("event", "ADD") not in ("ADD", "NONE") for entry in events):
+            return False
+        added_ids = [entry["id"] for entry in events if entry.get("event", "ADD") == "ADD"]
+        if not added_ids:
+            return True
+
+        collection = getattr(getattr(self._memory, "vector_store", None), "collection", None)
+        if collection is None:
+            return False
+        stored = collection.get(ids=added_ids, include=["embeddings", "metadatas"])
+        embeddings = stored.get("embeddings")
+        if embeddings is None or len(embeddings) != len(added_ids):
+            return False
+        sources = [
+            (vector, payload or {})
+            for vector, payload in zip(embeddings, stored.get("metadatas") or [])
+        ]
+
+        # Mem0 dedupes on the fact hash within a scope; keep that true for the copies.
+        hashes = [payload["hash"] for _, payload in sources if payload.get("hash")]
+        vectors: list[list[float]] = []
+        payloads: list[dict[str, Any]] = []
+        for scope_user_id in user_ids:
+            existing = set()
+            if hashes:
+                present = collection.get(
+                    where={"$and": [{"user_id": scope_user_id}, {"hash": {"$in": hashes}}]},
+                    include=["metadatas"],
+                )
+                existing = {payload.get("hash") for payload in present.get("metadatas") or []}
+            for vector, payload in sources:
+                if payload.get("hash") and payload["hash"] in existing:
+                    continue
+                vectors.append([float(value) for value in vector])
+                payloads.append({**payload, "user_id": scope_user_id})
+
+        if vectors:
+            self._memory.vector_store.insert(
+                vectors=vectors,
+                payloads=payloads,
+                ids=[str(uuid.uuid4()) for _ in vectors],
+            )
+            self._invalidate_lists(user_ids)
+        return True
 
     def _add_messages(
         self,
         messages: list[dict[str, str]],
         user_id: str,
         metadata: dict[str, Any] | None = None,
-    ) -> None:
+    ) -> Any:
         try:
-            self._memory.add(messages, user_id=user_id, metadata=metadata or {})
+            return self._memory.add(messages, user_id=user_id, metadata=metadata or {})
         except TypeError:
-            self._memory.add(messages, user_id=user_id)
+            return self._memory.add(messages, user_id=user_id)
+        finally:
+            self._invalidate_lists([user_id])
 
 
     def _normalize_results(self, raw: Any, limit: int) -> list[dict[str, Any]]:
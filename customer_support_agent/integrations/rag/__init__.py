@@ -1,5 +1,45 @@
-"""RAG integration package."""
+"""RAG integration package.
 
-from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+Exports are resolved on first access, so light submodules such as
+``embedding_cache`` can be imported without loading chromadb.
+"""
 
-__all__ = ["KnowledgeBaseService"]
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from customer_support_agent.integrations.rag.bm25_index import BM25Index
+    from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+    from customer_support_agent.integrations.rag.draft_cache import DraftCache
+    from customer_support_agent.integrations.rag.embedding_cache import (
+        QueryEmbeddingCache,
+        get_query_embedding_cache,
+    )
+    from customer_support_agent.integrations.rag.kb_watcher import KnowledgeBaseWatcher
+
+_EXPORTS = {
+    "BM25Index": "customer_support_agent.integrations.rag.bm25_index",
+    "DraftCache": "customer_support_agent.integrations.rag.draft_cache",
+    "KnowledgeBaseService": "customer_support_agent.integrations.rag.chroma_kb",
+    "KnowledgeBaseWatcher": "customer_support_agent.integrations.rag.kb_watcher",
+    "QueryEmbeddingCache": "customer_support_agent.integrations.rag.embedding_cache",
+    "get_query_embedding_cache": "customer_support_agent.integrations.rag.embedding_cache",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name]), name)
+
+
+__all__ = [
+    "BM25Index",
+    "DraftCache",
+    "KnowledgeBaseService",
+    "KnowledgeBaseWatcher",
+    "QueryEmbeddingCache",
+    "get_query_embedding_cache",
+]
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+INDEX_VERSION = 1
+
+# Keeps compound tokens such as "/api/v2/refunds", "e-1042" or "kyc_update"
+# whole; their parts are indexed as well so "refunds" still matches.
+_TOKEN_RE = re.compile(r"/?[a-z0-9]+(?:[/._-][a-z0-9]+)*")
+_SPLIT_RE = re.compile(r"[/._-]+")
+
+
+def tokenize(text: str) -> list[str]:
+    tokens: list[str] = []
+    for match in _TOKEN_RE.findall(text.lower()):
+        tokens.append(match)
+        parts = [part for part in _SPLIT_RE.split(match) if part]
+        if len(parts) > 1 or match.startswith("/"):
+            tokens.extend(parts)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> dict[str, float]:
+    """Fuse ranked id lists: ``score(id) = sum(1 / (k + rank))`` with 1-based ranks."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+@dataclass(frozen=True)
+class _IndexGeneration:
+    """One immutable index file's contents, swapped in as a whole."""
+
+    name: str | None
+    postings: dict[str, dict[str, int]]
+    docs: dict[str, dict[str, Any]]
+    total_length: int
+
+
+_EMPTY_INDEX = _IndexGeneration(None, {}, {}, 0)
+
+
+class BM25Index:
+    """Okapi BM25 over knowledge-base chunks, persisted as JSON generations.
+
+    The index holds postings (``term -> {chunk_id: tf}``) plus each chunk's
+    length, text and metadata, so sparse-only searches need no vector-store
+    round trip. It is updated by ``KnowledgeBaseService.ingest_directory`` in
+    step with the vector store.
+
+    Like ``NumpyVectorStore``, every save writes a new ``{name}.{generation}.json``
+    that is never modified and then swaps a ``{name}.current`` pointer with
+    ``os.replace``; readers reload whenever the pointer names another generation.
+    """
+
+    _LOAD_ATTEMPTS = 5
+
+    def __init__(self, directory: Path, name: str, k1: float = 1.5, b: float = 0.75):
+        self._directory = directory
+        self._name = name
+        self._pointer_path = directory / f"{name}.current"
+        self._k1 = k1
+        self._b = b
+        self._lock = threading.Lock()
+        self._generation = _EMPTY_INDEX
+        directory.mkdir(parents=True, exist_ok=True)
+        self._migrate_unversioned()
+        self._refresh()
+
+    def _migrate_unversioned(self) -> None:
+        """Move an index written before generations existed into the first generation."""
+        legacy_path = self._directory / f"{self._name}.json"
+        if self._pointer_path.exists() or not legacy_path.exists():
+            return
+        payload = json.loads(legacy_path.read_text(encoding="utf-8"))
+        if payload.get("version") == INDEX_VERSION:
+            self._save(payload["postings"], payload["docs"])
+        legacy_path.unlink(missing_ok=True)
+
+    def _index_path(self, generation: str) -> Path:
+        return self._directory / f"{self._name}.{generation}.json"
+
+    def _current_name(self) -> str | None:
+        try:
+            return self._pointer_path.read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def exists(self) -> bool:
+        return self._current_name() is not None
+
+    def _refresh(self) -> None:
+        if self._current_name() == self._generation.name:
+            return
+        with self._lock:
+            for _ in range(self._LOAD_ATTEMPTS):
+                name = self._current_name()
+                if name == self._generation.name:
+                    return
+                generation = self._load(name)
+                if generation is not None:
+                    self._generation = generation
+                    return
+        raise RuntimeError(f"BM25 index {self._name} changed while loading; no consistent generation found.")
+
+    def _load(self, name: str | None) -> _IndexGeneration | None:
+        """Load generation ``name``, or None if a writer removed it before we read it."""
+        if name is None:
+            return _EMPTY_INDEX
+        try:
+            payload = json.loads(self._index_path(name).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if payload.get("generation") != name:
+            return None
+        if payload.get("version") != INDEX_VERSION:
+            return _IndexGeneration(name, {}, {}, 0)
+        docs = payload["docs"]
+        return _IndexGeneration(name, payload["postings"], docs, sum(doc["length"] for doc in docs.values()))
+
+    def count(self) -> int:
+        self._refresh()
+        return len(self._generation.docs)
+
+    def apply(self, upserts: list[dict[str, Any]], deletes: list[str]) -> None:
+        """Index ``upserts`` (``id``/``document``/``metadata``) and drop ``deletes``, then save.
+
+        Changes are made on copies and saved as a new generation, so
+        concurrent searches keep reading a consistent snapshot.
+        """
+        self._refresh()
+        current = self._generation
+        postings = {term: dict(matches) for term, matches in current.postings.items()}
+        docs = dict(current.docs)
+
+        stale = (set(deletes) | {chunk["id"] for chunk in upserts}) & docs.keys()
+        for chunk_id in stale:
+            del docs[chunk_id]
+        if stale:
+            for term in list(postings):
+                matches = postings[term]
+                for chunk_id in stale & matches.keys():
+                    del matches[chunk_id]
+                if not matches:
+                    del postings[term]
+
+        for chunk in upserts:
+            terms = Counter(tokenize(chunk["document"]))
+            docs[chunk["id"]] = {
+                "length": sum(terms.values()),
+                "document": chunk["document"],
+                "metadata": chunk.get("metadata") or {},
+            }
+            for term, tf in terms.items():
+                postings.setdefault(term, {})[chunk["id"]] = tf
+
+        self._save(postings, docs)
+
+    def reset(self) -> None:
+        previous = self._current_name()
+        self._pointer_path.unlink(missing_ok=True)
+        self._refresh()
+        self._remove_generation(previous)
+
+    def _save(self, postings: dict[str, dict[str, int]], docs: dict[str, dict[str, Any]]) -> None:
+        previous = self._generation.name
+        name = f"{time.time_ns():x}-{uuid.uuid4().hex[:8]}"
+        self._index_path(name).write_text(
+            json.dumps({"version": INDEX_VERSION, "generation": name, "postings": postings, "docs": docs}),
+            encoding="utf-8",
+        )
+        pointer_tmp = self._pointer_path.with_name(f"{self._pointer_path.name}.tmp")
+        pointer_tmp.write_text(name, encoding="utf-8")
+        os.replace(pointer_tmp, self._pointer_path)
+        self._refresh()
+        self._remove_generation(previous)
+
+    def _remove_generation(self, name: str | None) -> None:
+        # Readers that already loaded it keep their copy; ones that have not retry on the new pointer.
+        if name is not None:
+            self._index_path(name).unlink(missing_ok=True)
+
+    def search(self, query: str, top_k: int) -> list[dict[str, Any]]:
+        self._refresh()
+        current = self._generation
+        postings, docs = current.postings, current.docs
+        if not docs or top_k <= 0:
+            return []
+
+        doc_count = len(docs)
+        avg_length = (current.total_length / doc_count) or 1.0
+        scores: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            matches = postings.get(term)
+            if not matches:
+                continue
+            idf = math.log(1.0 + (doc_count - len(matches) + 0.5) / (len(matches) + 0.5))
+            for chunk_id, tf in matches.items():
+                norm = self._k1 * (1.0 - self._b + self._b * docs[chunk_id]["length"] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self._k1 + 1.0) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [
+            {
+                "id": chunk_id,
+                "document": docs[chunk_id]["document"],
+                "metadata": docs[chunk_id]["metadata"],
+                "score": round(score, 6),
+            }
+            for chunk_id, score in ranked
+        ]
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import os
+import threading
 from pathlib import Path
 from typing import Any
 
@@ -10,6 +12,20 @@ from chromadb.utils import embedding_functions
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from customer_support_agent.core.settings import Settings
+from customer_support_agent.integrations.rag.bm25_index import BM25Index, reciprocal_rank_fusion
+from customer_support_agent.integrations.rag.diversify import merge_adjacent_chunks, mmr_order
+from customer_support_agent.integrations.rag.embedding_cache import get_query_embedding_cache
+from customer_support_agent.integrations.rag.vector_store import (
+    ChromaVectorStore,
+    NumpyVectorStore,
+    VectorStore,
+)
+
+# 2: chunk ids are keyed on chunk content rather than position.
+MANIFEST_VERSION = 2
+
+# Serialises ingests from the API and the directory watcher within a process.
+_INGEST_LOCK = threading.Lock()
 
 
 class KnowledgeBaseService:
@@ -18,10 +34,12 @@ class KnowledgeBaseService:
         self._client = chromadb.PersistentClient(path=str(settings.chroma_rag_path))
         self._collection_name = "support_kb_gemini" if settings.google_api_key else "support_kb"
         self._embedding_function = self._build_embedding_function()
-        self._collection = self._client.get_or_create_collection(
-            name=self._collection_name,
-            embedding_function=self._embedding_function,
-        )
+        self._query_cache = get_query_embedding_cache(settings)
+        self._store = self._build_store()
+        # Only "non-empty" is cached: another process may fill an empty store, but
+        # a store that empties again just makes the next dense query return nothing.
+        self._has_vectors = False
+        self._sparse = BM25Index(settings.chroma_rag_path, f"{self._store.name}.bm25")
         self._splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.rag_chunk_size,
             chunk_overlap=settings.rag_chunk_overlap,
@@ -42,75 +60,329 @@ class KnowledgeBaseService:
 
         return embedding_functions.DefaultEmbeddingFunction()
 
-    def ingest_directory(self, directory: Path, clear_existing: bool = False) -> dict[str, int]:
-        if clear_existing:
-            self._client.delete_collection(name=self._collection_name)
-            self._collection = self._client.get_or_create_collection(
-                name=self._collection_name,
-                embedding_function=self._embedding_function,
+    def _build_store(self) -> VectorStore:
+        if self._settings.rag_backend == "numpy":
+            return NumpyVectorStore(
+                directory=self._settings.chroma_rag_path,
+                name=f"{self._collection_name}_numpy",
+                embed_documents=self._embedding_function,
             )
-        
-        source_files = sorted(
-            [
-                *directory.glob("*.md"),
-                *directory.glob("*.txt"),
-            ]
+        return ChromaVectorStore(
+            client=self._client,
+            name=self._collection_name,
+            embedding_function=self._embedding_function,
         )
 
-        docs: list[str] = []
-        ids: list[str] = []
-        metadatas: list[dict[str, Any]] = []
-
-        for file_path in source_files:
-            text = file_path.read_text(encoding="utf-8")
-            chunks = self._splitter.split_text(text)
-
-            for index, chunk in enumerate(chunks):
-                chunk_hash = hashlib.sha1(chunk.encode("utf-8")).hexdigest()[:10]
-                doc_id = f"{file_path.stem}-{index}-{chunk_hash}"
-                docs.append(chunk)
-                ids.append(doc_id)
-                metadatas.append(
-                    {
-                        "source": file_path.name,
-                        "chunk_index": index,
-                    }
+    @property
+    def client(self) -> Any:
+        return self._client
+
+    @property
+    def collection_name(self) -> str:
+        return self._collection_name
+
+    def warm_up(self) -> None:
+        """Load the embedding model now (downloading it if the image did not bundle it)."""
+        self._embedding_function(["warmup"])
+
+    def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        embed = getattr(self._embedding_function, "embed_query", self._embedding_function)
+        if self._query_cache is None:
+            return [[float(value) for value in vector] for vector in embed(queries)]
+        return self._query_cache.embed(queries, embed)
+
+    def embedding_cache_stats(self) -> dict[str, Any] | None:
+        return self._query_cache.stats() if self._query_cache is not None else None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self._settings.chroma_rag_path / f"{self._store.name}.manifest.json"
+
+    def kb_version(self) -> str:
+        """Fingerprint of the ingested content; changes whenever an ingest changes the manifest."""
+        try:
+            return hashlib.sha1(self.manifest_path.read_bytes()).hexdigest()[:16]
+        except FileNotFoundError:
+            return "empty"
+
+    def _load_manifest(self) -> dict[str, dict[str, Any]] | None:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION or manifest.get("chunker") != self._chunker_signature():
+            return None
+        return manifest.get("files") or {}
+
+    def _save_manifest(self, files: dict[str, dict[str, Any]]) -> None:
+        payload = {"version": MANIFEST_VERSION, "chunker": self._chunker_signature(), "files": files}
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def _chunker_signature(self) -> str:
+        return f"{self._settings.rag_chunk_size}:{self._settings.rag_chunk_overlap}"
+
+    def _split_file(self, file_path: Path, text: str) -> list[dict[str, Any]]:
+        """Split ``file_path`` into chunks whose ids depend on their text, not their position.
+
+        Editing one part of a file leaves the ids of the other chunks alone,
+        so they are not re-embedded. Repeated chunks get an occurrence suffix.
+        """
+        chunks: list[dict[str, Any]] = []
+        seen: dict[str, int] = {}
+        for index, chunk in enumerate(self._splitter.split_text(text)):
+            chunk_hash = hashlib.sha1(chunk.encode("utf-8")).hexdigest()[:10]
+            occurrence = seen.get(chunk_hash, 0)
+            seen[chunk_hash] = occurrence + 1
+            suffix = f"-{occurrence}" if occurrence else ""
+            chunks.append(
+                {
+                    "id": f"{file_path.stem}-{chunk_hash}{suffix}",
+                    "document": chunk,
+                    "metadata": {"source": file_path.name, "chunk_index": index},
+                }
+            )
+        return chunks
+
+    def ingest_directory(self, directory: Path, clear_existing: bool = False) -> dict[str, int]:
+        """Sync the collection with ``directory``, embedding only new or changed chunks.
+
+        A JSON manifest next to the vector store records the sha256 of every
+        source file and the ids of its chunks. Unchanged files are skipped
+        without being split. Chunk ids embed a hash of the chunk text, so in a
+        changed file only chunks whose id is not already stored are embedded;
+        stored chunks that moved only get their ``chunk_index`` metadata
+        rewritten. Ids that no longer exist on disk are deleted from the collection.
+        """
+        with _INGEST_LOCK:
+            if clear_existing:
+                self._store.reset()
+                self._sparse.reset()
+                self.manifest_path.unlink(missing_ok=True)
+
+            source_files = sorted(
+                [
+                    *directory.glob("*.md"),
+                    *directory.glob("*.txt"),
+                ]
+            )
+
+            previous = self._load_manifest()
+            if previous is None:
+                # No usable manifest: diff against what the store actually holds.
+                known_ids = self._store.ids()
+                previous = {}
+            else:
+                known_ids = {chunk_id for entry in previous.values() for chunk_id in entry["chunk_ids"]}
+
+            files: dict[str, dict[str, Any]] = {}
+            fresh: list[dict[str, Any]] = []
+            moved: list[dict[str, Any]] = []
+            sparse_upserts: list[dict[str, Any]] = []
+            files_unchanged = 0
+            # An index missing next to a populated store (e.g. after an upgrade) is
+            # rebuilt from the source files; only the vectors are reused.
+            rebuild_sparse = not self._sparse.exists()
+
+            for file_path in source_files:
+                raw = file_path.read_bytes()
+                digest = hashlib.sha256(raw).hexdigest()
+                entry = previous.get(file_path.name)
+                unchanged = entry is not None and entry.get("sha256") == digest
+                if unchanged:
+                    files[file_path.name] = entry
+                    files_unchanged += 1
+                    if not rebuild_sparse:
+                        continue
+
+                chunks = self._split_file(file_path, raw.decode("utf-8"))
+                sparse_upserts.extend(chunks)
+                if unchanged:
+                    continue
+                files[file_path.name] = {
+                    "sha256": digest,
+                    "chunk_ids": [chunk["id"] for chunk in chunks],
+                }
+                previous_ids = (entry or {}).get("chunk_ids", [])
+                previous_positions = {chunk_id: index for index, chunk_id in enumerate(previous_ids)}
+                for chunk in chunks:
+                    if chunk["id"] not in known_ids:
+                        fresh.append(chunk)
+                    elif previous_positions.get(chunk["id"]) != chunk["metadata"]["chunk_index"]:
+                        moved.append(chunk)
+
+            wanted_ids = {chunk_id for entry in files.values() for chunk_id in entry["chunk_ids"]}
+            orphaned_ids = sorted(known_ids - wanted_ids)
+
+            if fresh:
+                self._store.upsert(
+                    ids=[chunk["id"] for chunk in fresh],
+                    documents=[chunk["document"] for chunk in fresh],
+                    metadatas=[chunk["metadata"] for chunk in fresh],
                 )
-            
-        if docs:
-            # upsert prevents duplicate-id failures when re-ingesting.
-            self._collection.upsert(documents=docs, ids=ids, metadatas=metadatas)
+            if moved:
+                self._store.update_metadatas(
+                    ids=[chunk["id"] for chunk in moved],
+                    metadatas=[chunk["metadata"] for chunk in moved],
+                )
+            if orphaned_ids:
+                self._store.delete(orphaned_ids)
+            if sparse_upserts or orphaned_ids or rebuild_sparse:
+                self._sparse.apply(upserts=sparse_upserts, deletes=orphaned_ids)
 
-        return {
-            "files_indexed": len(source_files),
-            "chunks_indexed": len(docs),
-            "collection_count": self._collection.count(),
-        }
+            self._save_manifest(files)
+            collection_count = self._store.count()
+            self._has_vectors = collection_count > 0
+
+            return {
+                "files_indexed": len(source_files),
+                "files_unchanged": files_unchanged,
+                "chunks_indexed": len(wanted_ids),
+                "chunks_added": len(fresh),
+                "chunks_deleted": len(orphaned_ids),
+                "collection_count": collection_count,
+            }
+
+    def search(
+        self,
+        query: str,
+        top_k: int | None = None,
+        mmr: bool | None = None,
+        merge_adjacent: bool | None = None,
+    ) -> list[dict[str, Any]]:
+        """Top chunks for ``query`` using ``settings.retrieval_mode``.
+
+        ``dense`` ranks by embedding distance, ``sparse`` by BM25 over the local
+        inverted index, and ``hybrid`` fuses both candidate lists with
+        reciprocal-rank fusion so exact tokens (error codes, endpoint paths,
+        "KYC") surface even when their embeddings are not the closest.
 
-    def search(self, query: str, top_k: int | None = None) -> list[dict[str, Any]]:
-        if self._collection.count() == 0:
+        ``mmr`` re-ranks a ``rag_hybrid_candidates`` pool by maximal marginal
+        relevance over the stored embeddings, and ``merge_adjacent`` folds
+        neighbouring chunks of one source into a single hit. Both default to
+        the ``rag_mmr_enabled`` and ``rag_merge_adjacent`` settings.
+        """
+        return self.search_many([query], top_k=top_k, mmr=mmr, merge_adjacent=merge_adjacent)[0]
+
+    def search_many(
+        self,
+        queries: list[str],
+        top_k: int | None = None,
+        mmr: bool | None = None,
+        merge_adjacent: bool | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """``search`` for several queries, with one embedding batch and one vector-store query.
+
+        Results come back in query order. BM25 lookups stay per query, as the
+        sparse index is local and cheap to scan.
+        """
+        if not queries:
             return []
-        
-        results = self._collection.query(
-            query_texts=[query],
-            n_results=top_k or self._settings.rag_top_k,
-            include=["documents", "metadatas", "distances"],
+        limit = top_k or self._settings.rag_top_k
+        use_mmr = self._settings.rag_mmr_enabled if mmr is None else mmr
+        use_merge = self._settings.rag_merge_adjacent if merge_adjacent is None else merge_adjacent
+        mode = self._settings.retrieval_mode
+        vectors = (
+            self.embed_queries(list(queries)) if (mode != "sparse" or use_mmr) and self._store_has_vectors() else None
+        )
+        pool = max(limit, self._settings.rag_hybrid_candidates) if use_mmr or use_merge else limit
+
+        results = []
+        for index, candidates in enumerate(self._ranked_search_many(queries, pool, vectors)):
+            if use_mmr and vectors is not None:
+                candidates = self._mmr_rerank(vectors[index], candidates)
+            hits = (
+                merge_adjacent_chunks(candidates, limit=limit, max_overlap=self._settings.rag_chunk_overlap)
+                if use_merge
+                else candidates[:limit]
+            )
+            results.append([{key: value for key, value in hit.items() if key != "id"} for hit in hits])
+        return results
+
+    def _store_has_vectors(self) -> bool:
+        """Whether queries are worth embedding; counts the store only until it has vectors."""
+        if not self._has_vectors:
+            self._has_vectors = self._store.count() > 0
+        return self._has_vectors
+
+    def _ranked_search_many(
+        self,
+        queries: list[str],
+        limit: int,
+        vectors: list[list[float]] | None,
+    ) -> list[list[dict[str, Any]]]:
+        """Ranked hits per query for the configured retrieval mode, each with its chunk ``id``."""
+        mode = self._settings.retrieval_mode
+        if mode == "sparse":
+            return [[self._sparse_hit(match) for match in self._sparse.search(query, limit)] for query in queries]
+        if mode == "dense":
+            return self._dense_search_many(queries, vectors, limit)
+
+        candidates = max(limit, self._settings.rag_hybrid_candidates)
+        return [
+            self._fuse(dense, self._sparse.search(query, candidates), limit)
+            for query, dense in zip(queries, self._dense_search_many(queries, vectors, candidates))
+        ]
+
+    def _fuse(self, dense: list[dict[str, Any]], sparse: list[dict[str, Any]], limit: int) -> list[dict[str, Any]]:
+        fused = reciprocal_rank_fusion(
+            [[hit["id"] for hit in dense], [match["id"] for match in sparse]],
+            k=self._settings.rag_rrf_k,
         )
 
-        documents = (results.get("documents") or [[]])[0]
-        metadatas = (results.get("metadatas") or [[]])[0]
-        distances = (results.get("distances") or [[]])[0]
+        hits: dict[str, dict[str, Any]] = {}
+        for rank, match in enumerate(sparse, start=1):
+            hits[match["id"]] = {**self._sparse_hit(match), "distance": None, "sparse_rank": rank}
+        for rank, hit in enumerate(dense, start=1):
+            merged = hits.setdefault(hit["id"], dict(hit))
+            merged.update({"distance": hit["distance"], "dense_rank": rank})
 
-        combined: list[dict[str, Any]] = []
-        for i, document in enumerate(documents):
-            metadata = metadatas[i] if i < len(metadatas) else {}
-            distance = distances[i] if i < len(distances) else None
-            combined.append(
+        ranked = sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [{**hits[chunk_id], "score": round(score, 6)} for chunk_id, score in ranked]
+
+    def _mmr_rerank(self, query_vector: list[float], candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        vectors = self._store.embeddings([hit["id"] for hit in candidates])
+        # Chunks without a stored vector (e.g. a concurrent delete) keep their rank after the re-ranked ones.
+        embedded = [hit for hit in candidates if hit["id"] in vectors]
+        if not embedded:
+            return candidates
+        order = mmr_order(
+            query_vector,
+            [vectors[hit["id"]] for hit in embedded],
+            lambda_mult=self._settings.rag_mmr_lambda,
+        )
+        return [embedded[index] for index in order] + [hit for hit in candidates if hit["id"] not in vectors]
+
+    def _dense_search_many(
+        self,
+        queries: list[str],
+        vectors: list[list[float]] | None,
+        limit: int,
+    ) -> list[list[dict[str, Any]]]:
+        if vectors is None:
+            return [[] for _ in queries]
+
+        return [
+            [
                 {
-                    "content": document,
-                    "source": metadata.get("source", "unknown"),
-                    "distance": distance,
+                    "id": match["id"],
+                    "content": match["document"],
+                    "source": (match["metadata"] or {}).get("source", "unknown"),
+                    "chunk_index": (match["metadata"] or {}).get("chunk_index"),
+                    "distance": match["distance"],
                 }
-            )
+                for match in matches
+            ]
+            for matches in self._store.query_many(vectors, limit)
+        ]
 
-        return combined
+    @staticmethod
+    def _sparse_hit(match: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": match["id"],
+            "content": match["document"],
+            "source": (match["metadata"] or {}).get("source", "unknown"),
+            "chunk_index": (match["metadata"] or {}).get("chunk_index"),
+            "bm25": match["score"],
+        }
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+import numpy as np
+
+# Shorter shared edges are treated as coincidence, not splitter overlap.
+MIN_MERGE_OVERLAP = 16
+
+
+def mmr_order(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    lambda_mult: float,
+) -> list[int]:
+    """Order candidates by maximal marginal relevance.
+
+    Each step picks the candidate maximising
+    ``lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, picked)``
+    with cosine similarity, so a chunk that repeats an already picked one
+    falls behind a slightly less relevant chunk that adds new text.
+    ``lambda_mult=1`` keeps the pure relevance order.
+    """
+    if not len(candidate_vectors):
+        return []
+    matrix = _unit_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    query = _unit_rows(np.asarray(query_vector, dtype=np.float32)[None, :])[0]
+    relevance = matrix @ query
+    redundancy = np.full(len(matrix), -np.inf, dtype=np.float32)
+    remaining = list(range(len(matrix)))
+    order: list[int] = []
+    while remaining:
+        penalty = np.where(np.isfinite(redundancy[remaining]), redundancy[remaining], 0.0)
+        scores = lambda_mult * relevance[remaining] - (1 - lambda_mult) * penalty
+        best = remaining.pop(int(np.argmax(scores)))
+        order.append(best)
+        redundancy = np.maximum(redundancy, matrix @ matrix[best])
+    return order
+
+
+def merge_adjacent_chunks(hits: list[dict[str, Any]], limit: int, max_overlap: int) -> list[dict[str, Any]]:
+    """Take ``limit`` hits in rank order, folding neighbouring chunks of one source together.
+
+    A hit whose ``chunk_index`` is next to an already taken chunk of the same
+    ``source`` is joined onto it (the text the splitter repeated between the
+    two is kept once) and does not use a slot, so the freed slot goes to the
+    next hit in rank order. Merged hits keep the best rank, ``distance`` and
+    ``score`` of their parts and list them in ``chunk_indexes``.
+    """
+    groups: list[dict[str, Any]] = []
+    for hit in hits:
+        index = hit.get("chunk_index")
+        group = next(
+            (
+                group
+                for group in groups
+                if index is not None
+                and group["source"] == hit.get("source")
+                and (index == group["first"] - 1 or index == group["last"] + 1)
+            ),
+            None,
+        )
+        if group is not None:
+            if index == group["last"] + 1:
+                group["parts"].append(hit)
+                group["last"] = index
+            else:
+                group["parts"].insert(0, hit)
+                group["first"] = index
+        elif len(groups) < limit:
+            groups.append({"source": hit.get("source"), "first": index, "last": index, "parts": [hit]})
+    return [_merged_hit(group["parts"], max_overlap) for group in groups]
+
+
+def _merged_hit(parts: list[dict[str, Any]], max_overlap: int) -> dict[str, Any]:
+    if len(parts) == 1:
+        return parts[0]
+    best = min(parts, key=lambda part: part.get("distance") if part.get("distance") is not None else np.inf)
+    content = parts[0]["content"]
+    for part in parts[1:]:
+        content = _join_overlapping(content, part["content"], max_overlap)
+    merged = {**best, "content": content, "chunk_index": parts[0]["chunk_index"]}
+    merged["chunk_indexes"] = [part["chunk_index"] for part in parts]
+    distances = [part["distance"] for part in parts if part.get("distance") is not None]
+    if distances:
+        merged["distance"] = min(distances)
+    scores = [part["score"] for part in parts if part.get("score") is not None]
+    if scores:
+        merged["score"] = max(scores)
+    return merged
+
+
+def _join_overlapping(left: str, right: str, max_overlap: int) -> str:
+    for size in range(min(len(left), len(right), max_overlap), MIN_MERGE_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left}\n{right}"
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
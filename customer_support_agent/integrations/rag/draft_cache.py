@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from typing import Any, Callable
+
+from customer_support_agent.core.settings import Settings
+
+NAME_PLACEHOLDER = "{customer_name}"
+EMAIL_PLACEHOLDER = "{customer_email}"
+
+
+def ticket_cache_text(subject: str, description: str) -> str:
+    return f"{subject}\n{description}"
+
+
+def templatize_draft(draft: str, customer_name: str | None, customer_email: str | None) -> str:
+    """Replace the accepting customer's identifiers with placeholders."""
+    template = draft.replace("{", "{{").replace("}", "}}")
+    if customer_email:
+        template = re.sub(re.escape(customer_email), EMAIL_PLACEHOLDER, template, flags=re.IGNORECASE)
+    names = [customer_name.strip()] if customer_name and customer_name.strip() else []
+    if names and " " in names[0]:
+        names.append(names[0].split()[0])
+    for name in names:
+        template = re.sub(rf"\b{re.escape(name)}\b", NAME_PLACEHOLDER, template)
+    return template
+
+
+def draft_fingerprint(draft: str) -> str:
+    return hashlib.sha1(draft.encode("utf-8")).hexdigest()
+
+
+def personalize_draft(template: str, customer: dict[str, Any]) -> str:
+    return template.format(
+        customer_name=customer.get("name") or "there",
+        customer_email=customer.get("email") or "",
+    )
+
+
+class DraftCache:
+    """Accepted drafts indexed by the embedding of their ticket text.
+
+    Stored in a cosine-space Chroma collection beside the knowledge base, so a
+    new ticket whose ``subject + description`` is within ``threshold``
+    similarity of an accepted one can reuse that reply without an LLM call.
+    Customer names and emails are stored as placeholders and filled in for
+    the new customer on a hit.
+
+    A reply can carry order numbers, amounts or account details, so it is
+    only offered within ``scope``: to the customer who accepted it, or also
+    to customers of the same company. Entries expire after ``ttl_s`` (0
+    keeps them), when ``kb_version`` no longer returns the version they were
+    accepted under, or when ``is_current`` reports that the source draft was
+    edited or is no longer accepted; expired entries are deleted on lookup.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        collection_name: str,
+        embed: Callable[[list[str]], list[list[float]]],
+        threshold: float,
+        scope: str = "customer",
+        ttl_s: float = 0.0,
+        kb_version: Callable[[], str] | None = None,
+        is_current: Callable[[dict[str, Any]], bool] | None = None,
+    ):
+        self._embed = embed
+        self._threshold = threshold
+        self._scope = scope
+        self._ttl_s = ttl_s
+        self._kb_version = kb_version
+        self._is_current = is_current
+        self._collection = client.get_or_create_collection(
+            name=collection_name,
+            embedding_function=None,
+            metadata={"hnsw:space": "cosine"},
+        )
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    def add(
+        self,
+        draft_id: int,
+        ticket_id: int,
+        subject: str,
+        description: str,
+        draft: str,
+        customer_name: str | None,
+        customer_email: str | None,
+        customer_company: str | None = None,
+    ) -> None:
+        text = ticket_cache_text(subject, description)
+        metadata: dict[str, Any] = {
+            "draft_id": draft_id,
+            "ticket_id": ticket_id,
+            "template": templatize_draft(draft, customer_name, customer_email),
+            "draft_sha1": draft_fingerprint(draft),
+            "customer_email": _normalize(customer_email),
+            "accepted_at": time.time(),
+        }
+        # Chroma metadata cannot hold None, so a missing company is left out
+        # and never matches a company-scoped lookup.
+        if _normalize(customer_company):
+            metadata["customer_company"] = _normalize(customer_company)
+        if self._kb_version is not None:
+            metadata["kb_version"] = self._kb_version()
+        self._collection.upsert(
+            ids=[_entry_id(draft_id)],
+            embeddings=self._embed([text]),
+            documents=[text],
+            metadatas=[metadata],
+        )
+
+    def remove(self, draft_id: int) -> None:
+        self._collection.delete(ids=[_entry_id(draft_id)])
+
+    def lookup(self, ticket: dict[str, Any], customer: dict[str, Any]) -> dict[str, Any]:
+        """Return ``{"hit": bool, "similarity": ..., ...}``; hits carry the personalised ``draft``."""
+        miss = {"hit": False, "similarity": None, "threshold": self._threshold}
+        where = self._where(customer)
+        if where is None or self._collection.count() == 0:
+            return miss
+
+        results = self._collection.query(
+            query_embeddings=self._embed([ticket_cache_text(ticket["subject"], ticket["description"])]),
+            n_results=1,
+            where=where,
+            include=["metadatas", "distances"],
+        )
+        metadatas = (results.get("metadatas") or [[]])[0]
+        if not metadatas:
+            return miss
+        metadata = metadatas[0]
+        distance = (results.get("distances") or [[]])[0][0]
+        similarity = round(1.0 - float(distance), 4)
+        info: dict[str, Any] = {
+            "hit": similarity >= self._threshold,
+            "similarity": similarity,
+            "threshold": self._threshold,
+            "source_ticket_id": metadata.get("ticket_id"),
+            "source_draft_id": metadata.get("draft_id"),
+        }
+        if info["hit"] and self._is_current is not None and not self._is_current(metadata):
+            self.remove(int(metadata["draft_id"]))
+            info.update(hit=False, stale=True)
+        if info["hit"]:
+            info["draft"] = personalize_draft(str(metadata.get("template") or ""), customer)
+        return info
+
+    def _where(self, customer: dict[str, Any]) -> dict[str, Any] | None:
+        email = _normalize(customer.get("email"))
+        company = _normalize(customer.get("company"))
+        if not email:
+            return None
+        scope: dict[str, Any] = {"customer_email": email}
+        if self._scope == "company" and company:
+            scope = {"$or": [scope, {"customer_company": company}]}
+
+        clauses = [scope]
+        if self._ttl_s:
+            clauses.append({"accepted_at": {"$gte": time.time() - self._ttl_s}})
+        if self._kb_version is not None:
+            clauses.append({"kb_version": self._kb_version()})
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def count(self) -> int:
+        return self._collection.count()
+
+
+def build_draft_cache(
+    settings: Settings,
+    knowledge_base: Any,
+    is_current: Callable[[dict[str, Any]], bool] | None = None,
+) -> DraftCache | None:
+    """Draft cache sharing the knowledge base's Chroma client and embedder, or None when disabled."""
+    if not settings.draft_cache_enabled:
+        return None
+    return DraftCache(
+        client=knowledge_base.client,
+        collection_name=f"{knowledge_base.collection_name}_draft_cache",
+        embed=knowledge_base.embed_queries,
+        threshold=settings.draft_cache_threshold,
+        scope=settings.draft_cache_scope,
+        ttl_s=settings.draft_cache_ttl_s,
+        kb_version=knowledge_base.kb_version,
+        is_current=is_current,
+    )
+
+
+def _entry_id(draft_id: int) -> str:
+    return f"draft-{draft_id}"
+
+
+def _normalize(value: str | None) -> str:
+    return str(value or "").strip().lower()
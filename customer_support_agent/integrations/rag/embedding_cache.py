@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from customer_support_agent.core.settings import Settings
+
+Vector = list[float]
+
+
+def normalize_query_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU of query embeddings, written through to a small SQLite file.
+
+    Entries are keyed by ``(model, sha256(normalized text))``. Rows written for
+    any other model are purged on open, so switching the embedding model
+    invalidates the cache without manual cleanup.
+    """
+
+    def __init__(self, path: Path, model: str, max_entries: int):
+        self._path = path
+        self._model = model
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, Vector] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS query_embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        with self._conn:
+            self._conn.execute("DELETE FROM query_embeddings WHERE model != ?", (model,))
+        self._load()
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def _load(self) -> None:
+        rows = self._conn.execute(
+            """
+            SELECT text_hash, vector
+            FROM query_embeddings
+            WHERE model = ?
+            ORDER BY created_at DESC
+            LIMIT ?
+            """,
+            (self._model, self._max_entries),
+        ).fetchall()
+        for text_hash, blob in reversed(rows):
+            self._entries[text_hash] = self._decode(blob)
+
+    def _key(self, normalized: str) -> str:
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(vector: Any) -> bytes:
+        return array("f", (float(value) for value in vector)).tobytes()
+
+    @staticmethod
+    def _decode(blob: bytes) -> Vector:
+        values = array("f")
+        values.frombytes(blob)
+        return values.tolist()
+
+    def embed(self, texts: Sequence[str], embed_fn: Callable[[list[str]], Any]) -> list[Vector]:
+        """Return embeddings for ``texts``, calling ``embed_fn`` once for all misses."""
+        normalized = [normalize_query_text(text) for text in texts]
+        keys = [self._key(text) for text in normalized]
+        vectors: list[Vector | None] = []
+        missing: dict[str, str] = {}
+
+        with self._lock:
+            for key, text in zip(keys, normalized):
+                cached = self._entries.get(key)
+                if cached is not None:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                else:
+                    self._misses += 1
+                    missing.setdefault(key, text)
+                vectors.append(cached)
+
+        if missing:
+            embedded = embed_fn(list(missing.values()))
+            fresh = {key: [float(value) for value in vector] for key, vector in zip(missing, embedded)}
+            self._store(fresh)
+            vectors = [vector if vector is not None else fresh[key] for key, vector in zip(keys, vectors)]
+
+        return [vector for vector in vectors if vector is not None]
+
+    def _store(self, fresh: dict[str, Vector]) -> None:
+        with self._lock:
+            for key, vector in fresh.items():
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            evicted: list[str] = []
+            while len(self._entries) > self._max_entries:
+                key, _ = self._entries.popitem(last=False)
+                evicted.append(key)
+
+            with self._conn:
+                now = time.time()
+                self._conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO query_embeddings (model, text_hash, vector, created_at)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    [(self._model, key, self._encode(vector), now) for key, vector in fresh.items()],
+                )
+                if evicted:
+                    self._conn.executemany(
+                        "DELETE FROM query_embeddings WHERE model = ? AND text_hash = ?",
+                        [(self._model, key) for key in evicted],
+                    )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            with self._conn:
+                self._conn.execute("DELETE FROM query_embeddings")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "model": self._model,
+                "path": str(self._path),
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def embedding_model_id(settings: Settings) -> str:
+    if settings.google_api_key:
+        return f"gemini:{settings.effective_google_embedding_model}"
+    return "chroma-default:all-MiniLM-L6-v2"
+
+
+_caches: dict[tuple[Path, str], QueryEmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_query_embedding_cache(settings: Settings) -> QueryEmbeddingCache | None:
+    """Process-wide cache for the configured embedding model, or None when disabled."""
+    if not settings.embedding_cache_enabled:
+        return None
+
+    key = (settings.embedding_cache_file, embedding_model_id(settings))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            for stale_key in [item for item in _caches if item[0] == key[0]]:
+                _caches.pop(stale_key).close()
+            cache = QueryEmbeddingCache(
+                path=key[0],
+                model=key[1],
+                max_entries=settings.embedding_cache_max_entries,
+            )
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+KB_SUFFIXES = (".md", ".txt")
+
+
+def snapshot_directory(directory: Path) -> dict[str, tuple[int, int]]:
+    """Map each knowledge-base file to ``(mtime_ns, size)`` for cheap change detection."""
+    snapshot: dict[str, tuple[int, int]] = {}
+    if not directory.is_dir():
+        return snapshot
+    for path in directory.iterdir():
+        if path.suffix in KB_SUFFIXES and path.is_file():
+            stat = path.stat()
+            snapshot[path.name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class KnowledgeBaseWatcher:
+    """Background thread that re-runs the incremental ingest when ``directory`` changes.
+
+    ``poll`` compares directory snapshots every ``interval_s`` seconds;
+    ``inotify`` blocks on filesystem events via the optional ``watchfiles``
+    package. Either way the ingest itself is manifest-driven, so a spurious
+    trigger only costs a few file hashes.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ingest: Callable[[], dict[str, Any]],
+        logger: logging.Logger,
+        mode: str = "poll",
+        interval_s: float = 2.0,
+        debounce_s: float = 0.5,
+    ):
+        if mode not in {"poll", "inotify"}:
+            raise ValueError(f"Unsupported watch mode: {mode}")
+        self._directory = directory
+        self._ingest = ingest
+        self._logger = logger
+        self._mode = mode
+        self._interval_s = max(0.1, interval_s)
+        self._debounce_s = max(0.0, debounce_s)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_result: dict[str, Any] | None = None
+        self._runs = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        if self._mode == "inotify":
+            try:
+                import watchfiles  # noqa: F401
+            except ImportError as exc:
+                raise RuntimeError(
+                    "KB_WATCH_MODE=inotify requires the `watchfiles` package; use `poll` instead."
+                ) from exc
+        self._stop.clear()
+        target = self._watch_events if self._mode == "inotify" else self._watch_poll
+        self._thread = threading.Thread(target=target, name=f"kb-watcher-{self._mode}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self._mode,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "runs": self._runs,
+            "last_result": self._last_result,
+        }
+
+    def sync(self) -> dict[str, Any] | None:
+        try:
+            result = self._ingest()
+        except Exception:
+            self._logger.exception("Knowledge-base sync failed")
+            return None
+        self._runs += 1
+        self._last_result = result
+        if result.get("chunks_added") or result.get("chunks_deleted"):
+            self._logger.info(
+                "Knowledge base synced: %s chunks added, %s deleted",
+                result.get("chunks_added"),
+                result.get("chunks_deleted"),
+            )
+        return result
+
+    def _watch_poll(self) -> None:
+        previous = snapshot_directory(self._directory)
+        self.sync()
+        while not self._stop.wait(timeout=self._interval_s):
+            current = snapshot_directory(self._directory)
+            if current == previous:
+                continue
+            # Let editors finish writing before hashing the files.
+            if self._stop.wait(timeout=self._debounce_s):
+                break
+            previous = snapshot_directory(self._directory)
+            self.sync()
+
+    def _watch_events(self) -> None:
+        from watchfiles import watch
+
+        self.sync()
+        for changes in watch(
+            self._directory,
+            stop_event=self._stop,
+            debounce=int(self._debounce_s * 1000),
+            watch_filter=lambda _change, path: path.endswith(KB_SUFFIXES),
+        ):
+            if changes:
+                self.sync()
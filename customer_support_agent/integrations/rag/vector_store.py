@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Protocol, Sequence
+
+import numpy as np
+
+EmbedFn = Callable[[list[str]], Sequence[Sequence[float]]]
+
+
+class VectorStore(Protocol):
+    """Storage used by ``KnowledgeBaseService`` for chunk vectors and metadata."""
+
+    name: str
+
+    def ids(self) -> set[str]: ...
+
+    def count(self) -> int: ...
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict[str, Any]]) -> None: ...
+
+    def update_metadatas(self, ids: list[str], metadatas: list[dict[str, Any]]) -> None: ...
+
+    def delete(self, ids: list[str]) -> None: ...
+
+    def query(self, embedding: Sequence[float], top_k: int) -> list[dict[str, Any]]: ...
+
+    def query_many(self, embeddings: Sequence[Sequence[float]], top_k: int) -> list[list[dict[str, Any]]]: ...
+
+    def embeddings(self, ids: list[str]) -> dict[str, np.ndarray]: ...
+
+    def reset(self) -> None: ...
+
+
+class ChromaVectorStore:
+    def __init__(self, client: Any, name: str, embedding_function: Any):
+        self.name = name
+        self._client = client
+        self._embedding_function = embedding_function
+        self._collection = self._open()
+
+    def _open(self) -> Any:
+        return self._client.get_or_create_collection(name=self.name, embedding_function=self._embedding_function)
+
+    def ids(self) -> set[str]:
+        return set(self._collection.get(include=[])["ids"])
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict[str, Any]]) -> None:
+        self._collection.upsert(documents=documents, ids=ids, metadatas=metadatas)
+
+    def upsert_embeddings(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        """Upsert precomputed vectors in batches Chroma accepts; used by benchmarks."""
+        batch = self._client.get_max_batch_size()
+        for start in range(0, len(ids), batch):
+            end = start + batch
+            self._collection.upsert(
+                ids=ids[start:end],
+                embeddings=np.asarray(vectors[start:end], dtype=np.float32),
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+            )
+
+    def update_metadatas(self, ids: list[str], metadatas: list[dict[str, Any]]) -> None:
+        """Replace the metadata of stored chunks without re-embedding them."""
+        self._collection.update(ids=ids, metadatas=metadatas)
+
+    def delete(self, ids: list[str]) -> None:
+        self._collection.delete(ids=ids)
+
+    def query(self, embedding: Sequence[float], top_k: int) -> list[dict[str, Any]]:
+        return self.query_many([embedding], top_k)[0]
+
+    def query_many(self, embeddings: Sequence[Sequence[float]], top_k: int) -> list[list[dict[str, Any]]]:
+        """Top-k matches for each embedding, from a single ``collection.query`` call."""
+        if not len(embeddings):
+            return []
+        results = self._collection.query(
+            query_embeddings=[np.asarray(embedding, dtype=np.float32) for embedding in embeddings],
+            n_results=top_k,
+            include=["documents", "metadatas", "distances"],
+        )
+        columns = [
+            results.get(key) or [[] for _ in embeddings] for key in ("ids", "documents", "metadatas", "distances")
+        ]
+        matches = []
+        for ids, documents, metadatas, distances in zip(*columns):
+            metadatas, distances = metadatas or [], distances or []
+            matches.append(
+                [
+                    {
+                        "id": ids[i] if i < len(ids) else None,
+                        "document": document,
+                        "metadata": metadatas[i] if i < len(metadatas) else {},
+                        "distance": distances[i] if i < len(distances) else None,
+                    }
+                    for i, document in enumerate(documents)
+                ]
+            )
+        return matches
+
+    def embeddings(self, ids: list[str]) -> dict[str, np.ndarray]:
+        if not ids:
+            return {}
+        rows = self._collection.get(ids=ids, include=["embeddings"])
+        return {
+            chunk_id: np.asarray(vector, dtype=np.float32)
+            for chunk_id, vector in zip(rows["ids"], rows["embeddings"])
+        }
+
+    def reset(self) -> None:
+        self._client.delete_collection(name=self.name)
+        self._collection = self._open()
+
+
+@dataclass(frozen=True)
+class _Generation:
+    """One immutable matrix + sidecar pair, swapped in as a whole."""
+
+    name: str | None
+    matrix: np.ndarray
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[dict[str, Any]]
+
+
+_EMPTY_GENERATION = _Generation(None, np.zeros((0, 0), dtype=np.float32), [], [], [])
+
+
+class NumpyVectorStore:
+    """Chunk vectors in a memory-mapped float32 ``.npy`` matrix plus a JSON sidecar.
+
+    Rows are L2-normalised at write time, so a query is a single mat-vec
+    product followed by ``argpartition`` for the top-k; ``distance`` is cosine
+    distance (``1 - similarity``).
+
+    Each write creates a new generation: a matrix and a sidecar under a fresh
+    name that are never modified afterwards. A small pointer file naming the
+    current generation is then swapped in with ``os.replace``. Readers
+    compare the pointer with the generation they hold, so every
+    ``KnowledgeBaseService`` instance sees the latest ingest, and a reader
+    can only pair a sidecar with the matrix written alongside it.
+    """
+
+    _LOAD_ATTEMPTS = 5
+
+    def __init__(self, directory: Path, name: str, embed_documents: EmbedFn):
+        self.name = name
+        self._directory = directory
+        self._pointer_path = directory / f"{name}.current"
+        self._embed_documents = embed_documents
+        self._lock = threading.Lock()
+        self._generation = _EMPTY_GENERATION
+        directory.mkdir(parents=True, exist_ok=True)
+        self._migrate_unversioned()
+        self._refresh()
+
+    def _migrate_unversioned(self) -> None:
+        """Move a store written before generations existed into the first generation."""
+        matrix_path = self._directory / f"{self.name}.f32.npy"
+        meta_path = self._directory / f"{self.name}.meta.json"
+        if self._pointer_path.exists() or not meta_path.exists():
+            return
+        sidecar = json.loads(meta_path.read_text(encoding="utf-8"))
+        if sidecar["ids"]:
+            matrix = np.load(matrix_path)
+            if matrix.shape[0] == len(sidecar["ids"]):
+                self._write(matrix, sidecar["ids"], sidecar["documents"], sidecar["metadatas"])
+        matrix_path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+
+    def _matrix_path(self, generation: str) -> Path:
+        return self._directory / f"{self.name}.{generation}.f32.npy"
+
+    def _meta_path(self, generation: str) -> Path:
+        return self._directory / f"{self.name}.{generation}.meta.json"
+
+    def _current_name(self) -> str | None:
+        try:
+            return self._pointer_path.read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self) -> None:
+        if self._current_name() == self._generation.name:
+            return
+        with self._lock:
+            for _ in range(self._LOAD_ATTEMPTS):
+                name = self._current_name()
+                if name == self._generation.name:
+                    return
+                generation = self._load(name)
+                if generation is not None:
+                    self._generation = generation
+                    return
+        raise RuntimeError(f"Vector store {self.name} changed while loading; no consistent generation found.")
+
+    def _load(self, name: str | None) -> _Generation | None:
+        """Load generation ``name``, or None if a writer removed it or its files disagree."""
+        if name is None:
+            return _EMPTY_GENERATION
+        try:
+            sidecar = json.loads(self._meta_path(name).read_text(encoding="utf-8"))
+            ids = sidecar["ids"]
+            matrix = np.load(self._matrix_path(name), mmap_mode="r") if ids else _EMPTY_GENERATION.matrix
+        except FileNotFoundError:
+            return None
+        if sidecar.get("generation") != name or len(ids) != matrix.shape[0]:
+            return None
+        return _Generation(name, matrix, ids, sidecar["documents"], sidecar["metadatas"])
+
+    def _write(
+        self,
+        matrix: np.ndarray,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        previous = self._generation.name
+        name = f"{time.time_ns():x}-{uuid.uuid4().hex[:8]}"
+        with open(self._matrix_path(name), "wb") as handle:
+            np.save(handle, np.ascontiguousarray(matrix, dtype=np.float32))
+        self._meta_path(name).write_text(
+            json.dumps({"generation": name, "ids": ids, "documents": documents, "metadatas": metadatas}),
+            encoding="utf-8",
+        )
+        self._swap_pointer(name)
+        self._refresh()
+        self._remove_generation(previous)
+
+    def _swap_pointer(self, name: str | None) -> None:
+        if name is None:
+            self._pointer_path.unlink(missing_ok=True)
+            return
+        pointer_tmp = self._pointer_path.with_name(f"{self._pointer_path.name}.tmp")
+        pointer_tmp.write_text(name, encoding="utf-8")
+        os.replace(pointer_tmp, self._pointer_path)
+
+    def _remove_generation(self, name: str | None) -> None:
+        # Readers that already mapped the matrix keep it; ones that have not retry on the new pointer.
+        if name is not None:
+            self._matrix_path(name).unlink(missing_ok=True)
+            self._meta_path(name).unlink(missing_ok=True)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def ids(self) -> set[str]:
+        self._refresh()
+        return set(self._generation.ids)
+
+    def count(self) -> int:
+        self._refresh()
+        return len(self._generation.ids)
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict[str, Any]]) -> None:
+        if not ids:
+            return
+        vectors = self._normalize(np.asarray(self._embed_documents(list(documents)), dtype=np.float32))
+        self.upsert_embeddings(ids, vectors, documents, metadatas)
+
+    def upsert_embeddings(
+        self,
+        ids: list[str],
+        vectors: np.ndarray,
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        """Upsert precomputed (already normalised) vectors; used by ``upsert`` and benchmarks."""
+        self._refresh()
+        current = self._generation
+        replaced = set(ids)
+        keep = [index for index, chunk_id in enumerate(current.ids) if chunk_id not in replaced]
+        existing = np.asarray(current.matrix[keep], dtype=np.float32) if keep else None
+        matrix = np.vstack([existing, vectors]) if existing is not None else np.asarray(vectors, dtype=np.float32)
+        self._write(
+            matrix,
+            [current.ids[index] for index in keep] + list(ids),
+            [current.documents[index] for index in keep] + list(documents),
+            [current.metadatas[index] for index in keep] + list(metadatas),
+        )
+
+    def update_metadatas(self, ids: list[str], metadatas: list[dict[str, Any]]) -> None:
+        """Replace the metadata of stored chunks without re-embedding them."""
+        self._refresh()
+        current = self._generation
+        stored = set(current.ids)
+        updates = {chunk_id: metadata for chunk_id, metadata in zip(ids, metadatas) if chunk_id in stored}
+        if not updates:
+            return
+        self._write(
+            np.asarray(current.matrix, dtype=np.float32),
+            list(current.ids),
+            list(current.documents),
+            [updates.get(chunk_id, metadata) for chunk_id, metadata in zip(current.ids, current.metadatas)],
+        )
+
+    def delete(self, ids: list[str]) -> None:
+        self._refresh()
+        current = self._generation
+        removed = set(ids)
+        keep = [index for index, chunk_id in enumerate(current.ids) if chunk_id not in removed]
+        if len(keep) == len(current.ids):
+            return
+        matrix = np.asarray(current.matrix[keep], dtype=np.float32) if keep else _EMPTY_GENERATION.matrix
+        self._write(
+            matrix,
+            [current.ids[index] for index in keep],
+            [current.documents[index] for index in keep],
+            [current.metadatas[index] for index in keep],
+        )
+
+    def query(self, embedding: Sequence[float], top_k: int) -> list[dict[str, Any]]:
+        return self.query_many([embedding], top_k)[0]
+
+    def query_many(self, embeddings: Sequence[Sequence[float]], top_k: int) -> list[list[dict[str, Any]]]:
+        """Top-k matches for each embedding from one mat-mat product over the mapped matrix."""
+        self._refresh()
+        current = self._generation
+        matrix, ids, documents, metadatas = current.matrix, current.ids, current.documents, current.metadatas
+        if not ids or top_k <= 0:
+            return [[] for _ in embeddings]
+
+        queries = self._normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1))
+        all_scores = matrix @ queries.T
+        k = min(top_k, len(ids))
+        matches = []
+        for column in range(len(embeddings)):
+            scores = all_scores[:, column]
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(ids) else np.arange(len(ids))
+            top = top[np.argsort(-scores[top])]
+            matches.append(
+                [
+                    {
+                        "id": ids[index],
+                        "document": documents[index],
+                        "metadata": metadatas[index],
+                        "distance": round(1.0 - float(scores[index]), 6),
+                    }
+                    for index in top
+                ]
+            )
+        return matches
+
+    def embeddings(self, ids: list[str]) -> dict[str, np.ndarray]:
+        self._refresh()
+        matrix, stored_ids = self._generation.matrix, self._generation.ids
+        positions = {chunk_id: index for index, chunk_id in enumerate(stored_ids)}
+        return {
+            chunk_id: np.asarray(matrix[positions[chunk_id]], dtype=np.float32)
+            for chunk_id in ids
+            if chunk_id in positions
+        }
+
+    def reset(self) -> None:
+        previous = self._current_name()
+        self._swap_pointer(None)
+        self._refresh()
+        self._remove_generation(previous)
@@ -7,7 +7,8 @@ from typing import Any
 from langchain_core.tools import tool
 
 from customer_support_agent.repositories.sqlite.customers import CustomersRepository
-from customer_support_agent.repositories.sqlite.tickets import TicketsRepository
+
+_customers_repo = CustomersRepository()
 
 
 def _stable_bucket(email: str, size: int) -> int:
@@ -56,10 +57,7 @@ def lookup_customer_plan(customer_email: str) -> str:
 @tool
 def lookup_open_ticket_load(customer_email: str) -> str:
     """Return open ticket count and load band for a customer email."""
-    customers_repo = CustomersRepository()
-    tickets_repo = TicketsRepository()
-
-    customer = customers_repo.get_by_email(customer_email)
+    customer = _customers_repo.get_by_email(customer_email)
     if not customer:
         return _json(
             {
@@ -75,7 +73,7 @@ def lookup_open_ticket_load(customer_email: str) -> str:
             }
         )
 
-    open_count = tickets_repo.count_open_for_customer(customer_email)
+    open_count = int(customer["open_ticket_count"])
     return _json(
         {
             "tool": "lookup_open_ticket_load",
@@ -2,9 +2,16 @@ from __future__ import annotations
 
 from typing import Any
 
-from customer_support_agent.repositories.sqlite.base import init_db
+from customer_support_agent.repositories.sqlite.base import (
+    SQLiteConnectionPool,
+    close_pool,
+    configure_pool,
+    get_pool,
+    init_db,
+)
 from customer_support_agent.repositories.sqlite.customers import CustomersRepository
 from customer_support_agent.repositories.sqlite.drafts import DraftsRepository
+from customer_support_agent.repositories.sqlite.jobs import JobsRepository
 from customer_support_agent.repositories.sqlite.tickets import TicketsRepository
 
 _customers = CustomersRepository()
@@ -22,6 +29,10 @@ def get_customer_by_id(customer_id: int) -> dict[str, Any] | None:
 def get_customer_by_email(email: str) -> dict[str, Any] | None:
     return _customers.get_by_email(email)
 
+
+def get_customer_ticket_stats(customer_id: int) -> dict[str, Any] | None:
+    return _customers.get_ticket_stats(customer_id)
+
 def create_ticket(
     customer_id: int,
     subject: str,
@@ -38,8 +49,8 @@ def create_ticket(
     )
 
 
-def list_tickets(limit: int = 100) -> list[dict[str, Any]]:
-    return _tickets.list(limit=limit)
+def list_tickets(limit: int = 100, **filters: Any) -> list[dict[str, Any]]:
+    return _tickets.list(limit=limit, **filters)
 
 
 def get_ticket_by_id(ticket_id: int) -> dict[str, Any] | None:
@@ -86,10 +97,16 @@ __all__ = [
     "CustomersRepository",
     "TicketsRepository",
     "DraftsRepository",
+    "JobsRepository",
+    "SQLiteConnectionPool",
+    "configure_pool",
+    "get_pool",
+    "close_pool",
     "init_db",
     "create_or_get_customer",
     "get_customer_by_id",
     "get_customer_by_email",
+    "get_customer_ticket_stats",
     "create_ticket",
     "list_tickets",
     "get_ticket_by_id",
@@ -1,65 +1,218 @@
 from __future__ import annotations
 
+import queue
 import sqlite3
-from typing import Any
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
+from typing import Any, Iterator
 
-from customer_support_agent.core.settings import ensure_directories, get_settings
+from customer_support_agent.core.settings import Settings, ensure_directories, get_settings
+from customer_support_agent.repositories.sqlite.migrations import run_migrations
 
 
-def connect() -> sqlite3.Connection:
-    settings = get_settings()
-    ensure_directories(settings)
-    
-    conn = sqlite3.connect(str(settings.db_file), check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+class SQLiteConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections for one database file.
+
+    Connections are opened lazily up to ``size`` and handed out one thread at a
+    time, so PRAGMAs and the per-connection statement cache survive across
+    repository calls instead of being rebuilt for every query.
+    """
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self._db_file = settings.db_file
+        self._size = max(1, settings.sqlite_pool_size)
+        self._timeout = settings.sqlite_pool_timeout_s
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._journal_mode = ""
+
+        self._created = 0
+        self._in_use = 0
+        self._acquisitions = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._timeouts = 0
+
+    @property
+    def db_file(self) -> Path:
+        return self._db_file
+
+    def _open(self) -> sqlite3.Connection:
+        settings = self._settings
+        conn = sqlite3.connect(
+            str(self._db_file),
+            timeout=settings.sqlite_busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(f"PRAGMA journal_mode = {settings.sqlite_journal_mode}").fetchone()
+        self._journal_mode = str(row[0]) if row else ""
+        conn.execute(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages.
+        conn.execute(f"PRAGMA cache_size = {-abs(settings.sqlite_cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {max(0, settings.sqlite_mmap_size)}")
+        conn.execute(f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SQLite connection pool is closed.")
+            self._acquisitions += 1
+            create = self._idle.empty() and self._created < self._size
+            if create:
+                self._created += 1
+
+        if create:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            conn = self._wait_for_idle()
+
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def _wait_for_idle(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self._timeout)
+        except queue.Empty as exc:
+            with self._lock:
+                self._waits += 1
+                self._timeouts += 1
+                self._wait_seconds += time.perf_counter() - started
+            raise TimeoutError(
+                f"Timed out after {self._timeout}s waiting for a SQLite connection "
+                f"(pool size {self._size})."
+            ) from exc
+
+        with self._lock:
+            self._waits += 1
+            self._wait_seconds += time.perf_counter() - started
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._in_use -= 1
+            if self._closed:
+                self._created -= 1
+                conn.close()
+                return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; commit on success and roll back on error."""
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "db_file": str(self._db_file),
+                "size": self._size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "acquisitions": self._acquisitions,
+                "waits": self._waits,
+                "wait_ms_total": round(self._wait_seconds * 1000, 3),
+                "timeouts": self._timeouts,
+                "journal_mode": self._journal_mode,
+                "synchronous": self._settings.sqlite_synchronous,
+                "cache_size_kib": self._settings.sqlite_cache_size_kib,
+                "mmap_size": self._settings.sqlite_mmap_size,
+                "closed": self._closed,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+_pool: SQLiteConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(settings: Settings | None = None) -> SQLiteConnectionPool:
+    """Create (or replace) the process-wide pool shared by all repositories."""
+    global _pool
+    config = settings or get_settings()
+    ensure_directories(config)
+    with _pool_lock:
+        previous = _pool
+        _pool = SQLiteConnectionPool(config)
+    if previous is not None:
+        previous.close()
+    return _pool
+
+
+def get_pool() -> SQLiteConnectionPool:
+    global _pool
+    pool = _pool
+    if pool is not None:
+        return pool
+    with _pool_lock:
+        if _pool is None:
+            config = get_settings()
+            ensure_directories(config)
+            _pool = SQLiteConnectionPool(config)
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+def connect() -> AbstractContextManager[sqlite3.Connection]:
+    """Return a context manager yielding a pooled connection."""
+    return get_pool().connection()
+
 
 def row_to_dict(row: sqlite3.Row | None) -> dict[str, Any] | None:
     if row is None:
         return None
     return dict(row)
 
-def init_db() -> None:
+def init_db() -> list[int]:
+    """Bring the schema up to date; returns the migration versions applied."""
     with connect() as conn:
-        conn.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                name TEXT,
-                company TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_id INTEGER REFERENCES customers(id),
-                subject TEXT NOT NULL,
-                description TEXT NOT NULL,
-                status TEXT DEFAULT 'open',
-                priority TEXT DEFAULT 'medium',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TABLE IF NOT EXISTS drafts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                ticket_id INTEGER REFERENCES tickets(id),
-                content TEXT NOT NULL,
-                context_used TEXT,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-
-            CREATE TRIGGER IF NOT EXISTS tickets_updated_at_trigger
-            AFTER UPDATE ON tickets
-            FOR EACH ROW
-            BEGIN
-                UPDATE tickets
-                SET updated_at = CURRENT_TIMESTAMP
-                WHERE id = OLD.id;
-            END;
-
-            """ 
-        )
\ No newline at end of file
+        return run_migrations(conn)
@@ -44,5 +44,28 @@ class CustomersRepository:
 
     def get_by_email(self, email:str)-> dict[str,Any] | None:
         with connect() as conn:
-            row = conn.execute("SELECT * FROM customers WHERE id = ?", (email,)).fetchone()
-            return row_to_dict(row)
\ No newline at end of file
+            row = conn.execute("SELECT * FROM customers WHERE email = ?", (email,)).fetchone()
+            return row_to_dict(row)
+
+    def get_ticket_stats(self, customer_id: int) -> dict[str, Any] | None:
+        """Trigger-maintained ticket counts for one customer; a single primary-key read."""
+        with connect() as conn:
+            row = conn.execute(
+                """
+                SELECT id AS customer_id,
+                       email AS customer_email,
+                       total_ticket_count,
+                       open_ticket_count,
+                       resolved_ticket_count
+                FROM customers
+                WHERE id = ?
+                """,
+                (customer_id,),
+            ).fetchone()
+            stats = row_to_dict(row)
+        if stats is None:
+            return None
+        stats["other_ticket_count"] = (
+            stats["total_ticket_count"] - stats["open_ticket_count"] - stats["resolved_ticket_count"]
+        )
+        return stats
\ No newline at end of file
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Sequence
 
 from customer_support_agent.repositories.sqlite.base import connect, row_to_dict
 
@@ -25,7 +25,29 @@ class DraftsRepository:
             draft_id = cursor.lastrowid
             row = conn.execute("SELECT * FROM drafts WHERE id = ?", (draft_id,)).fetchone()
             return row_to_dict(row) or {}
-    
+
+    def create_many(self, drafts: Sequence[dict[str, Any]]) -> list[int]:
+        """Insert ``drafts`` (each with ``ticket_id``/``content``/``context_used``/``status``) in one transaction."""
+        if not drafts:
+            return []
+
+        with connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM drafts").fetchone()[0]
+            conn.executemany(
+                """
+                INSERT INTO drafts (ticket_id, content, context_used, status)
+                VALUES (?, ?, ?, ?)
+                """,
+                [
+                    (draft["ticket_id"], draft["content"], draft.get("context_used"), draft.get("status", "pending"))
+                    for draft in drafts
+                ],
+            )
+            return [
+                row["id"]
+                for row in conn.execute("SELECT id FROM drafts WHERE id > ? ORDER BY id", (last_id,))
+            ]
 
     def get_latest_for_ticket(self, ticket_id: int) -> dict[str, Any] | None:
         with connect() as conn:
@@ -34,7 +56,7 @@ class DraftsRepository:
                 SELECT *
                 FROM drafts
                 WHERE ticket_id = ?
-                ORDER BY created_at DESC
+                ORDER BY created_at DESC, id DESC
                 LIMIT 1
                 """,
                 (ticket_id,),
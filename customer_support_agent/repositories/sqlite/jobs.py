@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Sequence
+
+from customer_support_agent.repositories.sqlite.base import connect, row_to_dict
+
+# Lower values are claimed first; unknown priorities sort with "medium".
+TICKET_PRIORITY_RANK: dict[str, int] = {"urgent": 0, "high": 1, "medium": 2, "low": 3}
+
+
+def priority_rank(priority: str | None) -> int:
+    return TICKET_PRIORITY_RANK.get(str(priority or "medium").lower(), TICKET_PRIORITY_RANK["medium"])
+
+
+class JobsRepository:
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any] | None = None,
+        resource: str | None = None,
+        priority: int = TICKET_PRIORITY_RANK["medium"],
+        max_attempts: int = 3,
+    ) -> dict[str, Any]:
+        with connect() as conn:
+            row = conn.execute(
+                """
+                INSERT INTO jobs (kind, resource, payload, priority, max_attempts, available_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                RETURNING *
+                """,
+                (kind, resource, json.dumps(payload or {}), priority, max_attempts, time.time()),
+            ).fetchone()
+            return row_to_dict(row) or {}
+
+    def enqueue_many(self, kind: str, jobs: Sequence[dict[str, Any]], max_attempts: int = 3) -> list[int]:
+        """Insert ``jobs`` (each with ``payload``/``resource``/``priority``) in one transaction."""
+        if not jobs:
+            return []
+
+        now = time.time()
+        with connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM jobs").fetchone()[0]
+            conn.executemany(
+                """
+                INSERT INTO jobs (kind, resource, payload, priority, max_attempts, available_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        kind,
+                        job.get("resource"),
+                        json.dumps(job.get("payload") or {}),
+                        job.get("priority", TICKET_PRIORITY_RANK["medium"]),
+                        max_attempts,
+                        now,
+                    )
+                    for job in jobs
+                ],
+            )
+            return [
+                row["id"]
+                for row in conn.execute("SELECT id FROM jobs WHERE id > ? ORDER BY id", (last_id,))
+            ]
+
+    def get_by_id(self, job_id: int) -> dict[str, Any] | None:
+        with connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return row_to_dict(row)
+
+    def get_latest_for_resource(self, resource: str, kind: str | None = None) -> dict[str, Any] | None:
+        with connect() as conn:
+            if kind is None:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE resource = ? ORDER BY id DESC LIMIT 1",
+                    (resource,),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE resource = ? AND kind = ? ORDER BY id DESC LIMIT 1",
+                    (resource, kind),
+                ).fetchone()
+            return row_to_dict(row)
+
+    def count_pending(self, kind: str) -> int:
+        with connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running') AND kind = ?",
+                (kind,),
+            ).fetchone()
+            return int(row[0]) if row else 0
+
+    def claim(
+        self,
+        kinds: Sequence[str],
+        owner: str,
+        lease_seconds: float,
+        limit: int = 1,
+    ) -> list[dict[str, Any]]:
+        """Atomically lease up to ``limit`` due jobs, highest priority first."""
+        if not kinds:
+            return []
+
+        now = time.time()
+        placeholders = ", ".join("?" for _ in kinds)
+        with connect() as conn:
+            rows = conn.execute(
+                f"""
+                UPDATE jobs
+                SET status = 'running',
+                    attempts = attempts + 1,
+                    lease_owner = ?,
+                    lease_expires_at = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id IN (
+                    SELECT id
+                    FROM jobs
+                    WHERE status = 'queued'
+                      AND kind IN ({placeholders})
+                      AND available_at <= ?
+                    ORDER BY priority, id
+                    LIMIT ?
+                )
+                RETURNING *
+                """,
+                (owner, now + lease_seconds, *kinds, now, limit),
+            ).fetchall()
+            jobs = [dict(row) for row in rows]
+        return sorted(jobs, key=lambda job: (job["priority"], job["id"]))
+
+    def renew_leases(self, owner: str, lease_seconds: float) -> int:
+        with connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET lease_expires_at = ?
+                WHERE status = 'running' AND lease_owner = ?
+                """,
+                (time.time() + lease_seconds, owner),
+            )
+            return cursor.rowcount
+
+    def requeue_expired(self) -> int:
+        """Return jobs whose worker vanished to the queue, or fail them when out of attempts."""
+        with connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                    last_error = 'Lease expired before the job finished.',
+                    lease_owner = NULL,
+                    lease_expires_at = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE status = 'running' AND lease_expires_at < ?
+                """,
+                (time.time(),),
+            )
+            return cursor.rowcount
+
+    def complete(self, job_id: int, owner: str, result: dict[str, Any] | None = None) -> bool:
+        """Record success if ``owner`` still holds the lease; returns False when another worker took the job over."""
+        with connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'succeeded',
+                    result = ?,
+                    last_error = NULL,
+                    lease_owner = NULL,
+                    lease_expires_at = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND lease_owner = ?
+                """,
+                (json.dumps(result) if result is not None else None, job_id, owner),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, owner: str, error: str, retry_at: float | None = None) -> bool:
+        """Record a failed attempt; requeue at ``retry_at`` or fail permanently when it is None.
+
+        Like ``complete``, this only applies while ``owner`` holds the lease.
+        """
+        with connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = ?,
+                    available_at = COALESCE(?, available_at),
+                    last_error = ?,
+                    lease_owner = NULL,
+                    lease_expires_at = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND lease_owner = ?
+                """,
+                ("queued" if retry_at is not None else "failed", retry_at, error, job_id, owner),
+            )
+            return cursor.rowcount == 1
+
+    def update_result(self, job_id: int, result: dict[str, Any]) -> None:
+        with connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET result = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (json.dumps(result), job_id),
+            )
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        name="initial_schema",
+        sql="""
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            name TEXT,
+            company TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER REFERENCES customers(id),
+            subject TEXT NOT NULL,
+            description TEXT NOT NULL,
+            status TEXT DEFAULT 'open',
+            priority TEXT DEFAULT 'medium',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS drafts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id INTEGER REFERENCES tickets(id),
+            content TEXT NOT NULL,
+            context_used TEXT,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TRIGGER IF NOT EXISTS tickets_updated_at_trigger
+        AFTER UPDATE ON tickets
+        FOR EACH ROW
+        BEGIN
+            UPDATE tickets
+            SET updated_at = CURRENT_TIMESTAMP
+            WHERE id = OLD.id;
+        END;
+        """,
+    ),
+    Migration(
+        version=2,
+        name="hot_path_indexes",
+        sql="""
+        -- TicketsRepository.list: ordered scan that stops after LIMIT rows.
+        CREATE INDEX IF NOT EXISTS idx_tickets_created_at_id
+            ON tickets(created_at DESC, id DESC);
+
+        -- count_open_for_customer: covering index, the COUNT never touches the table.
+        CREATE INDEX IF NOT EXISTS idx_tickets_customer_status
+            ON tickets(customer_id, status);
+
+        -- DraftsRepository.get_latest_for_ticket: single index seek per ticket.
+        CREATE INDEX IF NOT EXISTS idx_drafts_ticket_created_id
+            ON drafts(ticket_id, created_at DESC, id DESC);
+
+        -- The trigger issued a second UPDATE (and index maintenance) for every
+        -- ticket update. Repositories now set updated_at in the same statement.
+        DROP TRIGGER IF EXISTS tickets_updated_at_trigger;
+        """,
+    ),
+    Migration(
+        version=3,
+        name="ticket_list_filter_indexes",
+        sql="""
+        -- Keyset pages of GET /api/tickets filtered by one column, newest first.
+        CREATE INDEX IF NOT EXISTS idx_tickets_status_created_id
+            ON tickets(status, created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_tickets_priority_created_id
+            ON tickets(priority, created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_tickets_customer_created_id
+            ON tickets(customer_id, created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_customers_company
+            ON customers(company);
+        """,
+    ),
+    Migration(
+        version=4,
+        name="jobs_table",
+        sql="""
+        -- Durable background work. Times used for scheduling are unix epoch seconds.
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            resource TEXT,
+            payload TEXT NOT NULL DEFAULT '{}',
+            priority INTEGER NOT NULL DEFAULT 2,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            last_error TEXT,
+            result TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_jobs_claim
+            ON jobs(status, kind, priority, id);
+        CREATE INDEX IF NOT EXISTS idx_jobs_lease
+            ON jobs(status, lease_expires_at);
+        CREATE INDEX IF NOT EXISTS idx_jobs_resource
+            ON jobs(resource, id DESC);
+        """,
+    ),
+    Migration(
+        version=5,
+        name="customer_ticket_counters",
+        sql="""
+        -- Denormalized per-customer ticket counts so the open-ticket tool and
+        -- /api/customers/{id}/stats read one row by key. Triggers keep them exact;
+        -- each ticket write pays one extra single-row UPDATE on customers.
+        ALTER TABLE customers ADD COLUMN total_ticket_count INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE customers ADD COLUMN open_ticket_count INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE customers ADD COLUMN resolved_ticket_count INTEGER NOT NULL DEFAULT 0;
+
+        UPDATE customers
+        SET total_ticket_count = (
+                SELECT COUNT(*) FROM tickets t WHERE t.customer_id = customers.id
+            ),
+            open_ticket_count = (
+                SELECT COUNT(*) FROM tickets t WHERE t.customer_id = customers.id AND t.status = 'open'
+            ),
+            resolved_ticket_count = (
+                SELECT COUNT(*) FROM tickets t WHERE t.customer_id = customers.id AND t.status = 'resolved'
+            );
+
+        CREATE TRIGGER IF NOT EXISTS tickets_counters_after_insert
+        AFTER INSERT ON tickets
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_ticket_count = total_ticket_count + 1,
+                open_ticket_count = open_ticket_count + (NEW.status IS 'open'),
+                resolved_ticket_count = resolved_ticket_count + (NEW.status IS 'resolved')
+            WHERE id = NEW.customer_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS tickets_counters_after_update
+        AFTER UPDATE OF status, customer_id ON tickets
+        FOR EACH ROW
+        WHEN OLD.status IS NOT NEW.status OR OLD.customer_id IS NOT NEW.customer_id
+        BEGIN
+            UPDATE customers
+            SET total_ticket_count = total_ticket_count - 1,
+                open_ticket_count = open_ticket_count - (OLD.status IS 'open'),
+                resolved_ticket_count = resolved_ticket_count - (OLD.status IS 'resolved')
+            WHERE id = OLD.customer_id;
+            UPDATE customers
+            SET total_ticket_count = total_ticket_count + 1,
+                open_ticket_count = open_ticket_count + (NEW.status IS 'open'),
+                resolved_ticket_count = resolved_ticket_count + (NEW.status IS 'resolved')
+            WHERE id = NEW.customer_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS tickets_counters_after_delete
+        AFTER DELETE ON tickets
+        FOR EACH ROW
+        BEGIN
+            UPDATE customers
+            SET total_ticket_count = total_ticket_count - 1,
+                open_ticket_count = open_ticket_count - (OLD.status IS 'open'),
+                resolved_ticket_count = resolved_ticket_count - (OLD.status IS 'resolved')
+            WHERE id = OLD.customer_id;
+        END;
+        """,
+    ),
+)
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()
+    return int(row[0]) if row else 0
+
+
+def _statements(sql: str) -> Iterator[str]:
+    """Split ``sql`` into complete statements, keeping trigger bodies whole."""
+    buffer = ""
+    for piece in sql.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip(" \t\n;"):
+                yield buffer.strip()
+            buffer = ""
+
+
+def run_migrations(
+    conn: sqlite3.Connection,
+    migrations: tuple[Migration, ...] = MIGRATIONS,
+    target_version: int | None = None,
+) -> list[int]:
+    """Apply pending migrations in order, each one in its own transaction.
+
+    Each transaction takes the write lock with ``BEGIN IMMEDIATE`` and re-reads
+    the schema version under it, so processes starting together apply every
+    migration exactly once. Returns the versions that were applied by this call.
+    """
+    applied: list[int] = []
+    version = current_version(conn)
+    if conn.in_transaction:
+        conn.commit()
+
+    for migration in sorted(migrations, key=lambda item: item.version):
+        if migration.version <= version:
+            continue
+        if target_version is not None and migration.version > target_version:
+            break
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            version = current_version(conn)
+            if migration.version <= version:
+                # Another process applied it while we waited for the lock.
+                conn.commit()
+                continue
+            for statement in _statements(migration.sql):
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
+                (migration.version, migration.name),
+            )
+            conn.commit()
+        except sqlite3.Error as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            raise RuntimeError(
+                f"Migration {migration.version} ({migration.name}) failed: {exc}"
+            ) from exc
+
+        applied.append(migration.version)
+
+    if applied:
+        conn.execute("PRAGMA optimize")
+    return applied
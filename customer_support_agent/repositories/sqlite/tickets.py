@@ -1,8 +1,41 @@
 from __future__ import annotations
 
-from typing import Any
+import base64
+import json
+from typing import Any, Sequence
 
 from customer_support_agent.repositories.sqlite.base import connect, row_to_dict
+from customer_support_agent.repositories.sqlite.jobs import TICKET_PRIORITY_RANK
+
+TICKET_LIST_FIELDS: dict[str, str] = {
+    "id": "t.id",
+    "customer_id": "t.customer_id",
+    "customer_email": "c.email",
+    "customer_name": "c.name",
+    "customer_company": "c.company",
+    "subject": "t.subject",
+    "description": "t.description",
+    "status": "t.status",
+    "priority": "t.priority",
+    "created_at": "t.created_at",
+    "updated_at": "t.updated_at",
+}
+CUSTOMER_FIELDS = frozenset({"customer_email", "customer_name", "customer_company"})
+
+
+def encode_ticket_cursor(ticket: dict[str, Any]) -> str:
+    raw = json.dumps([ticket["created_at"], ticket["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_ticket_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(created_at), int(ticket_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid ticket cursor.") from exc
+
 
 class TicketsRepository:
     def create(
@@ -25,21 +58,124 @@ class TicketsRepository:
             row = conn.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
             return row_to_dict(row) or {}
 
-    def list(self, limit: int = 100) -> list[dict[str, Any]]:
+    def create_many(self, items: Sequence[dict[str, Any]], chunk_size: int = 500) -> list[dict[str, Any]]:
+        """Upsert customers and insert tickets for ``items`` in a single transaction.
+
+        Each item carries ``customer_email``/``customer_name``/``customer_company``
+        plus the ticket columns. Returns ``{"id", "customer_id"}`` per item, in input order.
+        """
+        if not items:
+            return []
+
         with connect() as conn:
-            rows = conn.execute(
+            # Take the write lock up front so the id range read below is ours alone.
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
                 """
-                SELECT
-                    t.*,
-                    c.email AS customer_email,
-                    c.name AS customer_name,
-                    c.company AS customer_company
+                INSERT INTO customers (email, name, company) VALUES (?, ?, ?)
+                ON CONFLICT(email) DO UPDATE SET
+                    name = COALESCE(NULLIF(customers.name, ''), excluded.name),
+                    company = COALESCE(NULLIF(customers.company, ''), excluded.company)
+                """,
+                [
+                    (item["customer_email"], item.get("customer_name"), item.get("customer_company"))
+                    for item in items
+                ],
+            )
+
+            emails = list(dict.fromkeys(item["customer_email"] for item in items))
+            customer_ids: dict[str, int] = {}
+            for start in range(0, len(emails), chunk_size):
+                chunk = emails[start : start + chunk_size]
+                placeholders = ", ".join("?" for _ in chunk)
+                for row in conn.execute(
+                    f"SELECT id, email FROM customers WHERE email IN ({placeholders})",
+                    chunk,
+                ):
+                    customer_ids[row["email"]] = row["id"]
+
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tickets").fetchone()[0]
+            rows = [
+                (
+                    customer_ids[item["customer_email"]],
+                    item["subject"],
+                    item["description"],
+                    item.get("priority", "medium"),
+                    item.get("status", "open"),
+                )
+                for item in items
+            ]
+            conn.executemany(
+                """
+                INSERT INTO tickets (customer_id, subject, description, priority, status)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            ticket_ids = [
+                row["id"]
+                for row in conn.execute("SELECT id FROM tickets WHERE id > ? ORDER BY id", (last_id,))
+            ]
+
+        return [
+            {"id": ticket_id, "customer_id": row[0]}
+            for ticket_id, row in zip(ticket_ids, rows)
+        ]
+
+    def list(
+        self,
+        limit: int = 100,
+        cursor: tuple[str, int] | None = None,
+        status: str | None = None,
+        priority: str | None = None,
+        customer_id: int | None = None,
+        company: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return tickets newest first, one keyset page at a time.
+
+        ``cursor`` is the ``(created_at, id)`` of the last row of the previous
+        page. ``fields`` restricts the selected columns; ``id`` and
+        ``created_at`` are always included so the caller can build the next cursor.
+        """
+        selected = ["id", "created_at", *(fields or TICKET_LIST_FIELDS)]
+        columns = [name for name in TICKET_LIST_FIELDS if name in selected]
+        needs_customer = company is not None or any(name in CUSTOMER_FIELDS for name in columns)
+
+        clauses: list[str] = []
+        values: list[Any] = []
+        if cursor is not None:
+            clauses.append("(t.created_at, t.id) < (?, ?)")
+            values.extend(cursor)
+        if status is not None:
+            clauses.append("t.status = ?")
+            values.append(status)
+        if priority is not None:
+            clauses.append("t.priority = ?")
+            values.append(priority)
+        if customer_id is not None:
+            clauses.append("t.customer_id = ?")
+            values.append(customer_id)
+        if company is not None:
+            clauses.append("c.company = ?")
+            values.append(company)
+
+        select_sql = ", ".join(f"{TICKET_LIST_FIELDS[name]} AS {name}" for name in columns)
+        join_sql = "JOIN customers c ON c.id = t.customer_id" if needs_customer else ""
+        where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        values.append(limit)
+
+        with connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {select_sql}
                 FROM tickets t
-                JOIN customers c ON c.id = t.customer_id
-                ORDER BY t.created_at DESC
+                {join_sql}
+                {where_sql}
+                ORDER BY t.created_at DESC, t.id DESC
                 LIMIT ?
                 """,
-                (limit,),
+                values,
             ).fetchall()
             return [dict(row) for row in rows]
 
@@ -59,14 +195,64 @@ class TicketsRepository:
                 (ticket_id,),
             ).fetchone()
             return row_to_dict(row)
-    
+
+    def list_for_drafting(
+        self,
+        ticket_ids: Sequence[int] | None = None,
+        status: str | None = None,
+        priority: str | None = None,
+        limit: int = 1000,
+    ) -> list[dict[str, Any]]:
+        """Tickets with their customer columns in one JOIN query, most urgent first.
+
+        Rows have the shape of ``get_by_id``. ``ticket_ids`` is passed as one
+        JSON parameter, so the id list is not bound by SQLite's variable limit.
+        """
+        clauses: list[str] = []
+        values: list[Any] = []
+        if ticket_ids is not None:
+            clauses.append("t.id IN (SELECT value FROM json_each(?))")
+            values.append(json.dumps([int(ticket_id) for ticket_id in ticket_ids]))
+        if status is not None:
+            clauses.append("t.status = ?")
+            values.append(status)
+        if priority is not None:
+            clauses.append("t.priority = ?")
+            values.append(priority)
+
+        rank_sql = " ".join(f"WHEN '{name}' THEN {rank}" for name, rank in TICKET_PRIORITY_RANK.items())
+        where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        values.append(limit)
+
+        with connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT
+                    t.*,
+                    c.email AS customer_email,
+                    c.name AS customer_name,
+                    c.company AS customer_company
+                FROM tickets t
+                JOIN customers c ON c.id = t.customer_id
+                {where_sql}
+                ORDER BY CASE t.priority {rank_sql} ELSE {TICKET_PRIORITY_RANK['medium']} END, t.id
+                LIMIT ?
+                """,
+                values,
+            ).fetchall()
+            return [dict(row) for row in rows]
+
     def set_status(self, ticket_id: int, status: str) -> dict[str, Any] | None:
         with connect() as conn:
-            conn.execute("UPDATE tickets SET status = ? WHERE id = ?", (status, ticket_id))
+            conn.execute(
+                "UPDATE tickets SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (status, ticket_id),
+            )
             row = conn.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
             return row_to_dict(row)
 
     def count_open_for_customer(self, customer_email: str) -> int:
+        """Count open tickets from ``tickets`` itself; ``customers.open_ticket_count`` is the O(1) read."""
         with connect() as conn:
             row = conn.execute(
                 """
@@ -1,32 +1,44 @@
 from customer_support_agent.schemas.api import (
     CustomerMemoriesResponse,
     CustomerMemorySearchResponse,
+    CustomerStatsResponse,
     DraftHighlights,
     DraftResponse,
     DraftSignals,
     DraftToolCall,
     DraftUpdateRequest,
     GenerateDraftResponse,
+    JobResponse,
     KnowledgeIngestRequest,
     KnowledgeIngestResponse,
+    MemoryWriteStatus,
     StructuredDraftContext,
+    TicketBulkCreateRequest,
+    TicketBulkCreateResponse,
     TicketCreateRequest,
+    TicketListItem,
     TicketResponse,
 )
 
 
 __all__ = [
     "TicketCreateRequest",
+    "TicketBulkCreateRequest",
+    "TicketBulkCreateResponse",
     "TicketResponse",
+    "TicketListItem",
     "DraftSignals",
     "DraftHighlights",
     "DraftToolCall",
     "StructuredDraftContext",
+    "MemoryWriteStatus",
     "DraftResponse",
     "DraftUpdateRequest",
     "GenerateDraftResponse",
+    "JobResponse",
     "KnowledgeIngestRequest",
     "KnowledgeIngestResponse",
     "CustomerMemoriesResponse",
     "CustomerMemorySearchResponse",
+    "CustomerStatsResponse",
 ]
@@ -1,6 +1,6 @@
 from __future__ import annotations
-from typing import Any, Literal
-from pydantic import BaseModel, EmailStr, Field
+from typing import Annotated, Any, Literal
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 
 class TicketCreateRequest(BaseModel):
@@ -25,6 +25,35 @@ class TicketResponse(BaseModel):
     priority: str
     created_at: str
     updated_at: str
+    draft_job_id: int | None = None
+
+
+class TicketBulkCreateRequest(BaseModel):
+    tickets: list[TicketCreateRequest] = Field(min_length=1)
+
+
+class TicketBulkCreateResponse(BaseModel):
+    ticket_ids: list[int]
+    created_count: int
+    drafts_queued: int
+    drafts_rejected: int
+    draft_job_ids: list[int] = Field(default_factory=list)
+
+
+class TicketListItem(BaseModel):
+    """Ticket row in list views; fields omitted by a ``fields=`` projection are left out."""
+
+    id: int
+    customer_id: int | None = None
+    customer_email: EmailStr | None = None
+    customer_name: str | None = None
+    customer_company: str | None = None
+    subject: str | None = None
+    description: str | None = None
+    status: str | None = None
+    priority: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
 
 
 class DraftSignals(BaseModel):
@@ -61,6 +90,15 @@ class StructuredDraftContext(BaseModel):
     tool_calls: list[DraftToolCall | dict[str, Any]] = Field(default_factory=list)
     errors: list[str] = Field(default_factory=list)
 
+class MemoryWriteStatus(BaseModel):
+    job_id: int
+    status: Literal["queued", "running", "succeeded", "failed"]
+    attempts: int
+    max_attempts: int
+    last_error: str | None = None
+    updated_at: str
+
+
 class DraftResponse(BaseModel):
     id: int
     ticket_id: int
@@ -68,6 +106,7 @@ class DraftResponse(BaseModel):
     context_used: StructuredDraftContext | dict[str, Any] | None = None
     status: str
     created_at: str
+    memory_write: MemoryWriteStatus | None = None
 
 class DraftUpdateRequest(BaseModel):
     content: str | None = None
@@ -77,25 +116,91 @@ class GenerateDraftResponse(BaseModel):
     ticket_id: int
     draft: DraftResponse
 
+class DraftBatchRequest(BaseModel):
+    ticket_ids: list[int] | None = Field(default=None, min_length=1)
+    status: str | None = None
+    priority: Literal["low", "medium", "high", "urgent"] | None = None
+    limit: int | None = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def require_selector(self) -> DraftBatchRequest:
+        if self.ticket_ids is None and self.status is None and self.priority is None:
+            raise ValueError("Provide ticket_ids or a status/priority filter.")
+        return self
+
+class DraftBatchProgress(BaseModel):
+    total: int
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+class DraftBatchResponse(BaseModel):
+    job_id: int
+    status: Literal["queued", "running", "succeeded", "failed"]
+    progress: DraftBatchProgress
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    resource: str | None = None
+    status: Literal["queued", "running", "succeeded", "failed"]
+    priority: int
+    attempts: int
+    max_attempts: int
+    payload: dict[str, Any] = Field(default_factory=dict)
+    result: dict[str, Any] | None = None
+    last_error: str | None = None
+    created_at: str
+    updated_at: str
+
 
 class KnowledgeIngestRequest(BaseModel):
     clear_existing: bool = False
 
 class KnowledgeIngestResponse(BaseModel):
     files_indexed: int
+    files_unchanged: int = 0
     chunks_indexed: int
+    chunks_added: int = 0
+    chunks_deleted: int = 0
     collection_count: int
 
+class KnowledgeSearchRequest(BaseModel):
+    queries: list[Annotated[str, Field(min_length=1)]] = Field(min_length=1, max_length=100)
+    top_k: int | None = Field(default=None, ge=1, le=50)
+    mmr: bool | None = None
+    merge_adjacent: bool | None = None
+
+class KnowledgeSearchResult(BaseModel):
+    query: str
+    hits: list[dict[str, Any]] = Field(default_factory=list)
+
+class KnowledgeSearchResponse(BaseModel):
+    results: list[KnowledgeSearchResult]
+
 
 class CustomerMemoriesResponse(BaseModel):
     customer_id: int
     customer_email: EmailStr
     memories: list[dict[str, Any]]
+    next_cursor: str | None = None
+
 
 
+class CustomerStatsResponse(BaseModel):
+    customer_id: int
+    customer_email: EmailStr
+    total_ticket_count: int
+    open_ticket_count: int
+    resolved_ticket_count: int
+    other_ticket_count: int
+
 
 class CustomerMemorySearchResponse(BaseModel):
     customer_id: int
     customer_email: EmailStr
     query: str
-    results: list[dict[str, Any]]
\ No newline at end of file
+    results: list[dict[str, Any]]
+    branches: list[dict[str, Any]] = Field(default_factory=list)
\ No newline at end of file
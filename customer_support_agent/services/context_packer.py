@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import math
+import re
+from functools import lru_cache
+from itertools import zip_longest
+from typing import Any
+
+# Llama 3's vocabulary extends cl100k_base, so its counts track Groq's closely.
+TIKTOKEN_ENCODING = "cl100k_base"
+
+_PIECE_RE = re.compile(r"\s*\w+|\s*[^\w\s]+")
+
+
+class TokenCounter:
+    """Count prompt tokens locally, with ``tiktoken`` when it is available.
+
+    ``tiktoken`` is optional: without it, or when its encoding cannot be
+    loaded (it is fetched once and cached on first use), tokens are estimated
+    from word and punctuation pieces at roughly four characters per token.
+    """
+
+    def __init__(self, encoding_name: str = TIKTOKEN_ENCODING):
+        self._encoding: Any = None
+        try:
+            import tiktoken
+
+            self._encoding = tiktoken.get_encoding(encoding_name)
+        except Exception:
+            self.name = "estimate:chars/4"
+        else:
+            self.name = f"tiktoken:{encoding_name}"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return sum(math.ceil(len(piece.strip()) / 4) for piece in _PIECE_RE.findall(text))
+
+
+@lru_cache
+def get_token_counter() -> TokenCounter:
+    return TokenCounter()
+
+
+def memory_line(hit: dict[str, Any]) -> str:
+    return f"- {str(hit.get('memory', '')).strip()}"
+
+
+def knowledge_line(hit: dict[str, Any]) -> str:
+    return f"- [{hit.get('source', 'unknown')}] {str(hit.get('content', '')).strip()}"
+
+
+def pack_context(
+    memory_hits: list[dict[str, Any]],
+    kb_hits: list[dict[str, Any]],
+    budget_tokens: int,
+    memory_min_score: float,
+    kb_max_distance: float | None,
+    counter: TokenCounter,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], dict[str, Any]]:
+    """Choose the memory and KB hits that go into the system prompt.
+
+    Memory hits below ``memory_min_score`` (Mem0 similarity, higher is
+    closer) and KB hits above ``kb_max_distance`` are cut first. Hits without
+    the metric, such as sparse-only hybrid matches, are kept. The remaining
+    hits are taken best-first, alternating memory and KB so neither source
+    can use the whole budget. A hit that does not fit the remaining
+    ``budget_tokens`` is dropped and smaller ones after it may still fit. A
+    budget of 0 disables the token limit.
+
+    Returns the kept hits in prompt order and a summary for ``context_used``.
+    """
+    dropped: list[dict[str, Any]] = []
+    memory_ranked: list[dict[str, Any]] = []
+    for hit in sorted(memory_hits, key=_score, reverse=True):
+        if hit.get("score") is not None and hit["score"] < memory_min_score:
+            dropped.append(_dropped("memory", hit, "below_min_score"))
+        else:
+            memory_ranked.append(hit)
+    kb_ranked: list[dict[str, Any]] = []
+    for hit in kb_hits:
+        if kb_max_distance is not None and hit.get("distance") is not None and hit["distance"] > kb_max_distance:
+            dropped.append(_dropped("knowledge", hit, "above_max_distance"))
+        else:
+            kb_ranked.append(hit)
+
+    used = {"memory": 0, "knowledge": 0}
+    kept: dict[str, list[dict[str, Any]]] = {"memory": [], "knowledge": []}
+    for pair in zip_longest(memory_ranked, kb_ranked):
+        for kind, hit in zip(("memory", "knowledge"), pair):
+            if hit is None:
+                continue
+            tokens = counter.count(memory_line(hit) if kind == "memory" else knowledge_line(hit))
+            if budget_tokens and used["memory"] + used["knowledge"] + tokens > budget_tokens:
+                dropped.append({**_dropped(kind, hit, "over_budget"), "tokens": tokens})
+                continue
+            used[kind] += tokens
+            kept[kind].append(hit)
+
+    summary = {
+        "tokenizer": counter.name,
+        "budget_tokens": budget_tokens or None,
+        "used_tokens": used["memory"] + used["knowledge"],
+        "memory_tokens": used["memory"],
+        "knowledge_tokens": used["knowledge"],
+        "kept": {"memory": len(kept["memory"]), "knowledge": len(kept["knowledge"])},
+        "dropped": dropped,
+    }
+    return kept["memory"], kept["knowledge"], summary
+
+
+def _score(hit: dict[str, Any]) -> float:
+    score = hit.get("score")
+    return float(score) if score is not None else -math.inf
+
+
+def _dropped(kind: str, hit: dict[str, Any], reason: str) -> dict[str, Any]:
+    text = hit.get("memory", "") if kind == "memory" else hit.get("content", "")
+    item: dict[str, Any] = {"kind": kind, "reason": reason, "preview": str(text).strip()[:80]}
+    if kind == "memory":
+        item["score"] = hit.get("score")
+    else:
+        item["source"] = hit.get("source", "unknown")
+        item["distance"] = hit.get("distance")
+    return item
@@ -2,20 +2,105 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Any
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterator
+from uuid import UUID
 
 from langchain.agents import create_agent
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
 from langchain_groq import ChatGroq
-from langgraph.checkpoint.memory import InMemorySaver
 
+from customer_support_agent.core.metrics import (
+    DRAFTS_TOTAL,
+    FALLBACKS_TOTAL,
+    MEMORY_DISABLED_TOTAL,
+    TOOL_ERRORS_TOTAL,
+    record_stage,
+    time_stage,
+)
 from customer_support_agent.core.settings import Settings
+from customer_support_agent.integrations.memory.checkpointer import get_checkpointer
 from customer_support_agent.integrations.memory.mem0_store import (
     CustomerMemoryStore,
 )
 from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+from customer_support_agent.integrations.rag.draft_cache import build_draft_cache, draft_fingerprint
 from customer_support_agent.integrations.tools.support_tools import get_support_tools
+from customer_support_agent.repositories.sqlite.drafts import DraftsRepository
+from customer_support_agent.services.context_packer import (
+    get_token_counter,
+    knowledge_line,
+    memory_line,
+    pack_context,
+)
+
+
+class _AgentTimingCallback(BaseCallbackHandler):
+    """Times each LLM turn and tool call of one agent run into its ``timings`` dict."""
+
+    def __init__(self, timings: dict[str, float]):
+        self._timings = timings
+        self._started: dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def _stop(self, run_id: UUID, stage: str, count_key: str) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        with self._lock:
+            record_stage(stage, time.perf_counter() - started, self._timings)
+            self._timings[count_key] = self._timings.get(count_key, 0) + 1
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._stop(run_id, "llm", "llm_turns")
 
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._stop(run_id, "llm", "llm_turns")
+
+    def on_tool_start(self, serialized: Any, input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._stop(run_id, "tool", "tool_runs")
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._stop(run_id, "tool", "tool_runs")
+
+
+class _BranchStart:
+    """Set by a retrieval branch when a pool worker picks it up."""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.started_at = 0.0
+
+    def mark(self) -> None:
+        self.started_at = time.perf_counter()
+        self.event.set()
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
 
 
 class SupportCopilot:
@@ -28,13 +113,14 @@ class SupportCopilot:
         self._llm = ChatGroq(
             model=settings.groq_model,
             groq_api_key=settings.groq_api_key,
+            base_url=settings.groq_base_url or None,
             temperature=settings.llm_temperature,
         )
         self._tools = get_support_tools()
         self._agent = create_agent(
             model=self._llm,
             tools=self._tools,
-            checkpointer=InMemorySaver(),
+            checkpointer=get_checkpointer(settings),
             name="support_copilot_agent",
         )
 
@@ -45,50 +131,256 @@ class SupportCopilot:
         except Exception as exc:
             self._memory_error = str(exc)
         self.rag = KnowledgeBaseService(settings=settings)
+        self.draft_cache = build_draft_cache(
+            settings=settings,
+            knowledge_base=self.rag,
+            is_current=self._cached_draft_is_current,
+        )
+        self._retrieval_pool = ThreadPoolExecutor(
+            max_workers=max(1, settings.retrieval_max_workers),
+            thread_name_prefix="copilot-retrieval",
+        )
 
     
-    def generate_draft(self, ticket: dict[str, Any], customer: dict[str, Any]) -> dict[str, Any]:
-        query = f"{ticket['subject']}\n{ticket['description']}"
-        customer_email = customer["email"]
+    def generate_draft(
+        self,
+        ticket: dict[str, Any],
+        customer: dict[str, Any],
+        kb_hits: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        """Draft a reply for ``ticket``; ``kb_hits`` from ``search_knowledge_many`` skip the KB search."""
+        started_at = time.perf_counter()
+        timings: dict[str, float] = {}
+        cache_info = self._lookup_draft_cache(ticket=ticket, customer=customer, timings=timings)
+        if cache_info.get("hit"):
+            return self._cached_draft_result(
+                ticket=ticket,
+                customer=customer,
+                cache_info=cache_info,
+                timings=self._finish_timings(timings, started_at, runtime="draft_cache"),
+            )
 
-        memory_hits = self._search_memory_scopes(
-            query=query,
-            customer_email=customer_email,
-            customer_company=customer.get("company"),
-            limit=self._settings.mem0_top_k,
+        run = self._prepare_run(
+            ticket=ticket,
+            customer=customer,
+            timings=timings,
+            started_at=started_at,
+            kb_hits=kb_hits,
+        )
+        run["draft_cache"] = cache_info
+        with time_stage("agent", timings):
+            agent_result = self._agent.invoke({"messages": run["messages"]}, config=run["config"])
+        return self._finalize_draft(run=run, agent_result=agent_result)
+
+    def stream_draft(self, ticket: dict[str, Any], customer: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """Yield progress events while the agent runs, ending with a ``result`` event.
+
+        Events are ``{"event": name, "data": payload}`` with names ``retrieval``,
+        ``token``, ``tool_start``, ``tool_end`` and finally ``result``, whose
+        payload matches the return value of ``generate_draft``. A draft-cache hit
+        yields only the ``result`` event.
+        """
+        started_at = time.perf_counter()
+        timings: dict[str, float] = {}
+        cache_info = self._lookup_draft_cache(ticket=ticket, customer=customer, timings=timings)
+        if cache_info.get("hit"):
+            yield {
+                "event": "result",
+                "data": self._cached_draft_result(
+                    ticket=ticket,
+                    customer=customer,
+                    cache_info=cache_info,
+                    timings=self._finish_timings(timings, started_at, runtime="draft_cache"),
+                ),
+            }
+            return
+
+        run = self._prepare_run(ticket=ticket, customer=customer, timings=timings, started_at=started_at)
+        run["draft_cache"] = cache_info
+        retrieval = run["retrieval"]
+        yield {
+            "event": "retrieval",
+            "data": {
+                "memory_hit_count": len(run["memory_hits"]),
+                "knowledge_hit_count": len(run["kb_hits"]),
+                "elapsed_ms": retrieval["elapsed_ms"],
+                "branches": retrieval["branches"],
+            },
+        }
+
+        tool_names: dict[str, str] = {}
+        agent_result: dict[str, Any] = {}
+        agent_started = time.perf_counter()
+        for mode, chunk in self._agent.stream(
+            {"messages": run["messages"]},
+            config=run["config"],
+            stream_mode=["messages", "updates", "values"],
+        ):
+            if mode == "values":
+                # The last full-state snapshot is what ``invoke`` would have returned.
+                agent_result = chunk
+                continue
+            if mode == "messages":
+                message, _metadata = chunk
+                if isinstance(message, AIMessageChunk) and isinstance(message.content, str) and message.content:
+                    yield {"event": "token", "data": {"text": message.content}}
+                continue
+
+            for update in (chunk or {}).values():
+                messages = update.get("messages", []) if isinstance(update, dict) else []
+                for message in messages:
+                    if isinstance(message, AIMessage):
+                        for call in getattr(message, "tool_calls", None) or []:
+                            tool_name = call.get("name") or "unknown_tool"
+                            tool_names[str(call.get("id"))] = tool_name
+                            args = call.get("args")
+                            yield {
+                                "event": "tool_start",
+                                "data": {
+                                    "tool_name": tool_name,
+                                    "tool_call_id": call.get("id"),
+                                    "arguments": args if isinstance(args, dict) else {},
+                                },
+                            }
+                    elif isinstance(message, ToolMessage):
+                        yield {
+                            "event": "tool_end",
+                            "data": {
+                                "tool_name": tool_names.get(str(message.tool_call_id), message.name or "unknown_tool"),
+                                "tool_call_id": message.tool_call_id,
+                                "status": "error" if getattr(message, "status", None) == "error" else "ok",
+                            },
+                        }
+
+        record_stage("agent", time.perf_counter() - agent_started, timings)
+        yield {"event": "result", "data": self._finalize_draft(run=run, agent_result=agent_result)}
+
+    def _lookup_draft_cache(
+        self,
+        ticket: dict[str, Any],
+        customer: dict[str, Any],
+        timings: dict[str, float] | None = None,
+    ) -> dict[str, Any]:
+        draft_cache = getattr(self, "draft_cache", None)
+        if draft_cache is None:
+            return {}
+        try:
+            with time_stage("draft_cache", timings):
+                return draft_cache.lookup(ticket=ticket, customer=customer)
+        except Exception as exc:
+            return {"hit": False, "error": str(exc)}
+
+    @staticmethod
+    def _finish_timings(timings: dict[str, float], started_at: float, runtime: str) -> dict[str, float]:
+        record_stage("draft_total", time.perf_counter() - started_at, timings)
+        DRAFTS_TOTAL.labels(runtime=runtime).inc()
+        return timings
+
+    def _cached_draft_result(
+        self,
+        ticket: dict[str, Any],
+        customer: dict[str, Any],
+        cache_info: dict[str, Any],
+        timings: dict[str, float] | None = None,
+    ) -> dict[str, Any]:
+        context_used = self._build_context(
+            ticket=ticket,
+            customer=customer,
+            memory_hits=[],
+            kb_hits=[],
+            tool_calls=[],
+        )
+        context_used["draft_cache"] = {key: value for key, value in cache_info.items() if key != "draft"}
+        context_used["agent_runtime"] = "draft_cache"
+        if timings is not None:
+            context_used["timings"] = timings
+        return {
+            "draft": cache_info["draft"],
+            "context_used": context_used,
+        }
+
+    def _prepare_run(
+        self,
+        ticket: dict[str, Any],
+        customer: dict[str, Any],
+        timings: dict[str, float],
+        started_at: float,
+        kb_hits: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        with time_stage("retrieval", timings):
+            memory_hits, kb_hits, retrieval = self._retrieve_context(
+                query=self._ticket_query(ticket),
+                customer_email=customer["email"],
+                customer_company=customer.get("company"),
+                kb_hits=kb_hits,
+            )
+        self._record_branch_timings(retrieval, timings)
+        memory_hits, kb_hits, packing = pack_context(
+            memory_hits=memory_hits,
+            kb_hits=kb_hits,
+            budget_tokens=self._settings.context_token_budget,
+            memory_min_score=self._settings.context_memory_min_score,
+            kb_max_distance=self._settings.context_kb_max_distance,
+            counter=get_token_counter(),
         )
-        kb_hits = self.rag.search(query=query, top_k=self._settings.rag_top_k)
 
         system_prompt = self._build_system_prompt(memory_hits=memory_hits, kb_hits=kb_hits)
         user_prompt = self._build_user_prompt(ticket=ticket, customer=customer)
-
-        agent_result = self._agent.invoke(
-            {
-                "messages": [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=user_prompt),
-                ]
-            },
-            config={
+        return {
+            "ticket": ticket,
+            "customer": customer,
+            "memory_hits": memory_hits,
+            "kb_hits": kb_hits,
+            "retrieval": retrieval,
+            "packing": packing,
+            "timings": timings,
+            "started_at": started_at,
+            "messages": [
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=user_prompt),
+            ],
+            "config": {
                 "configurable": {
                     "thread_id": self._thread_id_for_ticket(ticket=ticket, customer=customer),
                 },
                 "recursion_limit": 40,
+                "callbacks": [_AgentTimingCallback(timings)],
             },
-        )
+        }
+
+    @staticmethod
+    def _record_branch_timings(retrieval: dict[str, Any], timings: dict[str, float]) -> None:
+        """Observe each retrieval branch; branches overlap, so timings keep the slowest per stage."""
+        for branch in retrieval["branches"]:
+            if branch.get("elapsed_ms") is None:
+                continue
+            stage = "knowledge_search" if branch["name"] == "knowledge" else "memory_search"
+            record_stage(stage, branch["elapsed_ms"] / 1000)
+            key = f"{stage}_ms"
+            timings[key] = max(timings.get(key, 0.0), branch["elapsed_ms"])
+
+    def _finalize_draft(self, run: dict[str, Any], agent_result: Any) -> dict[str, Any]:
+        ticket, customer = run["ticket"], run["customer"]
+        memory_hits, kb_hits, retrieval = run["memory_hits"], run["kb_hits"], run["retrieval"]
+
+        timings = run["timings"]
+
         draft_text, tool_calls = self._extract_agent_draft_and_tool_calls(agent_result)
         used_fallback = False
         if not draft_text:
-            draft_text = self._fallback_generate_text(
-                ticket=ticket,
-                customer=customer,
-                memory_hits=memory_hits,
-                kb_hits=kb_hits,
-                tool_calls=tool_calls,
-            )
+            with time_stage("fallback", timings):
+                draft_text = self._fallback_generate_text(
+                    ticket=ticket,
+                    customer=customer,
+                    memory_hits=memory_hits,
+                    kb_hits=kb_hits,
+                    tool_calls=tool_calls,
+                )
+            FALLBACKS_TOTAL.labels(kind="llm").inc()
             used_fallback = True
         if not draft_text:
             draft_text = self._deterministic_fallback(ticket=ticket, customer=customer, tool_calls=tool_calls)
+            FALLBACKS_TOTAL.labels(kind="deterministic").inc()
             used_fallback = True
 
         context_used = self._build_context(
@@ -100,11 +392,24 @@ class SupportCopilot:
         )
         if self._memory_error:
             context_used.setdefault("errors", []).append(f"Memory disabled: {self._memory_error}")
+            MEMORY_DISABLED_TOTAL.inc()
+        if context_used["signals"]["tool_error_count"]:
+            TOOL_ERRORS_TOTAL.inc(context_used["signals"]["tool_error_count"])
+        for branch in retrieval["branches"]:
+            if branch["status"] != "ok":
+                context_used.setdefault("errors", []).append(
+                    f"Retrieval branch '{branch['name']}' {branch['status']}: {branch.get('error')}"
+                )
+        context_used["retrieval"] = retrieval
+        context_used["packing"] = run["packing"]
+        if run.get("draft_cache"):
+            context_used["draft_cache"] = run["draft_cache"]
         if used_fallback:
             context_used.setdefault("errors", []).append(
                 "Primary tool-call response had empty content; fallback synthesis was used."
             )
         context_used["agent_runtime"] = "langchain_create_agent"
+        context_used["timings"] = self._finish_timings(timings, run["started_at"], runtime="agent")
 
         return {
             "draft": draft_text,
@@ -120,39 +425,155 @@ class SupportCopilot:
         draft_content: str,
         context_used: dict[str, Any] | None = None,
     ) -> None:
-        entity_links = self._extract_entity_links(
-            ticket_subject=ticket_subject,
-            ticket_description=ticket_description,
-            draft_content=draft_content,
-            context_used=context_used or {},
+        [error] = self.save_accepted_resolutions(
+            [
+                {
+                    "customer_email": customer_email,
+                    "customer_company": customer_company,
+                    "ticket_subject": ticket_subject,
+                    "ticket_description": ticket_description,
+                    "draft_content": draft_content,
+                    "context_used": context_used,
+                }
+            ]
         )
-        for scope_user_id in self._memory_scope_ids(
+        if error is not None:
+            raise error
+
+    def save_accepted_resolutions(self, resolutions: list[dict[str, Any]]) -> list[Exception | None]:
+        """Write accepted resolutions to memory with one Mem0 extraction per customer.
+
+        Each item carries the ``save_accepted_resolution`` arguments. Items
+        are grouped by their scope list: Mem0 extracts and embeds facts once
+        under the customer scope, and the resulting vectors are copied to the
+        company scope instead of being extracted again.
+
+        Groups are written independently. Returns one entry per item, in input
+        order: ``None`` once its group was stored, or the exception its group
+        raised, so a caller retries only what Mem0 did not store.
+        """
+        if self._memory_error:
+            raise RuntimeError(f"Memory disabled: {self._memory_error}")
+
+        by_scopes: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        positions: dict[tuple[str, ...], list[int]] = {}
+        for index, resolution in enumerate(resolutions):
+            entity_links = self._extract_entity_links(
+                ticket_subject=resolution["ticket_subject"],
+                ticket_description=resolution["ticket_description"],
+                draft_content=resolution["draft_content"],
+                context_used=resolution.get("context_used") or {},
+            )
+            scope_user_ids = tuple(
+                self._memory_scope_ids(
+                    customer_email=resolution["customer_email"],
+                    customer_company=resolution.get("customer_company"),
+                )
+            )
+            positions.setdefault(scope_user_ids, []).append(index)
+            by_scopes.setdefault(scope_user_ids, []).append(
+                {
+                    "ticket_subject": resolution["ticket_subject"],
+                    "ticket_description": resolution["ticket_description"],
+                    "accepted_draft": resolution["draft_content"],
+                    "entity_links": entity_links,
+                }
+            )
+
+        errors: list[Exception | None] = [None] * len(resolutions)
+        for scope_user_ids, scope_resolutions in by_scopes.items():
+            primary_user_id, *shared_user_ids = scope_user_ids
+            try:
+                with time_stage("memory_write"):
+                    self.memory.add_resolutions(
+                        user_id=primary_user_id,
+                        resolutions=scope_resolutions,
+                        fan_out_user_ids=shared_user_ids,
+                    )
+            except Exception as exc:
+                for index in positions[scope_user_ids]:
+                    errors[index] = exc
+        return errors
+
+    def remember_accepted_draft(
+        self,
+        draft_id: int,
+        ticket_id: int,
+        ticket_subject: str,
+        ticket_description: str,
+        draft_content: str,
+        customer_name: str | None,
+        customer_email: str | None,
+        context_used: dict[str, Any] | None = None,
+        customer_company: str | None = None,
+    ) -> bool:
+        """Add an accepted draft to the draft cache; drafts served from the cache are not re-added."""
+        if self.draft_cache is None:
+            return False
+        if ((context_used or {}).get("draft_cache") or {}).get("hit"):
+            return False
+        self.draft_cache.add(
+            draft_id=draft_id,
+            ticket_id=ticket_id,
+            subject=ticket_subject,
+            description=ticket_description,
+            draft=draft_content,
+            customer_name=customer_name,
             customer_email=customer_email,
             customer_company=customer_company,
-        ):
-            self.memory.add_resolution(
-                user_id=scope_user_id,
-                ticket_subject=ticket_subject,
-                ticket_description=ticket_description,
-                accepted_draft=draft_content,
-                entity_links=entity_links,
-            )
+        )
+        return True
+
+    @staticmethod
+    def _cached_draft_is_current(metadata: dict[str, Any]) -> bool:
+        """A cached reply stays usable while its source draft is accepted and unedited."""
+        draft = DraftsRepository().get_by_id(int(metadata["draft_id"]))
+        return bool(
+            draft
+            and draft["status"] == "accepted"
+            and draft_fingerprint(draft["content"]) == metadata.get("draft_sha1")
+        )
 
     def list_customer_memories(
         self,
         customer_email: str,
         customer_company: str | None = None,
         limit: int = 20,
-    ) -> list[dict[str, Any]]:
+        cursor: tuple[int, int] | None = None,
+    ) -> dict[str, Any]:
+        """Page through the customer scope, then the company scope.
+
+        ``cursor`` is the ``(scope_index, offset)`` the page starts from.
+        Returns ``{"memories": [...], "next_cursor": (scope_index, offset) | None}``.
+        """
+        limit = max(1, limit)
         scope_user_ids = self._memory_scope_ids(
             customer_email=customer_email,
             customer_company=customer_company,
         )
+        scope_index, offset = cursor or (0, 0)
+
         raw_hits: list[dict[str, Any]] = []
-        for scope_user_id in scope_user_ids:
-            hits = self.memory.list_memories(user_id=scope_user_id, limit=max(1, limit))
-            raw_hits.extend(self._annotate_memory_scope(hits=hits, scope_user_id=scope_user_id))
-        return self._dedupe_memory_hits(raw_hits, limit=max(1, limit))
+        next_cursor: tuple[int, int] | None = None
+        while scope_index < len(scope_user_ids):
+            needed = limit - len(raw_hits)
+            scope_user_id = scope_user_ids[scope_index]
+            # One extra row tells whether the scope continues past this page.
+            hits = self.memory.list_memories(user_id=scope_user_id, limit=needed + 1, offset=offset)
+            raw_hits.extend(self._annotate_memory_scope(hits=hits[:needed], scope_user_id=scope_user_id))
+            if len(hits) > needed:
+                next_cursor = (scope_index, offset + needed)
+                break
+            scope_index, offset = scope_index + 1, 0
+            if len(raw_hits) >= limit:
+                if scope_index < len(scope_user_ids):
+                    next_cursor = (scope_index, 0)
+                break
+
+        return {
+            "memories": self._dedupe_memory_hits(raw_hits, limit=limit),
+            "next_cursor": next_cursor,
+        }
 
     def search_customer_memories(
         self,
@@ -160,13 +581,25 @@ class SupportCopilot:
         query: str,
         customer_company: str | None = None,
         limit: int = 10,
-    ) -> list[dict[str, Any]]:
-        return self._search_memory_scopes(
+    ) -> dict[str, Any]:
+        """Search every memory scope of the customer.
+
+        Returns ``{"results": [...], "branches": [...]}``. A scope that fails
+        or times out only loses its own hits and is reported in ``branches``;
+        this raises only when memory is disabled or no scope answered.
+        """
+        if self._memory_error:
+            raise RuntimeError(f"Memory disabled: {self._memory_error}")
+        hits, branches = self._search_memory_scopes(
             query=query,
             customer_email=customer_email,
             customer_company=customer_company,
             limit=limit,
         )
+        if branches and all(branch["status"] != "ok" for branch in branches):
+            errors = "; ".join(f"{branch['name']}: {branch['error']}" for branch in branches)
+            raise RuntimeError(f"Memory search failed for every scope: {errors}")
+        return {"results": hits, "branches": branches}
 
 
     def _search_memory_scopes(
@@ -175,18 +608,173 @@ class SupportCopilot:
         customer_email: str,
         customer_company: str | None,
         limit: int,
-    ) -> list[dict[str, Any]]:
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
         per_scope_limit = max(1, limit)
         scope_user_ids = self._memory_scope_ids(
             customer_email=customer_email,
             customer_company=customer_company,
         )
-        raw_hits: list[dict[str, Any]] = []
-        for scope_user_id in scope_user_ids:
-            hits = self.memory.search(query=query, user_id=scope_user_id, limit=per_scope_limit)
-            raw_hits.extend(self._annotate_memory_scope(hits=hits, scope_user_id=scope_user_id))
-        return self._dedupe_memory_hits(raw_hits, limit=per_scope_limit * len(scope_user_ids))
-    
+        results = self._fan_out(
+            [
+                (
+                    f"memory:{scope_user_id}",
+                    self._settings.memory_search_timeout_s,
+                    self._memory_branch(query, scope_user_id, per_scope_limit),
+                )
+                for scope_user_id in scope_user_ids
+            ]
+        )
+        raw_hits = [hit for branch in results if branch["status"] == "ok" for hit in branch["value"]]
+        hits = self._dedupe_memory_hits(raw_hits, limit=per_scope_limit * len(scope_user_ids))
+        return hits, [{key: value for key, value in branch.items() if key != "value"} for branch in results]
+
+    def search_knowledge_many(self, tickets: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+        """KB hits for each ticket from one batched search, for ``generate_draft(kb_hits=...)``."""
+        queries = [self._ticket_query(ticket) for ticket in tickets]
+        return self.rag.search_many(queries, top_k=self._settings.rag_top_k)
+
+    @staticmethod
+    def _ticket_query(ticket: dict[str, Any]) -> str:
+        return f"{ticket['subject']}\n{ticket['description']}"
+
+    def _retrieve_context(
+        self,
+        query: str,
+        customer_email: str,
+        customer_company: str | None,
+        kb_hits: list[dict[str, Any]] | None = None,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], dict[str, Any]]:
+        """Run every memory scope and the KB search concurrently.
+
+        A failing or slow branch only loses its own hits; the returned summary
+        records status and elapsed time per branch. Prefetched ``kb_hits``
+        replace the KB branch, which is then reported as ``prefetched``.
+        """
+        started = time.perf_counter()
+        per_scope_limit = max(1, self._settings.mem0_top_k)
+        scope_user_ids = (
+            self._memory_scope_ids(customer_email=customer_email, customer_company=customer_company)
+            if not self._memory_error
+            else []
+        )
+        branches: list[tuple[str, float, Callable[[], Any]]] = [
+            (
+                f"memory:{scope_user_id}",
+                self._settings.memory_search_timeout_s,
+                self._memory_branch(query, scope_user_id, per_scope_limit),
+            )
+            for scope_user_id in scope_user_ids
+        ]
+        prefetched = kb_hits
+        if prefetched is None:
+            branches.append(
+                (
+                    "knowledge",
+                    self._settings.rag_search_timeout_s,
+                    lambda: self.rag.search(query=query, top_k=self._settings.rag_top_k),
+                )
+            )
+
+        results = self._fan_out(branches)
+        if prefetched is not None:
+            results.append(
+                {
+                    "name": "knowledge",
+                    "status": "ok",
+                    "elapsed_ms": None,
+                    "hit_count": len(prefetched),
+                    "prefetched": True,
+                    "value": prefetched,
+                }
+            )
+        raw_memory_hits: list[dict[str, Any]] = []
+        kb_hits = []
+        for branch in results:
+            if branch["status"] != "ok":
+                continue
+            if branch["name"] == "knowledge":
+                kb_hits = branch["value"]
+            else:
+                raw_memory_hits.extend(branch["value"])
+
+        memory_hits = self._dedupe_memory_hits(
+            raw_memory_hits,
+            limit=per_scope_limit * max(1, len(scope_user_ids)),
+        )
+        summary = {
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+            "branches": [
+                {key: value for key, value in branch.items() if key != "value"}
+                for branch in results
+            ],
+        }
+        return memory_hits, kb_hits, summary
+
+    def _memory_branch(self, query: str, scope_user_id: str, limit: int) -> Callable[[], list[dict[str, Any]]]:
+        def run() -> list[dict[str, Any]]:
+            hits = self.memory.search(query=query, user_id=scope_user_id, limit=limit)
+            return self._annotate_memory_scope(hits=hits, scope_user_id=scope_user_id)
+
+        return run
+
+    def _fan_out(self, branches: list[tuple[str, float, Callable[[], Any]]]) -> list[dict[str, Any]]:
+        """Submit each branch to the retrieval pool and collect results within its timeout.
+
+        A branch's timeout counts from when a pool worker starts it, so time
+        spent queued behind other drafts' branches is reported as
+        ``queued_ms`` rather than as a timeout. A branch still queued after
+        ``retrieval_queue_timeout_s`` is cancelled and reported as ``queue_timeout``.
+        """
+        submitted = time.perf_counter()
+        futures: list[tuple[str, float, _BranchStart, Future]] = []
+        for name, timeout, fn in branches:
+            start = _BranchStart()
+            futures.append((name, timeout, start, self._retrieval_pool.submit(self._timed, fn, start)))
+
+        results: list[dict[str, Any]] = []
+        for name, timeout, start, future in futures:
+            branch: dict[str, Any] = {"name": name, "status": "ok", "elapsed_ms": None, "hit_count": 0}
+            queue_left = max(0.0, self._settings.retrieval_queue_timeout_s - (time.perf_counter() - submitted))
+            if not start.event.wait(timeout=queue_left) and future.cancel():
+                branch.update(
+                    {
+                        "status": "queue_timeout",
+                        "queued_ms": _elapsed_ms(submitted),
+                        "error": f"not started within {self._settings.retrieval_queue_timeout_s:g}s",
+                        "value": [],
+                    }
+                )
+                results.append(branch)
+                continue
+            # The worker may have started between the wait and the cancel attempt.
+            start.event.wait()
+            branch["queued_ms"] = round((start.started_at - submitted) * 1000, 2)
+            remaining = max(0.0, timeout - (time.perf_counter() - start.started_at))
+            try:
+                value, elapsed_ms = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                branch.update(
+                    {
+                        "status": "timeout",
+                        "elapsed_ms": _elapsed_ms(start.started_at),
+                        "error": f"no result within {timeout:g}s",
+                        "value": [],
+                    }
+                )
+            except Exception as exc:
+                branch.update({"status": "error", "error": str(exc), "value": []})
+            else:
+                hits = value or []
+                branch.update({"elapsed_ms": elapsed_ms, "hit_count": len(hits), "value": hits})
+            results.append(branch)
+        return results
+
+    @staticmethod
+    def _timed(fn: Callable[[], Any], start: _BranchStart) -> tuple[Any, float]:
+        start.mark()
+        value = fn()
+        return value, _elapsed_ms(start.started_at)
+
     def _memory_scope_ids(self, customer_email: str, customer_company: str | None) -> list[str]:
         scope_user_ids = [customer_email.strip().lower()]
         company_scope = self._company_scope_user_id(customer_company)
@@ -252,22 +840,14 @@ class SupportCopilot:
         if not memory_hits:
             return "- No prior customer memories found."
 
-        lines = []
-        for item in memory_hits:
-            lines.append(f"- {item.get('memory', '').strip()}")
-        return "\n".join(lines)
+        return "\n".join(memory_line(item) for item in memory_hits)
 
     @staticmethod
     def _format_kb(kb_hits: list[dict[str, Any]]) -> str:
         if not kb_hits:
             return "- No relevant knowledge-base chunks found."
 
-        lines = []
-        for item in kb_hits:
-            source = item.get("source", "unknown")
-            snippet = item.get("content", "").strip()
-            lines.append(f"- [{source}] {snippet}")
-        return "\n".join(lines)
+        return "\n".join(knowledge_line(item) for item in kb_hits)
 
     def _build_system_prompt(self, memory_hits: list[dict[str, Any]], kb_hits: list[dict[str, Any]]) -> str:
         return (
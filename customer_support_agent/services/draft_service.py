@@ -2,16 +2,32 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Iterator
 
-from customer_support_agent.repositories.sqlite.customers import CustomersRepository
+from customer_support_agent.core.metrics import time_stage
 from customer_support_agent.repositories.sqlite.drafts import DraftsRepository
 from customer_support_agent.repositories.sqlite.tickets import TicketsRepository
-from customer_support_agent.services.copilot_service import SupportCopilot
+
+if TYPE_CHECKING:
+    from customer_support_agent.services.copilot_service import SupportCopilot
+
+DRAFT_JOB_KIND = "generate_draft"
+MEMORY_WRITE_JOB_KIND = "memory_write"
+DRAFT_BATCH_JOB_KIND = "draft_batch"
+
+FAILED_DRAFT_CONTENT = (
+    "Automatic draft generation failed. Configure AI keys and trigger "
+    "manual draft generation."
+)
 
 
 class DraftService:
-    def serialize_draft(self, draft: dict[str, Any]) -> dict[str, Any]:
+    def serialize_draft(
+        self,
+        draft: dict[str, Any],
+        memory_job: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
         context_raw = draft.get("context_used")
         context_data: dict[str, Any] | None = None
 
@@ -28,9 +44,29 @@ class DraftService:
             "context_used": context_data,
             "status": draft["status"],
             "created_at": draft["created_at"],
+            "memory_write": self._memory_write_status(memory_job),
+        }
+
+    @staticmethod
+    def _memory_write_status(job: dict[str, Any] | None) -> dict[str, Any] | None:
+        if not job:
+            return None
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "attempts": job["attempts"],
+            "max_attempts": job["max_attempts"],
+            "last_error": job.get("last_error"),
+            "updated_at": job["updated_at"],
         }
     
-    def serialize_ticket(self, ticket: dict[str, Any]) -> dict[str, Any]:
+    def serialize_ticket(
+        self,
+        ticket: dict[str, Any],
+        fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        if fields is not None:
+            return {key: ticket[key] for key in ("id", *fields) if key in ticket}
         return {
             "id": ticket["id"],
             "customer_id": ticket["customer_id"],
@@ -57,45 +93,246 @@ class DraftService:
                 return {"raw": raw}
         return {}
 
-    def generate_and_store_background(
+    def generate_and_store_for_tickets(
         self,
-        ticket_id: int,
+        ticket_ids: list[int],
         tickets_repo: TicketsRepository,
-        customers_repo: CustomersRepository,
         drafts_repo: DraftsRepository,
         copilot_factory: Callable[[], SupportCopilot],
         logger: logging.Logger,
-    ) -> dict[str, Any] | None:
-        ticket = tickets_repo.get_by_id(ticket_id)
-        if not ticket:
-            return None
+        max_parallel: int = 1,
+    ) -> list[dict[str, Any] | Exception | None]:
+        """Generate and persist drafts for several tickets with one batched KB search.
 
-        customer = customers_repo.get_by_id(ticket["customer_id"])
-        if not customer:
-            return None
+        Tickets and customers load with one JOIN query, and drafts are
+        generated up to ``max_parallel`` at a time. If the batched search
+        fails, each draft runs its own. Per ticket, the result is the stored
+        draft, None when the ticket is gone, or the exception its generation
+        raised.
+        """
+        with time_stage("db_read"):
+            found = {
+                ticket["id"]: ticket
+                for ticket in tickets_repo.list_for_drafting(ticket_ids=ticket_ids, limit=len(ticket_ids))
+            }
+        runnable = [index for index, ticket_id in enumerate(ticket_ids) if ticket_id in found]
+        results: list[dict[str, Any] | Exception | None] = [None] * len(ticket_ids)
+        if not runnable:
+            return results
 
-        try:
-            copilot = copilot_factory()
-            result = copilot.generate_draft(ticket=ticket, customer=customer)
-            draft_text, context_used = self._normalize_draft_result(result)
-            return drafts_repo.create(
-                ticket_id=ticket_id,
-                content=draft_text,
-                context_used=json.dumps(context_used),
-                status="pending",
+        tickets = [found[ticket_ids[index]] for index in runnable]
+        generated = self._generate_many(
+            tickets=tickets,
+            customers=[self._ticket_customer(ticket) for ticket in tickets],
+            copilot=copilot_factory(),
+            logger=logger,
+            max_parallel=max_parallel,
+        )
+        for index, result in zip(runnable, generated):
+            if isinstance(result, Exception):
+                results[index] = result
+                continue
+            try:
+                results[index] = self._store_pending_draft(
+                    ticket_id=ticket_ids[index],
+                    result=result,
+                    drafts_repo=drafts_repo,
+                )
+            except Exception as exc:
+                results[index] = exc
+        return results
+
+    def generate_batch(
+        self,
+        ticket_ids: list[int],
+        tickets_repo: TicketsRepository,
+        drafts_repo: DraftsRepository,
+        copilot_factory: Callable[[], SupportCopilot],
+        logger: logging.Logger,
+        max_parallel: int,
+        chunk_size: int,
+        progress: dict[str, Any] | None = None,
+        on_progress: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        """Draft a backlog of tickets ``chunk_size`` at a time, for a ``DRAFT_BATCH_JOB_KIND`` job.
+
+        Each chunk loads its tickets and customers with one JOIN query, runs
+        one batched KB search and up to ``max_parallel`` agent calls, then
+        bulk-inserts its drafts. A ticket whose generation fails gets a
+        ``failed`` draft, as the single-ticket job does once out of retries.
+        ``on_progress`` receives the counts at the start and after every
+        chunk; passing them back as ``progress`` on a retry skips the tickets
+        already drafted.
+        """
+        progress = self.batch_progress(ticket_ids, progress)
+        if on_progress is not None:
+            on_progress(progress)
+        done = set(progress["done_ticket_ids"])
+        remaining = [ticket_id for ticket_id in ticket_ids if ticket_id not in done]
+        copilot = copilot_factory() if remaining else None
+        chunk_size = max(1, chunk_size)
+
+        for start in range(0, len(remaining), chunk_size):
+            chunk = remaining[start : start + chunk_size]
+            with time_stage("db_read"):
+                tickets = tickets_repo.list_for_drafting(ticket_ids=chunk, limit=len(chunk))
+            generated = self._generate_many(
+                tickets=tickets,
+                customers=[self._ticket_customer(ticket) for ticket in tickets],
+                copilot=copilot,
+                logger=logger,
+                max_parallel=max_parallel,
             )
-        except Exception as exc:
-            logger.exception("Background draft generation failed for ticket_id=%s", ticket_id)
-            return drafts_repo.create(
-                ticket_id=ticket_id,
-                content=(
-                    "Automatic draft generation failed. Configure AI keys and trigger "
-                    "manual draft generation."
-                ),
-                context_used=json.dumps(self._failed_context(str(exc))),
-                status="failed",
+
+            rows: list[dict[str, Any]] = []
+            for ticket, result in zip(tickets, generated):
+                if isinstance(result, Exception):
+                    logger.warning("Batch draft generation failed for ticket_id=%s: %s", ticket["id"], result)
+                    rows.append(self._failed_draft_row(ticket["id"], f"{type(result).__name__}: {result}"))
+                    continue
+                draft_text, context_used = self._normalize_draft_result(result)
+                rows.append(
+                    {
+                        "ticket_id": ticket["id"],
+                        "content": draft_text,
+                        "context_used": json.dumps(context_used),
+                        "status": "pending",
+                    }
+                )
+            with time_stage("db_write"):
+                drafts_repo.create_many(rows)
+
+            failed = sum(1 for row in rows if row["status"] == "failed")
+            progress["processed"] += len(chunk)
+            progress["succeeded"] += len(rows) - failed
+            progress["failed"] += failed
+            progress["skipped"] += len(chunk) - len(tickets)
+            progress["done_ticket_ids"].extend(chunk)
+            if on_progress is not None:
+                on_progress(progress)
+        return progress
+
+    @staticmethod
+    def batch_progress(ticket_ids: list[int], previous: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Progress counts of a batch draft job; ``skipped`` counts tickets deleted since it was queued."""
+        progress = {
+            "total": len(ticket_ids),
+            "processed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "done_ticket_ids": [],
+        }
+        if previous:
+            progress.update({key: previous[key] for key in progress if key in previous})
+            progress["total"] = len(ticket_ids)
+        return progress
+
+    def _generate_many(
+        self,
+        tickets: list[dict[str, Any]],
+        customers: list[dict[str, Any]],
+        copilot: SupportCopilot,
+        logger: logging.Logger,
+        max_parallel: int,
+    ) -> list[dict[str, Any] | Exception]:
+        """Copilot results for ``tickets``, sharing one batched KB search.
+
+        If the batched search fails, each draft runs its own. A generation
+        error is returned in place of that ticket's result.
+        """
+        if not tickets:
+            return []
+        kb_hits: list[list[dict[str, Any]] | None] = [None] * len(tickets)
+        try:
+            kb_hits = list(copilot.search_knowledge_many(tickets))
+        except Exception:
+            logger.exception(
+                "Batched KB search failed for tickets %s; searching per draft",
+                [ticket["id"] for ticket in tickets],
             )
 
+        def generate(index: int) -> dict[str, Any] | Exception:
+            try:
+                return copilot.generate_draft(ticket=tickets[index], customer=customers[index], kb_hits=kb_hits[index])
+            except Exception as exc:
+                return exc
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(tickets)))) as pool:
+            return list(pool.map(generate, range(len(tickets))))
+
+    def memory_write_payload(self, draft: dict[str, Any], relation: dict[str, Any]) -> dict[str, Any]:
+        """Snapshot of an accepted draft for a ``MEMORY_WRITE_JOB_KIND`` job."""
+        return {
+            "draft_id": draft["id"],
+            "ticket_id": relation["ticket_id"],
+            "customer_email": relation["customer_email"],
+            "customer_name": relation.get("customer_name"),
+            "customer_company": relation.get("customer_company"),
+            "subject": relation["subject"],
+            "description": relation["description"],
+            "content": draft["content"],
+            "context_used": self.parse_context_used(draft.get("context_used")),
+        }
+
+    def write_accepted_memories(
+        self,
+        payloads: list[dict[str, Any]],
+        copilot: SupportCopilot,
+        logger: logging.Logger,
+    ) -> list[dict[str, Any] | Exception]:
+        """Persist a batch of accepted drafts to Mem0 and the draft cache.
+
+        A Mem0 error is returned in place of the result of each payload it
+        affected, so the job queue retries only those jobs and customers whose
+        memories were already stored are not written twice. The draft cache
+        stays best-effort, as it was when acceptance wrote inline.
+        """
+        errors = copilot.save_accepted_resolutions(
+            [
+                {
+                    "customer_email": payload["customer_email"],
+                    "customer_company": payload.get("customer_company"),
+                    "ticket_subject": payload["subject"],
+                    "ticket_description": payload["description"],
+                    "draft_content": payload["content"],
+                    "context_used": payload.get("context_used"),
+                }
+                for payload in payloads
+            ]
+        )
+        results: list[dict[str, Any] | Exception] = []
+        for payload, error in zip(payloads, errors):
+            if error is not None:
+                results.append(error)
+                continue
+            try:
+                cached = copilot.remember_accepted_draft(
+                    draft_id=payload["draft_id"],
+                    ticket_id=payload["ticket_id"],
+                    ticket_subject=payload["subject"],
+                    ticket_description=payload["description"],
+                    draft_content=payload["content"],
+                    customer_name=payload.get("customer_name"),
+                    customer_email=payload["customer_email"],
+                    context_used=payload.get("context_used"),
+                    customer_company=payload.get("customer_company"),
+                )
+            except Exception:
+                logger.exception("Draft cache update failed for draft_id=%s", payload["draft_id"])
+                cached = False
+            results.append({"draft_id": payload["draft_id"], "batch_size": len(payloads), "cached": cached})
+        return results
+
+    def store_failed_draft(
+        self,
+        ticket_id: int,
+        drafts_repo: DraftsRepository,
+        error_text: str,
+    ) -> dict[str, Any]:
+        with time_stage("db_write"):
+            return drafts_repo.create(**self._failed_draft_row(ticket_id, error_text))
+
     def generate_and_store_manual(
         self,
         ticket_id: int,
@@ -105,13 +342,47 @@ class DraftService:
         copilot: SupportCopilot,
     ) -> dict[str, Any]:
         result = copilot.generate_draft(ticket=ticket, customer=customer)
+        return self._store_pending_draft(ticket_id=ticket_id, result=result, drafts_repo=drafts_repo)
+
+    def stream_and_store_manual(
+        self,
+        ticket_id: int,
+        ticket: dict[str, Any],
+        customer: dict[str, Any],
+        drafts_repo: DraftsRepository,
+        copilot: SupportCopilot,
+        logger: logging.Logger,
+    ) -> Iterator[dict[str, Any]]:
+        """Relay copilot stream events, then persist the draft and emit it as ``draft``.
+
+        Failures are reported as a terminal ``error`` event because the HTTP
+        status has already been sent by the time the agent runs.
+        """
+        try:
+            for event in copilot.stream_draft(ticket=ticket, customer=customer):
+                if event["event"] != "result":
+                    yield event
+                    continue
+                draft = self._store_pending_draft(ticket_id=ticket_id, result=event["data"], drafts_repo=drafts_repo)
+                yield {"event": "draft", "data": self.serialize_draft(draft)}
+        except Exception as exc:
+            logger.exception("Streaming draft generation failed for ticket_id=%s", ticket_id)
+            yield {"event": "error", "data": {"detail": f"Failed to generate draft: {exc}"}}
+
+    def _store_pending_draft(
+        self,
+        ticket_id: int,
+        result: dict[str, Any],
+        drafts_repo: DraftsRepository,
+    ) -> dict[str, Any]:
         draft_text, context_used = self._normalize_draft_result(result)
-        return drafts_repo.create(
-            ticket_id=ticket_id,
-            content=draft_text,
-            context_used=json.dumps(context_used),
-            status="pending",
-        )
+        with time_stage("db_write"):
+            return drafts_repo.create(
+                ticket_id=ticket_id,
+                content=draft_text,
+                context_used=json.dumps(context_used),
+                status="pending",
+            )
 
     
     def _normalize_draft_result(self, result: dict[str, Any]) -> tuple[str, dict[str, Any]]:
@@ -131,6 +402,24 @@ class DraftService:
 
         return draft_text, context
 
+    def _failed_draft_row(self, ticket_id: int, error_text: str) -> dict[str, Any]:
+        return {
+            "ticket_id": ticket_id,
+            "content": FAILED_DRAFT_CONTENT,
+            "context_used": json.dumps(self._failed_context(error_text)),
+            "status": "failed",
+        }
+
+    @staticmethod
+    def _ticket_customer(ticket: dict[str, Any]) -> dict[str, Any]:
+        """The customer of a ``TicketsRepository.get_by_id``-shaped row, shaped like ``customers``."""
+        return {
+            "id": ticket["customer_id"],
+            "email": ticket["customer_email"],
+            "name": ticket.get("customer_name"),
+            "company": ticket.get("customer_company"),
+        }
+
     @staticmethod
     def _failed_context(error_text: str) -> dict[str, Any]:
         return {
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.repositories.sqlite.jobs import JobsRepository
+
+JobHandler = Callable[[dict[str, Any]], dict[str, Any] | None]
+BatchJobHandler = Callable[[list[dict[str, Any]]], list[dict[str, Any] | Exception | None]]
+JobFailureHook = Callable[[dict[str, Any], str], None]
+
+
+@dataclass
+class _Registration:
+    handler: JobHandler | None = None
+    on_failure: JobFailureHook | None = None
+    batch_handler: BatchJobHandler | None = None
+    batch_size: int = 1
+
+
+class JobQueue:
+    """Worker pool over the durable ``jobs`` table.
+
+    Workers lease the highest-priority due job, run the handler registered for
+    its ``kind`` and record the outcome. Failed attempts are retried with
+    exponential backoff; leases are renewed while a job runs so that only jobs
+    of a crashed process are picked up again.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        jobs_repo: JobsRepository,
+        logger: logging.Logger,
+    ):
+        self._settings = settings
+        self._jobs_repo = jobs_repo
+        self._logger = logger
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._registrations: dict[str, _Registration] = {}
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._in_flight = 0
+        self._idle = threading.Condition(self._lock)
+
+    @property
+    def owner(self) -> str:
+        return self._owner
+
+    def register(
+        self,
+        kind: str,
+        handler: JobHandler,
+        on_failure: JobFailureHook | None = None,
+    ) -> None:
+        self._registrations[kind] = _Registration(handler=handler, on_failure=on_failure)
+
+    def register_batch(
+        self,
+        kind: str,
+        handler: BatchJobHandler,
+        batch_size: int,
+        on_failure: JobFailureHook | None = None,
+    ) -> None:
+        """Handle up to ``batch_size`` due jobs of ``kind`` in one call.
+
+        The handler returns one result per job, in order. A result that is an
+        exception fails only that job. If the handler raises, every job in the
+        batch records a failed attempt. Failed jobs are retried on their own
+        schedule.
+        """
+        self._registrations[kind] = _Registration(
+            on_failure=on_failure,
+            batch_handler=handler,
+            batch_size=max(1, batch_size),
+        )
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        resource: str | None = None,
+        priority: int = 2,
+    ) -> dict[str, Any]:
+        job = self._jobs_repo.enqueue(
+            kind=kind,
+            payload=payload,
+            resource=resource,
+            priority=priority,
+            max_attempts=self._settings.job_max_attempts,
+        )
+        self._wake.set()
+        return job
+
+    def enqueue_many(self, kind: str, jobs: list[dict[str, Any]]) -> list[int]:
+        job_ids = self._jobs_repo.enqueue_many(kind, jobs, max_attempts=self._settings.job_max_attempts)
+        if job_ids:
+            self._wake.set()
+        return job_ids
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            workers = max(0, self._settings.job_workers)
+            for index in range(workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if workers:
+                thread = threading.Thread(target=self._maintain, name="job-lease-keeper", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def shutdown(self, timeout: float | None = None) -> bool:
+        """Stop claiming new jobs and wait for in-flight jobs to finish.
+
+        Returns False when jobs were still running at the deadline; their leases
+        then lapse and another process picks them up.
+        """
+        drain_timeout = self._settings.job_drain_timeout_s if timeout is None else timeout
+        self._stopping.set()
+        self._wake.set()
+        deadline = time.monotonic() + drain_timeout
+        with self._idle:
+            while self._in_flight and time.monotonic() < deadline:
+                self._idle.wait(timeout=max(0.0, deadline - time.monotonic()))
+            drained = self._in_flight == 0
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        if not drained:
+            self._logger.warning("Job queue shut down with in-flight jobs; their leases will expire.")
+        return drained
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "owner": self._owner,
+                "workers": len([thread for thread in self._threads if thread.name.startswith("job-worker")]),
+                "in_flight": self._in_flight,
+                "kinds": sorted(self._registrations),
+            }
+
+    def run_pending(self, max_jobs: int | None = None) -> int:
+        """Process due jobs on the calling thread; used by tests and one-off scripts."""
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            ran = self._run_one(respect_stop=False)
+            if not ran:
+                break
+            processed += ran
+        return processed
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                ran = self._run_one()
+            except Exception:
+                self._logger.exception("Job worker loop failed")
+                ran = 0
+            if not ran:
+                self._wake.wait(timeout=self._settings.job_poll_interval_s)
+                self._wake.clear()
+
+    def _maintain(self) -> None:
+        interval = max(1.0, self._settings.job_lease_s / 3)
+        while not self._stopping.wait(timeout=interval):
+            try:
+                self._jobs_repo.renew_leases(self._owner, self._settings.job_lease_s)
+                if self._jobs_repo.requeue_expired():
+                    self._wake.set()
+            except Exception:
+                self._logger.exception("Job lease maintenance failed")
+
+    def _run_one(self, respect_stop: bool = True) -> int:
+        """Claim and run one job, or one batch for batch kinds; returns the number of jobs run."""
+        with self._lock:
+            if respect_stop and self._stopping.is_set():
+                return 0
+            self._in_flight += 1
+        try:
+            claimed = self._jobs_repo.claim(
+                kinds=list(self._registrations),
+                owner=self._owner,
+                lease_seconds=self._settings.job_lease_s,
+                limit=1,
+            )
+            if not claimed:
+                return 0
+            registration = self._registrations[claimed[0]["kind"]]
+            if registration.batch_handler is None:
+                self._execute(claimed[0])
+                return 1
+            if registration.batch_size > 1:
+                claimed += self._jobs_repo.claim(
+                    kinds=[claimed[0]["kind"]],
+                    owner=self._owner,
+                    lease_seconds=self._settings.job_lease_s,
+                    limit=registration.batch_size - 1,
+                )
+            self._execute_batch(claimed, registration)
+            return len(claimed)
+        finally:
+            with self._idle:
+                self._in_flight -= 1
+                self._idle.notify_all()
+
+    def _execute(self, job: dict[str, Any]) -> None:
+        registration = self._registrations[job["kind"]]
+        job = {**job, "payload": json.loads(job.get("payload") or "{}")}
+        try:
+            result = registration.handler(job)
+        except Exception as exc:
+            self._handle_failure(job, registration, exc)
+            return
+        self._complete(job, result)
+
+    def _execute_batch(self, jobs: list[dict[str, Any]], registration: _Registration) -> None:
+        jobs = [{**job, "payload": json.loads(job.get("payload") or "{}")} for job in jobs]
+        try:
+            results = registration.batch_handler(jobs)
+        except Exception as exc:
+            for job in jobs:
+                self._handle_failure(job, registration, exc)
+            return
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                self._handle_failure(job, registration, result)
+            else:
+                self._complete(job, result)
+
+    def _complete(self, job: dict[str, Any], result: dict[str, Any] | None) -> None:
+        if not self._jobs_repo.complete(job["id"], owner=self._owner, result=result):
+            self._lost_lease(job)
+
+    def _lost_lease(self, job: dict[str, Any]) -> None:
+        self._logger.warning(
+            "Job %s (%s) lost its lease to another worker; its outcome was not recorded",
+            job["id"],
+            job["kind"],
+        )
+
+    def _handle_failure(self, job: dict[str, Any], registration: _Registration, exc: Exception) -> None:
+        error = f"{type(exc).__name__}: {exc}"
+        if job["attempts"] < job["max_attempts"]:
+            delay = min(
+                self._settings.job_retry_backoff_max_s,
+                self._settings.job_retry_backoff_s * (2 ** (job["attempts"] - 1)),
+            )
+            delay *= random.uniform(0.8, 1.2)
+            self._logger.warning(
+                "Job %s (%s) attempt %s failed, retrying in %.1fs: %s",
+                job["id"],
+                job["kind"],
+                job["attempts"],
+                delay,
+                error,
+            )
+            if not self._jobs_repo.fail(job["id"], owner=self._owner, error=error, retry_at=time.time() + delay):
+                self._lost_lease(job)
+            return
+
+        self._logger.error("Job %s (%s) failed permanently: %s", job["id"], job["kind"], error)
+        if not self._jobs_repo.fail(job["id"], owner=self._owner, error=error, retry_at=None):
+            self._lost_lease(job)
+            return
+        if registration.on_failure is not None:
+            try:
+                registration.on_failure(job, error)
+            except Exception:
+                self._logger.exception("Failure hook for job %s raised", job["id"])
@@ -1,16 +1,42 @@
 from __future__ import annotations
 
+import logging
+from typing import TYPE_CHECKING
+
 from customer_support_agent.core.settings import Settings
-from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+from customer_support_agent.integrations.rag.kb_watcher import KnowledgeBaseWatcher
+
+if TYPE_CHECKING:
+    from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
 
 
 class KnowledgeService:
     def __init__(self, settings: Settings):
         self._settings = settings
+        self._rag_service: KnowledgeBaseService | None = None
+
+    def _get_rag_service(self) -> KnowledgeBaseService:
+        if self._rag_service is None:
+            from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+
+            self._rag_service = KnowledgeBaseService(settings=self._settings)
+        return self._rag_service
 
     def ingest(self, clear_existing: bool = False) -> dict[str, int]:
-        rag_service = KnowledgeBaseService(settings=self._settings)
-        return rag_service.ingest_directory(
+        return self._get_rag_service().ingest_directory(
             directory=self._settings.knowledge_base_path,
             clear_existing=clear_existing,
-        )
\ No newline at end of file
+        )
+
+    def build_watcher(self, logger: logging.Logger) -> KnowledgeBaseWatcher | None:
+        """Watcher for ``knowledge_base/`` per ``kb_watch_mode``, or None when it is ``off``."""
+        if self._settings.kb_watch_mode == "off":
+            return None
+        return KnowledgeBaseWatcher(
+            directory=self._settings.knowledge_base_path,
+            ingest=self.ingest,
+            logger=logger,
+            mode=self._settings.kb_watch_mode,
+            interval_s=self._settings.kb_watch_interval_s,
+            debounce_s=self._settings.kb_watch_debounce_s,
+        )
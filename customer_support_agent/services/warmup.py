@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Sequence
+
+WarmupStep = tuple[str, Callable[[], Any] | None]
+
+
+class StartupWarmup:
+    """Run the slow first-use work of the draft path before traffic needs it.
+
+    Steps run in order on a daemon thread, so the API starts serving
+    ``/health`` and ticket CRUD at once while ``/ready`` reports whether the
+    LLM and vector stack is loaded. The first failing step stops the run, and
+    the steps after it are reported as ``skipped``. A step given as
+    ``(name, None)`` is not configured; it is reported as ``disabled`` and
+    does not hold back readiness.
+    """
+
+    def __init__(self, steps: Sequence[WarmupStep], logger: logging.Logger):
+        self._steps = list(steps)
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._status = "pending"
+        self._started_at: float | None = None
+        self._results: list[dict[str, Any]] = [
+            {"name": name, "status": "pending" if step else "disabled", "duration_ms": None, "error": None}
+            for name, step in self._steps
+        ]
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._status = "warming"
+            self._started_at = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name="startup-warmup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._status == "ready"
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            return {"status": self._status, "steps": [dict(result) for result in self._results]}
+
+    def _run(self) -> None:
+        failed = False
+        for (name, step), result in zip(self._steps, self._results):
+            if step is None:
+                continue
+            if failed:
+                self._update(result, status="skipped")
+                continue
+            self._update(result, status="running")
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as exc:
+                failed = True
+                self._logger.exception("Startup warmup step %s failed", name)
+                self._update(result, status="failed", duration_ms=_elapsed_ms(started), error=str(exc))
+            else:
+                self._update(result, status="done", duration_ms=_elapsed_ms(started))
+
+        with self._lock:
+            self._status = "failed" if failed else "ready"
+        self._logger.info(
+            "Startup warmup %s in %.0f ms",
+            self._status,
+            _elapsed_ms(self._started_at or time.perf_counter()),
+        )
+        self._done.set()
+
+    def _update(self, result: dict[str, Any], **fields: Any) -> None:
+        with self._lock:
+            result.update(fields)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
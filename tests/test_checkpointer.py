@@ -0,0 +1,95 @@
+from pathlib import Path
+import sqlite3
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.integrations.memory.checkpointer import (
+    SQLiteCheckpointSaver,
+    checkpointer_stats,
+    get_checkpointer,
+)
+
+
+def _agent(saver: SQLiteCheckpointSaver, replies: list[str]):
+    return create_agent(
+        model=GenericFakeChatModel(messages=iter([AIMessage(content=reply) for reply in replies])),
+        tools=[],
+        checkpointer=saver,
+    )
+
+
+def test_sqlite_checkpointer_persists_threads_across_instances(tmp_path: Path) -> None:
+    path = tmp_path / "checkpoints.db"
+    config = {"configurable": {"thread_id": "ticket-7"}}
+
+    saver = SQLiteCheckpointSaver(path=path, ttl_s=3600, max_threads=10)
+    _agent(saver, ["First reply"]).invoke({"messages": [HumanMessage(content="Card blocked")]}, config=config)
+    saver.close()
+
+    reopened = SQLiteCheckpointSaver(path=path, ttl_s=3600, max_threads=10)
+    agent = _agent(reopened, ["Second reply"])
+    state = agent.get_state(config).values
+    assert [message.content for message in state["messages"]] == ["Card blocked", "First reply"]
+
+    result = agent.invoke({"messages": [HumanMessage(content="Still blocked")]}, config=config)
+    assert [message.content for message in result["messages"]][-1] == "Second reply"
+    assert len(result["messages"]) == 4
+    assert len(list(reopened.list(config, limit=2))) == 2
+    assert reopened.stats()["threads"] == 1
+
+
+def test_sqlite_checkpointer_evicts_expired_and_least_recent_threads(tmp_path: Path) -> None:
+    saver = SQLiteCheckpointSaver(path=tmp_path / "checkpoints.db", ttl_s=100, max_threads=2, evict_interval_s=1e9)
+    for ticket_id in range(4):
+        _agent(saver, ["ok"]).invoke(
+            {"messages": [HumanMessage(content="hi")]},
+            config={"configurable": {"thread_id": f"ticket-{ticket_id}"}},
+        )
+    saver.conn.execute("UPDATE checkpoint_threads SET updated_at = updated_at - 1000 WHERE thread_id = 'ticket-0'")
+
+    evicted = saver.evict()
+
+    assert evicted == 2
+    remaining = {row[0] for row in saver.conn.execute("SELECT DISTINCT thread_id FROM checkpoints")}
+    assert remaining == {"ticket-2", "ticket-3"}
+    stats = saver.stats()
+    assert stats["threads"] == 2
+    assert stats["evicted_threads"] == 2
+    assert saver.get_tuple({"configurable": {"thread_id": "ticket-0"}}) is None
+
+
+def test_sqlite_checkpointer_replaces_the_legacy_layout(tmp_path: Path) -> None:
+    path = tmp_path / "checkpoints.db"
+    legacy = sqlite3.connect(str(path))
+    legacy.executescript(
+        """
+        CREATE TABLE checkpoint_threads (thread_id TEXT PRIMARY KEY, updated_at REAL NOT NULL);
+        CREATE TABLE checkpoints (thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, metadata_type TEXT);
+        CREATE TABLE checkpoint_writes (thread_id TEXT);
+        INSERT INTO checkpoint_threads VALUES ('ticket-1', 0);
+        """
+    )
+    legacy.close()
+
+    saver = SQLiteCheckpointSaver(path=path, ttl_s=3600, max_threads=10)
+    _agent(saver, ["ok"]).invoke(
+        {"messages": [HumanMessage(content="hi")]},
+        config={"configurable": {"thread_id": "ticket-2"}},
+    )
+    assert saver.stats()["threads"] == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "ticket-2"}}) is not None
+
+
+def test_checkpointer_modes(tmp_path: Path) -> None:
+    assert get_checkpointer(Settings(agent_checkpointer="none")) is None
+    assert checkpointer_stats(Settings(agent_checkpointer="none")) == {"mode": "none"}
+
+    settings = Settings(agent_checkpointer="sqlite", checkpoint_db_path=tmp_path / "cp.db")
+    assert get_checkpointer(settings) is get_checkpointer(settings)
+    assert checkpointer_stats(settings)["mode"] == "sqlite"
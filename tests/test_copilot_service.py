@@ -0,0 +1,288 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from customer_support_agent.core.metrics import REGISTRY
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.services.context_packer import pack_context
+from customer_support_agent.services.copilot_service import SupportCopilot
+
+
+class FakeMemory:
+    def __init__(self, delays: dict[str, float], broken: set[str] | None = None):
+        self._delays = delays
+        self._broken = broken or set()
+
+    def search(self, query: str, user_id: str, limit: int = 5) -> list[dict]:
+        time.sleep(self._delays.get(user_id, 0.0))
+        if user_id in self._broken:
+            raise ConnectionError("vector store offline")
+        return [{"memory": f"{user_id} prefers email updates", "score": 0.9, "metadata": {}}]
+
+
+class FakeKnowledgeBase:
+    def search(self, query: str, top_k: int | None = None) -> list[dict]:
+        time.sleep(0.05)
+        return [{"content": "ATM reversals take 5 working days.", "source": "atm.md", "distance": 0.2}]
+
+
+def _copilot(memory: FakeMemory, **overrides) -> SupportCopilot:
+    copilot = object.__new__(SupportCopilot)
+    copilot._settings = Settings(**overrides)
+    copilot.memory = memory
+    copilot._memory_error = None
+    copilot.rag = FakeKnowledgeBase()
+    copilot._retrieval_pool = ThreadPoolExecutor(max_workers=copilot._settings.retrieval_max_workers)
+    return copilot
+
+
+def test_retrieval_branches_run_concurrently() -> None:
+    copilot = _copilot(FakeMemory({"alex@acme.io": 0.05, "company::acme": 0.05}))
+
+    started = time.perf_counter()
+    memory_hits, kb_hits, summary = copilot._retrieve_context("ATM", "alex@acme.io", "Acme")
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.14
+    assert len(memory_hits) == 2
+    assert kb_hits[0]["source"] == "atm.md"
+    assert {branch["name"] for branch in summary["branches"]} == {
+        "memory:alex@acme.io",
+        "memory:company::acme",
+        "knowledge",
+    }
+    assert all(branch["status"] == "ok" for branch in summary["branches"])
+
+
+def test_slow_or_failing_branch_keeps_other_results() -> None:
+    copilot = _copilot(
+        FakeMemory({"alex@acme.io": 0.5}, broken={"company::acme"}),
+        memory_search_timeout_s=0.1,
+    )
+
+    memory_hits, kb_hits, summary = copilot._retrieve_context("ATM", "alex@acme.io", "Acme")
+
+    statuses = {branch["name"]: branch["status"] for branch in summary["branches"]}
+    assert statuses == {
+        "memory:alex@acme.io": "timeout",
+        "memory:company::acme": "error",
+        "knowledge": "ok",
+    }
+    assert memory_hits == []
+    assert kb_hits and kb_hits[0]["content"].startswith("ATM reversals")
+
+
+def test_branch_timeouts_exclude_time_queued_behind_other_drafts() -> None:
+    copilot = _copilot(
+        FakeMemory({"alex@acme.io": 0.05, "company::acme": 0.05}),
+        retrieval_max_workers=2,
+        memory_search_timeout_s=0.08,
+        rag_search_timeout_s=0.08,
+    )
+
+    # Six drafts x three branches of ~50 ms on two workers queue for far longer than the 80 ms timeouts.
+    with ThreadPoolExecutor(max_workers=6) as drafts:
+        summaries = list(
+            drafts.map(lambda _: copilot._retrieve_context("ATM", "alex@acme.io", "Acme")[2], range(6))
+        )
+
+    branches = [branch for summary in summaries for branch in summary["branches"]]
+    assert {branch["status"] for branch in branches} == {"ok"}
+    assert max(branch["queued_ms"] for branch in branches) > 80
+
+
+def test_memory_search_returns_surviving_scopes() -> None:
+    copilot = _copilot(FakeMemory({}, broken={"company::acme"}))
+
+    found = copilot.search_customer_memories("alex@acme.io", "ATM", customer_company="Acme")
+
+    assert [hit["memory"] for hit in found["results"]] == ["alex@acme.io prefers email updates"]
+    statuses = {branch["name"]: branch["status"] for branch in found["branches"]}
+    assert statuses == {"memory:alex@acme.io": "ok", "memory:company::acme": "error"}
+
+
+def test_stream_draft_emits_tokens_then_result_matching_invoke() -> None:
+    copilot = _copilot(FakeMemory({}))
+    copilot._memory_error = None
+    copilot._agent = create_agent(
+        model=GenericFakeChatModel(messages=iter([AIMessage(content="Hi Alex, the reversal is on its way.")])),
+        tools=[],
+        checkpointer=InMemorySaver(),
+    )
+
+    events = list(
+        copilot.stream_draft(
+            ticket={"id": 7, "subject": "ATM", "description": "Cash not dispensed", "priority": "high"},
+            customer={"id": 1, "email": "alex@acme.io", "name": "Alex", "company": "Acme"},
+        )
+    )
+
+    names = [event["event"] for event in events]
+    assert names[0] == "retrieval" and names[-1] == "result"
+    assert names.count("token") > 1
+    tokens = "".join(event["data"]["text"] for event in events if event["event"] == "token")
+    assert tokens == "Hi Alex, the reversal is on its way."
+    result = events[-1]["data"]
+    assert result["draft"] == tokens
+    assert result["context_used"]["signals"]["knowledge_hit_count"] == 1
+
+
+def test_generate_draft_records_stage_timings() -> None:
+    copilot = _copilot(FakeMemory({}))
+    copilot._memory_error = None
+    copilot._agent = create_agent(
+        model=GenericFakeChatModel(messages=iter([AIMessage(content="Hi Alex, refund issued.")])),
+        tools=[],
+    )
+    llm_count = REGISTRY.get_sample_value("support_stage_duration_seconds_count", {"stage": "llm"}) or 0
+
+    result = copilot.generate_draft(
+        ticket={"id": 8, "subject": "ATM", "description": "Cash not dispensed", "priority": "high"},
+        customer={"id": 1, "email": "alex@acme.io", "name": "Alex", "company": "Acme"},
+    )
+
+    timings = result["context_used"]["timings"]
+    assert {"retrieval_ms", "knowledge_search_ms", "memory_search_ms", "agent_ms", "llm_ms", "draft_total_ms"} <= set(
+        timings
+    )
+    assert timings["llm_turns"] == 1
+    assert result["context_used"]["packing"]["kept"] == {"memory": 2, "knowledge": 1}
+    assert timings["knowledge_search_ms"] >= 50
+    assert timings["draft_total_ms"] >= timings["agent_ms"]
+    assert REGISTRY.get_sample_value("support_stage_duration_seconds_count", {"stage": "llm"}) == llm_count + 1
+    assert REGISTRY.get_sample_value("support_drafts_generated_total", {"runtime": "agent"}) >= 1
+
+
+class WordCounter:
+    name = "words"
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def test_pack_context_applies_cutoffs_then_fills_the_budget_best_first() -> None:
+    memory_hits = [
+        {"memory": "Prefers email updates", "score": 0.6},
+        {"memory": "Had a duplicate card charge reversed in March", "score": 0.9},
+        {"memory": "Asked about the weather", "score": 0.1},
+    ]
+    kb_hits = [
+        {"content": "ATM reversals take five working days to settle", "source": "atm.md", "distance": 0.2},
+        {"content": "Card disputes need the last four digits", "source": "cards.md", "distance": 0.9},
+        {"content": "Refunds", "source": "refunds.md", "distance": None},
+    ]
+
+    memory, knowledge, packing = pack_context(
+        memory_hits,
+        kb_hits,
+        budget_tokens=22,
+        memory_min_score=0.3,
+        kb_max_distance=0.5,
+        counter=WordCounter(),
+    )
+
+    # 9 + 10 words fit; the 4-word memory line then overflows, the 3-word KB line still fits.
+    assert [hit["score"] for hit in memory] == [0.9]
+    assert [hit["source"] for hit in knowledge] == ["atm.md", "refunds.md"]
+    assert packing["used_tokens"] == 22 and packing["budget_tokens"] == 22
+    assert [(item["kind"], item["reason"]) for item in packing["dropped"]] == [
+        ("memory", "below_min_score"),
+        ("knowledge", "above_max_distance"),
+        ("memory", "over_budget"),
+    ]
+
+
+class FakeDraftCache:
+    def lookup(self, ticket: dict, customer: dict) -> dict:
+        return {"hit": True, "similarity": 0.97, "threshold": 0.92, "source_draft_id": 4, "draft": "Hi Alex"}
+
+
+def test_draft_cache_hit_skips_retrieval_and_agent() -> None:
+    copilot = _copilot(FakeMemory({}, broken={"alex@acme.io"}))
+    copilot.draft_cache = FakeDraftCache()
+
+    result = copilot.generate_draft(
+        ticket={"id": 8, "subject": "ATM", "description": "Cash not dispensed"},
+        customer={"id": 1, "email": "alex@acme.io", "name": "Alex"},
+    )
+
+    assert result["draft"] == "Hi Alex"
+    assert result["context_used"]["agent_runtime"] == "draft_cache"
+    assert result["context_used"]["draft_cache"] == {
+        "hit": True,
+        "similarity": 0.97,
+        "threshold": 0.92,
+        "source_draft_id": 4,
+    }
+
+
+class RecordingMemory:
+    def __init__(self) -> None:
+        self.adds: list[tuple[str, list[str], list[str]]] = []
+
+    def add_resolutions(self, user_id: str, resolutions: list[dict], fan_out_user_ids=()) -> None:
+        self.adds.append(
+            (user_id, [resolution["ticket_subject"] for resolution in resolutions], list(fan_out_user_ids))
+        )
+
+
+def test_save_accepted_resolutions_extracts_once_per_customer() -> None:
+    memory = RecordingMemory()
+    copilot = _copilot(memory)
+    copilot._memory_error = None
+
+    copilot.save_accepted_resolutions(
+        [
+            {
+                "customer_email": email,
+                "customer_company": "Acme",
+                "ticket_subject": subject,
+                "ticket_description": "Card declined abroad.",
+                "draft_content": "We re-enabled international payments.",
+            }
+            for email, subject in (("alex@acme.io", "Card 1"), ("sam@acme.io", "Card 2"), ("alex@acme.io", "Card 3"))
+        ]
+    )
+
+    assert sorted(memory.adds) == [
+        ("alex@acme.io", ["Card 1", "Card 3"], ["company::acme"]),
+        ("sam@acme.io", ["Card 2"], ["company::acme"]),
+    ]
+
+
+class PagedMemory:
+    def __init__(self, scopes: dict[str, int]):
+        self._scopes = scopes
+
+    def list_memories(self, user_id: str, limit: int = 20, offset: int = 0) -> list[dict]:
+        count = self._scopes.get(user_id, 0)
+        return [
+            {"memory": f"{user_id} fact {index}", "score": None, "metadata": {}}
+            for index in range(offset, min(count, offset + limit))
+        ]
+
+
+def test_list_customer_memories_walks_scopes_with_a_cursor() -> None:
+    copilot = _copilot(PagedMemory({"alex@acme.io": 3, "company::acme": 2}))
+
+    pages, cursor = [], None
+    while True:
+        page = copilot.list_customer_memories("alex@acme.io", "Acme", limit=2, cursor=cursor)
+        pages.append([hit["memory"] for hit in page["memories"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == [
+        ["alex@acme.io fact 0", "alex@acme.io fact 1"],
+        ["alex@acme.io fact 2", "company::acme fact 0"],
+        ["company::acme fact 1"],
+    ]
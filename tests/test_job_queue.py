@@ -0,0 +1,257 @@
+from pathlib import Path
+import json
+import logging
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.repositories.sqlite import close_pool, configure_pool, init_db
+from customer_support_agent.repositories.sqlite.customers import CustomersRepository
+from customer_support_agent.repositories.sqlite.drafts import DraftsRepository
+from customer_support_agent.repositories.sqlite.jobs import JobsRepository, priority_rank
+from customer_support_agent.repositories.sqlite.tickets import TicketsRepository
+from customer_support_agent.services.copilot_service import SupportCopilot
+from customer_support_agent.services.draft_service import DRAFT_BATCH_JOB_KIND, DRAFT_JOB_KIND, DraftService
+from customer_support_agent.services.job_queue import JobQueue
+
+
+@pytest.fixture
+def settings(tmp_path: Path) -> Settings:
+    config = Settings(
+        workspace_dir=tmp_path,
+        data_dir=Path("data"),
+        db_path=Path("data/support.db"),
+        chroma_rag_dir=Path("data/chroma_rag"),
+        chroma_mem0_dir=Path("data/chroma_mem0"),
+        knowledge_base_dir=Path("knowledge_base"),
+        job_workers=0,
+        job_max_attempts=2,
+        job_retry_backoff_s=0.0,
+    )
+    configure_pool(config)
+    init_db()
+    yield config
+    close_pool()
+
+
+def test_jobs_run_in_ticket_priority_order(settings: Settings) -> None:
+    queue = JobQueue(settings=settings, jobs_repo=JobsRepository(), logger=logging.getLogger(__name__))
+    handled: list[str] = []
+    queue.register("echo", lambda job: handled.append(job["payload"]["name"]) or {"ok": True})
+
+    for name, priority in (("low-1", "low"), ("medium", "medium"), ("urgent", "urgent"), ("low-2", "low")):
+        queue.enqueue("echo", {"name": name}, priority=priority_rank(priority))
+
+    assert queue.run_pending() == 4
+    assert handled == ["urgent", "medium", "low-1", "low-2"]
+
+
+def test_failed_jobs_retry_then_fail_with_hook(settings: Settings) -> None:
+    jobs_repo = JobsRepository()
+    queue = JobQueue(settings=settings, jobs_repo=jobs_repo, logger=logging.getLogger(__name__))
+    failures: list[str] = []
+
+    def explode(job: dict) -> None:
+        raise RuntimeError("model unavailable")
+
+    queue.register("explode", explode, on_failure=lambda job, error: failures.append(error))
+    job = queue.enqueue("explode", {"ticket_id": 1}, resource="ticket:1")
+
+    queue.run_pending()
+    stored = jobs_repo.get_by_id(job["id"])
+    assert stored["status"] == "failed"
+    assert stored["attempts"] == settings.job_max_attempts
+    assert failures == ["RuntimeError: model unavailable"]
+    assert jobs_repo.get_latest_for_resource("ticket:1")["id"] == job["id"]
+
+
+def test_only_the_current_lease_owner_records_an_outcome(settings: Settings) -> None:
+    jobs_repo = JobsRepository()
+    job = jobs_repo.enqueue("echo", {"name": "slow"})
+    jobs_repo.claim(["echo"], owner="worker-a", lease_seconds=-1)
+    assert jobs_repo.requeue_expired() == 1
+    jobs_repo.claim(["echo"], owner="worker-b", lease_seconds=60)
+
+    # worker-a's lease expired and worker-b re-claimed the job; a's late outcome is ignored.
+    assert jobs_repo.complete(job["id"], owner="worker-a", result={"late": True}) is False
+    assert jobs_repo.fail(job["id"], owner="worker-a", error="late failure") is False
+    assert jobs_repo.get_by_id(job["id"])["lease_owner"] == "worker-b"
+    assert jobs_repo.complete(job["id"], owner="worker-b", result={"ok": True}) is True
+    assert jobs_repo.get_by_id(job["id"])["status"] == "succeeded"
+
+
+def test_batch_jobs_are_claimed_together_and_retried_together(settings: Settings) -> None:
+    jobs_repo = JobsRepository()
+    queue = JobQueue(settings=settings, jobs_repo=jobs_repo, logger=logging.getLogger(__name__))
+    batches: list[list[int]] = []
+
+    def write(jobs: list[dict]) -> list[dict]:
+        batches.append([job["payload"]["n"] for job in jobs])
+        if len(batches) == 1:
+            raise ConnectionError("mem0 unavailable")
+        return [{"n": job["payload"]["n"]} for job in jobs]
+
+    queue.register_batch("memory_write", write, batch_size=3)
+    job_ids = [queue.enqueue("memory_write", {"n": n})["id"] for n in range(5)]
+
+    assert queue.run_pending() == 8
+    assert batches == [[0, 1, 2], [0, 1, 2], [3, 4]]
+    stored = [jobs_repo.get_by_id(job_id) for job_id in job_ids]
+    assert {job["status"] for job in stored} == {"succeeded"}
+    assert [job["attempts"] for job in stored] == [2, 2, 2, 1, 1]
+
+
+class FlakyMemory:
+    def __init__(self, broken_once: str) -> None:
+        self.adds: list[tuple[str, list[str]]] = []
+        self._broken_once = broken_once
+
+    def add_resolutions(self, user_id: str, resolutions: list[dict], fan_out_user_ids=()) -> None:
+        if user_id == self._broken_once:
+            self._broken_once = ""
+            raise ConnectionError("mem0 unavailable")
+        self.adds.append((user_id, [resolution["ticket_subject"] for resolution in resolutions]))
+
+
+def test_memory_write_batch_retries_only_the_failed_scope_group(settings: Settings) -> None:
+    jobs_repo = JobsRepository()
+    queue = JobQueue(settings=settings, jobs_repo=jobs_repo, logger=logging.getLogger(__name__))
+    copilot = object.__new__(SupportCopilot)
+    copilot.memory = FlakyMemory(broken_once="sam@acme.io")
+    copilot._memory_error = None
+    copilot.draft_cache = None
+
+    def write(jobs: list[dict]) -> list:
+        return DraftService().write_accepted_memories(
+            payloads=[job["payload"] for job in jobs],
+            copilot=copilot,
+            logger=logging.getLogger(__name__),
+        )
+
+    queue.register_batch("memory_write", write, batch_size=3)
+    job_ids = [
+        queue.enqueue(
+            "memory_write",
+            {
+                "draft_id": draft_id,
+                "ticket_id": draft_id,
+                "customer_email": email,
+                "subject": f"Card {draft_id}",
+                "description": "Card declined abroad.",
+                "content": "We re-enabled international payments.",
+            },
+        )["id"]
+        for draft_id, email in ((1, "alex@acme.io"), (2, "sam@acme.io"), (3, "alex@acme.io"))
+    ]
+
+    queue.run_pending()
+
+    assert copilot.memory.adds == [("alex@acme.io", ["Card 1", "Card 3"]), ("sam@acme.io", ["Card 2"])]
+    stored = [jobs_repo.get_by_id(job_id) for job_id in job_ids]
+    assert {job["status"] for job in stored} == {"succeeded"}
+    assert [job["attempts"] for job in stored] == [1, 2, 1]
+
+
+class BatchCopilot:
+    def __init__(self) -> None:
+        self.kb_batches: list[list[str]] = []
+
+    def search_knowledge_many(self, tickets: list[dict]) -> list[list[dict]]:
+        self.kb_batches.append([ticket["subject"] for ticket in tickets])
+        return [[{"content": f"KB for {ticket['subject']}", "source": "kb.md"}] for ticket in tickets]
+
+    def generate_draft(self, ticket: dict, customer: dict, kb_hits: list[dict] | None = None) -> dict:
+        if ticket["subject"] == "Broken":
+            raise RuntimeError("model unavailable")
+        return {"draft": f"Re: {ticket['subject']}", "context_used": {"knowledge_hits": kb_hits}}
+
+
+def test_draft_batch_shares_one_kb_search_and_fails_jobs_individually(settings: Settings) -> None:
+    jobs_repo, drafts_repo = JobsRepository(), DraftsRepository()
+    queue = JobQueue(settings=settings, jobs_repo=jobs_repo, logger=logging.getLogger(__name__))
+    copilot = BatchCopilot()
+    logger = logging.getLogger(__name__)
+
+    def run_draft_jobs(jobs: list[dict]) -> list:
+        drafts = DraftService().generate_and_store_for_tickets(
+            ticket_ids=[job["payload"]["ticket_id"] for job in jobs],
+            tickets_repo=TicketsRepository(),
+            drafts_repo=drafts_repo,
+            copilot_factory=lambda: copilot,
+            logger=logger,
+            max_parallel=2,
+        )
+        return [draft if isinstance(draft, Exception) else {"draft_id": draft and draft["id"]} for draft in drafts]
+
+    queue.register_batch(DRAFT_JOB_KIND, run_draft_jobs, batch_size=8)
+    customer = CustomersRepository().create_or_get(email="alex@acme.io")
+    tickets = [
+        TicketsRepository().create(customer_id=customer["id"], subject=subject, description="Cash not dispensed.")
+        for subject in ("ATM", "Broken", "KYC")
+    ]
+    job_ids = [queue.enqueue(DRAFT_JOB_KIND, {"ticket_id": ticket["id"]})["id"] for ticket in tickets]
+
+    queue.run_pending()
+
+    assert copilot.kb_batches == [["ATM", "Broken", "KYC"], ["Broken"]]
+    assert [jobs_repo.get_by_id(job_id)["status"] for job_id in job_ids] == ["succeeded", "failed", "succeeded"]
+    draft = drafts_repo.get_latest_for_ticket(tickets[0]["id"])
+    assert draft["content"] == "Re: ATM" and "KB for ATM" in draft["context_used"]
+
+
+def test_draft_batch_job_reports_progress_and_resumes_after_done_tickets(settings: Settings) -> None:
+    jobs_repo, drafts_repo, tickets_repo = JobsRepository(), DraftsRepository(), TicketsRepository()
+    queue = JobQueue(settings=settings, jobs_repo=jobs_repo, logger=logging.getLogger(__name__))
+    copilot = BatchCopilot()
+    snapshots: list[dict] = []
+
+    def run_draft_batch(job: dict) -> dict:
+        def record(progress: dict) -> None:
+            snapshots.append({**progress, "done_ticket_ids": list(progress["done_ticket_ids"])})
+            jobs_repo.update_result(job["id"], progress)
+
+        return DraftService().generate_batch(
+            ticket_ids=job["payload"]["ticket_ids"],
+            tickets_repo=tickets_repo,
+            drafts_repo=drafts_repo,
+            copilot_factory=lambda: copilot,
+            logger=logging.getLogger(__name__),
+            max_parallel=2,
+            chunk_size=2,
+            progress=json.loads(job["result"]) if job.get("result") else None,
+            on_progress=record,
+        )
+
+    queue.register(DRAFT_BATCH_JOB_KIND, run_draft_batch)
+    customer = CustomersRepository().create_or_get(email="alex@acme.io", company="Acme")
+    tickets = [
+        tickets_repo.create(customer_id=customer["id"], subject=subject, description="Cash not dispensed.")
+        for subject in ("Done", "ATM", "Broken", "KYC")
+    ]
+    ticket_ids = [ticket["id"] for ticket in tickets] + [999]
+    job = queue.enqueue(DRAFT_BATCH_JOB_KIND, {"ticket_ids": ticket_ids})
+    # A previous attempt already drafted the first ticket.
+    previous = {"processed": 1, "succeeded": 1, "done_ticket_ids": [tickets[0]["id"]]}
+    jobs_repo.update_result(job["id"], DraftService.batch_progress(ticket_ids, previous))
+
+    queue.run_pending()
+
+    stored = jobs_repo.get_by_id(job["id"])
+    assert stored["status"] == "succeeded"
+    progress = json.loads(stored["result"])
+    assert {key: progress[key] for key in ("total", "processed", "succeeded", "failed", "skipped")} == {
+        "total": 5,
+        "processed": 5,
+        "succeeded": 3,
+        "failed": 1,
+        "skipped": 1,
+    }
+    assert [snapshot["processed"] for snapshot in snapshots] == [1, 3, 5]
+    assert copilot.kb_batches == [["ATM", "Broken"], ["KYC"]]
+    assert drafts_repo.get_latest_for_ticket(tickets[0]["id"]) is None
+    assert drafts_repo.get_latest_for_ticket(tickets[1]["id"])["content"] == "Re: ATM"
+    failed = drafts_repo.get_latest_for_ticket(tickets[2]["id"])
+    assert failed["status"] == "failed" and "model unavailable" in failed["context_used"]
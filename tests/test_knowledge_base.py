@@ -0,0 +1,394 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import hashlib
+import json
+
+import chromadb
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.integrations.rag.bm25_index import BM25Index, tokenize
+from customer_support_agent.integrations.rag.chroma_kb import KnowledgeBaseService
+from customer_support_agent.integrations.rag.diversify import merge_adjacent_chunks, mmr_order
+from customer_support_agent.integrations.rag.draft_cache import DraftCache
+from customer_support_agent.integrations.rag.embedding_cache import QueryEmbeddingCache
+from customer_support_agent.integrations.rag.vector_store import NumpyVectorStore
+
+
+class CountingEmbedder:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+
+def test_query_embedding_cache_hits_persist_and_invalidate_on_model_change(tmp_path: Path) -> None:
+    path = tmp_path / "embedding_cache.sqlite"
+    embedder = CountingEmbedder()
+
+    cache = QueryEmbeddingCache(path=path, model="gemini:gemini-embedding-001", max_entries=10)
+    first = cache.embed(["ATM  cash\nnot dispensed", "KYC update"], embedder)
+    second = cache.embed(["ATM cash not dispensed"], embedder)
+    assert second[0] == first[0]
+    assert embedder.calls == [["ATM cash not dispensed", "KYC update"]]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+    cache.close()
+
+    reopened = QueryEmbeddingCache(path=path, model="gemini:gemini-embedding-001", max_entries=10)
+    reopened.embed(["KYC update"], embedder)
+    assert len(embedder.calls) == 1
+    reopened.close()
+
+    switched = QueryEmbeddingCache(path=path, model="gemini:text-embedding-005", max_entries=10)
+    assert switched.stats()["size"] == 0
+    switched.embed(["KYC update"], embedder)
+    assert len(embedder.calls) == 2
+    switched.close()
+
+
+def test_query_embedding_cache_is_bounded(tmp_path: Path) -> None:
+    embedder = CountingEmbedder()
+    cache = QueryEmbeddingCache(path=tmp_path / "cache.sqlite", model="m", max_entries=2)
+
+    cache.embed(["a", "bb", "ccc"], embedder)
+    assert cache.stats()["size"] == 2
+    cache.embed(["a"], embedder)
+    assert embedder.calls[-1] == ["a"]
+    cache.close()
+
+
+class HashEmbeddingFunction(EmbeddingFunction[Documents]):
+    def __init__(self) -> None:
+        self.embedded: list[str] = []
+
+    def __call__(self, input: Documents) -> Embeddings:
+        self.embedded.extend(input)
+        vectors = []
+        for text in input:
+            vector = np.zeros(32, dtype=np.float32)
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 32] += 1.0
+            vectors.append(vector / (np.linalg.norm(vector) or 1.0))
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "hash-test"
+
+    def get_config(self) -> dict:
+        return {}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashEmbeddingFunction":
+        return HashEmbeddingFunction()
+
+
+@pytest.fixture(params=["chroma", "numpy"])
+def kb_service(request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> KnowledgeBaseService:
+    embedding_function = HashEmbeddingFunction()
+    monkeypatch.setattr(KnowledgeBaseService, "_build_embedding_function", lambda self: embedding_function)
+    settings = Settings(
+        workspace_dir=tmp_path,
+        chroma_rag_dir=Path("chroma_rag"),
+        knowledge_base_dir=Path("knowledge_base"),
+        embedding_cache_enabled=False,
+        rag_backend=request.param,
+        rag_chunk_size=60,
+        rag_chunk_overlap=0,
+    )
+    settings.chroma_rag_path.mkdir(parents=True)
+    settings.knowledge_base_path.mkdir(parents=True)
+    return KnowledgeBaseService(settings=settings)
+
+
+def test_ingest_only_embeds_changed_chunks_and_deletes_orphans(kb_service: KnowledgeBaseService) -> None:
+    directory = kb_service._settings.knowledge_base_path
+    embedder = kb_service._embedding_function
+    (directory / "atm.md").write_text("ATM cash not dispensed.\n\nRefunds reach the account in 5 days.")
+    (directory / "kyc.md").write_text("KYC documents are verified within 48 hours.")
+
+    first = kb_service.ingest_directory(directory)
+    assert first["files_indexed"] == 2 and first["chunks_added"] == first["chunks_indexed"] == 3
+    assert first["collection_count"] == 3
+
+    embedder.embedded.clear()
+    assert kb_service.ingest_directory(directory)["files_unchanged"] == 2
+    assert embedder.embedded == []
+
+    (directory / "atm.md").write_text("ATM cash not dispensed.\n\nRefunds reach the account in 7 days.")
+    (directory / "kyc.md").unlink()
+    second = kb_service.ingest_directory(directory)
+    assert embedder.embedded == ["Refunds reach the account in 7 days."]
+    assert second["chunks_added"] == 1 and second["chunks_deleted"] == 2
+    assert second["collection_count"] == 2
+    assert {hit["source"] for hit in kb_service.search("KYC documents", top_k=5)} == {"atm.md"}
+
+
+def test_ingest_keeps_unchanged_chunks_when_text_is_inserted_above_them(kb_service: KnowledgeBaseService) -> None:
+    directory = kb_service._settings.knowledge_base_path
+    embedder = kb_service._embedding_function
+    body = "ATM cash not dispensed.\n\nRefunds reach the account in 5 days."
+    (directory / "atm.md").write_text(body)
+    kb_service.ingest_directory(directory)
+
+    embedder.embedded.clear()
+    (directory / "atm.md").write_text("Urgent card blocks are handled by phone around the clock.\n\n" + body)
+    result = kb_service.ingest_directory(directory)
+
+    assert embedder.embedded == ["Urgent card blocks are handled by phone around the clock."]
+    assert result["chunks_added"] == 1 and result["chunks_deleted"] == 0
+    kb_service._settings.retrieval_mode = "dense"
+    hits = kb_service.search("Refunds reach the account in 5 days.", top_k=3)
+    indexes = {hit["content"]: hit["chunk_index"] for hit in hits}
+    assert indexes["Refunds reach the account in 5 days."] == 2
+
+
+def test_search_counts_the_store_only_until_it_has_vectors(
+    kb_service: KnowledgeBaseService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    directory = kb_service._settings.knowledge_base_path
+    count = kb_service._store.count
+    counts: list[int] = []
+    monkeypatch.setattr(kb_service._store, "count", lambda: counts.append(1) or count())
+
+    assert kb_service.search("ATM cash") == []
+    assert kb_service.search("ATM cash") == []
+    assert len(counts) == 2
+
+    (directory / "atm.md").write_text("ATM cash not dispensed.")
+    kb_service.ingest_directory(directory)
+    counts.clear()
+    for _ in range(3):
+        assert kb_service.search("ATM cash")[0]["source"] == "atm.md"
+    assert counts == []
+
+
+def test_draft_cache_reuses_accepted_draft_for_near_duplicate_ticket(tmp_path: Path) -> None:
+    embedder = HashEmbeddingFunction()
+    kb_version = ["v1"]
+    current = {11: True}
+    cache = DraftCache(
+        client=chromadb.PersistentClient(path=str(tmp_path / "chroma")),
+        collection_name="drafts",
+        embed=lambda texts: [vector.tolist() for vector in embedder(texts)],
+        threshold=0.9,
+        scope="company",
+        ttl_s=3600,
+        kb_version=lambda: kb_version[0],
+        is_current=lambda metadata: current[metadata["draft_id"]],
+    )
+    ticket = {"subject": "ATM cash not dispensed", "description": "My account was debited at the ATM"}
+    priya = {"name": "Priya", "email": "priya@acme.io", "company": "Acme"}
+    assert cache.lookup(ticket, priya)["hit"] is False
+
+    cache.add(
+        draft_id=11,
+        ticket_id=3,
+        subject="ATM cash not dispensed",
+        description="my account was debited at the ATM",
+        draft="Hi Alex Doe,\n\nAlex, the reversal reaches alex@acme.io's account in 5 days.",
+        customer_name="Alex Doe",
+        customer_email="alex@acme.io",
+        customer_company="ACME",
+    )
+
+    hit = cache.lookup(ticket, priya)
+    assert hit["hit"] is True and hit["source_draft_id"] == 11
+    assert hit["draft"] == "Hi Priya,\n\nPriya, the reversal reaches priya@acme.io's account in 5 days."
+
+    # Another company never sees the reply, whatever the similarity.
+    assert cache.lookup(ticket, {"name": "Sam", "email": "sam@globex.io", "company": "Globex"})["hit"] is False
+    miss = cache.lookup({"subject": "KYC update", "description": "Which documents do you need?"}, priya)
+    assert miss["hit"] is False and miss["similarity"] < 0.9
+
+    kb_version[0] = "v2"
+    assert cache.lookup(ticket, priya)["hit"] is False
+    kb_version[0] = "v1"
+
+    current[11] = False
+    stale = cache.lookup(ticket, priya)
+    assert stale["hit"] is False and stale["stale"] is True
+    assert cache.count() == 0
+
+
+def test_numpy_store_top_k_and_cross_instance_refresh(tmp_path: Path) -> None:
+    embedder = HashEmbeddingFunction()
+    writer = NumpyVectorStore(tmp_path, "kb", embed_documents=embedder)
+    reader = NumpyVectorStore(tmp_path, "kb", embed_documents=embedder)
+    documents = ["ATM cash not dispensed", "KYC update rules", "minimum balance charges", "card blocked abroad"]
+    writer.upsert([f"c{i}" for i in range(4)], documents, [{"source": f"{i}.md"} for i in range(4)])
+
+    assert reader.count() == 4
+    matches = reader.query(embedder(["KYC update rules"])[0], top_k=2)
+    assert [match["id"] for match in matches][0] == "c1"
+    assert matches[0]["distance"] == pytest.approx(0.0, abs=1e-6)
+    assert len(matches) == 2 and matches[0]["distance"] <= matches[1]["distance"]
+
+    writer.delete(["c1"])
+    assert reader.ids() == {"c0", "c2", "c3"}
+    assert reader.query(embedder(["KYC update rules"])[0], top_k=10)[0]["id"] != "c1"
+
+
+def test_numpy_store_swaps_whole_generations(tmp_path: Path) -> None:
+    embedder = HashEmbeddingFunction()
+    # A store from before generations: one unversioned matrix + sidecar pair.
+    np.save(tmp_path / "kb.f32.npy", np.asarray(embedder(["ATM cash"]), dtype=np.float32))
+    (tmp_path / "kb.meta.json").write_text('{"ids": ["c0"], "documents": ["ATM cash"], "metadatas": [{}]}')
+
+    writer = NumpyVectorStore(tmp_path, "kb", embed_documents=embedder)
+    reader = NumpyVectorStore(tmp_path, "kb", embed_documents=embedder)
+    assert reader.ids() == {"c0"} and not (tmp_path / "kb.meta.json").exists()
+
+    # Back-to-back writes land within one timestamp tick; the reader still sees both.
+    writer.upsert(["c1"], ["KYC update"], [{}])
+    writer.upsert(["c2"], ["card blocked"], [{}])
+    assert reader.ids() == {"c0", "c1", "c2"}
+    assert len(list(tmp_path.glob("kb.*.f32.npy"))) == 1
+
+    # A pointer to a generation whose matrix does not match its sidecar is never loaded.
+    sidecar = {"generation": "bad", "ids": ["x", "y"], "documents": ["x", "y"], "metadatas": [{}, {}]}
+    (tmp_path / "kb.bad.meta.json").write_text(json.dumps(sidecar))
+    np.save(tmp_path / "kb.bad.f32.npy", np.zeros((1, 3), dtype=np.float32))
+    (tmp_path / "kb.current").write_text("bad")
+    with pytest.raises(RuntimeError, match="no consistent generation"):
+        reader.count()
+    assert reader._generation.ids == ["c0", "c1", "c2"]
+
+
+def test_tokenize_keeps_compound_tokens_and_their_parts() -> None:
+    assert tokenize("Error E-1042 on /api/v2/refunds") == [
+        "error",
+        "e-1042",
+        "e",
+        "1042",
+        "on",
+        "/api/v2/refunds",
+        "api",
+        "v2",
+        "refunds",
+    ]
+
+
+def test_bm25_index_swaps_whole_generations(tmp_path: Path) -> None:
+    # An index from before generations: one unversioned JSON file.
+    (tmp_path / "kb.bm25.json").write_text(
+        json.dumps({"version": 1, "postings": {"atm": {"c0": 1}}, "docs": {"c0": {"length": 1, "document": "ATM"}}})
+    )
+    writer = BM25Index(tmp_path, "kb.bm25")
+    reader = BM25Index(tmp_path, "kb.bm25")
+    assert reader.count() == 1 and not (tmp_path / "kb.bm25.json").exists()
+
+    # Back-to-back saves land within one timestamp tick; the reader still sees both.
+    writer.apply(upserts=[{"id": "c1", "document": "KYC update"}], deletes=[])
+    writer.apply(upserts=[{"id": "c2", "document": "card blocked"}], deletes=["c0"])
+    assert [match["id"] for match in reader.search("kyc card atm", top_k=5)] == ["c1", "c2"]
+    assert len(list(tmp_path.glob("kb.bm25.*.json"))) == 1
+
+
+def test_hybrid_search_surfaces_exact_tokens_and_index_rebuilds(kb_service: KnowledgeBaseService) -> None:
+    directory = kb_service._settings.knowledge_base_path
+    (directory / "errors.md").write_text("Error E-1042 means the KYC document upload expired.")
+    (directory / "atm.md").write_text("Upload expired documents again from the app to finish the update.")
+    (directory / "fees.md").write_text("Minimum balance charges apply when the balance drops below the limit.")
+    kb_service.ingest_directory(directory)
+
+    kb_service._settings.retrieval_mode = "sparse"
+    sparse = kb_service.search("what does e-1042 mean", top_k=2)
+    assert [hit["source"] for hit in sparse] == ["errors.md"]
+
+    kb_service._settings.retrieval_mode = "hybrid"
+    hybrid = kb_service.search("what does e-1042 mean", top_k=2)
+    assert hybrid[0]["source"] == "errors.md" and hybrid[0]["sparse_rank"] == 1
+    assert hybrid[0]["score"] > hybrid[1]["score"]
+
+    kb_service._sparse._pointer_path.unlink()
+    result = kb_service.ingest_directory(directory)
+    assert result["chunks_added"] == 0 and result["files_unchanged"] == 3
+    assert kb_service._sparse.count() == result["collection_count"] == 5
+
+
+def test_mmr_order_demotes_near_duplicates() -> None:
+    candidates = [[1.0, 0.0, 0.0], [0.99, 0.01, 0.0], [0.7, 0.7, 0.0]]
+
+    assert mmr_order([1.0, 0.0, 0.0], candidates, lambda_mult=1.0) == [0, 1, 2]
+    assert mmr_order([1.0, 0.0, 0.0], candidates, lambda_mult=0.3) == [0, 2, 1]
+
+
+def test_merge_adjacent_chunks_removes_splitter_overlap_and_frees_slots() -> None:
+    hits = [
+        {"source": source, "chunk_index": index, "content": content, "distance": distance}
+        for source, index, content, distance in (
+            ("atm.md", 1, "reversed within five working days. Call us.", 0.3),
+            ("atm.md", 0, "Failed ATM cash is reversed within five working days.", 0.1),
+            ("kyc.md", 4, "KYC documents are verified in 48 hours.", 0.4),
+            ("fees.md", 0, "Minimum balance charges.", 0.5),
+        )
+    ]
+
+    merged = merge_adjacent_chunks(hits, limit=2, max_overlap=40)
+
+    assert [hit["source"] for hit in merged] == ["atm.md", "kyc.md"]
+    assert merged[0]["content"] == "Failed ATM cash is reversed within five working days. Call us."
+    assert merged[0]["chunk_indexes"] == [0, 1] and merged[0]["distance"] == 0.1
+
+
+def test_search_can_diversify_and_merge_neighbouring_chunks(kb_service: KnowledgeBaseService) -> None:
+    directory = kb_service._settings.knowledge_base_path
+    (directory / "refunds.md").write_text(
+        "Refund requests reach the account in five days.\n\n"
+        "Refund requests over the limit need a manager.\n\n"
+        "Refund status is shown in the app under payments."
+    )
+    (directory / "copy.md").write_text("Refund requests reach the account in five days.")
+    (directory / "kyc.md").write_text("KYC documents are verified within 48 hours.")
+    kb_service.ingest_directory(directory)
+    kb_service._settings.retrieval_mode = "dense"
+    kb_service._settings.rag_mmr_lambda = 0.3
+    query = "refund requests reach the account in five days"
+
+    plain = kb_service.search(query, top_k=2)
+    assert plain[0]["content"] == plain[1]["content"]
+
+    diverse = kb_service.search(query, top_k=2, mmr=True)
+    assert diverse[0]["content"] != diverse[1]["content"]
+    assert all("id" not in hit for hit in diverse)
+
+    merged = kb_service.search(query, top_k=2, merge_adjacent=True)
+    refunds = next(hit for hit in merged if hit["source"] == "refunds.md")
+    assert refunds["chunk_indexes"] == [0, 1, 2]
+    assert refunds["content"].count("Refund") == 3
+
+
+@pytest.mark.parametrize("mode", ["dense", "hybrid"])
+def test_search_many_matches_single_searches_with_one_store_query(
+    kb_service: KnowledgeBaseService, mode: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    directory = kb_service._settings.knowledge_base_path
+    (directory / "atm.md").write_text("ATM cash not dispensed.\n\nRefunds reach the account in 5 days.")
+    (directory / "kyc.md").write_text("KYC documents are verified within 48 hours.")
+    kb_service.ingest_directory(directory)
+    kb_service._settings.retrieval_mode = mode
+    queries = ["ATM cash refund", "KYC documents", "refund days"]
+
+    expected = [kb_service.search(query, top_k=2) for query in queries]
+    store_calls: list[int] = []
+    query_many = kb_service._store.query_many
+    monkeypatch.setattr(
+        kb_service._store,
+        "query_many",
+        lambda embeddings, top_k: store_calls.append(len(embeddings)) or query_many(embeddings, top_k),
+    )
+    embedder = kb_service._embedding_function
+    embedder.embedded.clear()
+
+    assert kb_service.search_many(queries, top_k=2) == expected
+    assert store_calls == [3]
+    assert embedder.embedded == queries
@@ -0,0 +1,118 @@
+from pathlib import Path
+import hashlib
+import sys
+import uuid
+
+import chromadb
+from mem0.vector_stores.chroma import ChromaDB
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from customer_support_agent.integrations.memory.mem0_store import CustomerMemoryStore
+
+
+class ExtractingMemory:
+    """Mimics ``mem0.Memory.add``: one extraction per call, stored in a real Chroma collection."""
+
+    def __init__(self, vector_store: ChromaDB):
+        self.vector_store = vector_store
+        self.add_calls: list[str] = []
+        self.updated_ids: list[str] = []
+
+    def add(self, messages: list[dict], user_id: str, metadata: dict) -> dict:
+        self.add_calls.append(user_id)
+        if self.updated_ids:
+            return {"results": [{"id": memory_id, "event": "UPDATE"} for memory_id in self.updated_ids]}
+        fact = "Customer had a duplicate card charge reversed."
+        memory_id = str(uuid.uuid4())
+        self.vector_store.insert(
+            vectors=[[0.1, 0.2, 0.3]],
+            payloads=[
+                {
+                    **metadata,
+                    "data": fact,
+                    "hash": hashlib.md5(fact.encode()).hexdigest(),
+                    "user_id": user_id,
+                }
+            ],
+            ids=[memory_id],
+        )
+        return {"results": [{"id": memory_id, "memory": fact, "event": "ADD"}]}
+
+
+def _store(tmp_path: Path) -> CustomerMemoryStore:
+    store = object.__new__(CustomerMemoryStore)
+    client = chromadb.PersistentClient(path=str(tmp_path / "mem0"))
+    store._memory = ExtractingMemory(ChromaDB(collection_name="mem0", client=client))
+    store._configure_list_cache(ttl_s=60.0, max_scopes=8)
+    return store
+
+
+def test_resolution_is_extracted_once_and_copied_to_shared_scopes(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    resolution = {
+        "ticket_subject": "Double charge",
+        "ticket_description": "Charged twice for one purchase.",
+        "accepted_draft": "We reversed the duplicate charge.",
+    }
+
+    store.add_resolutions("alex@acme.io", [resolution], fan_out_user_ids=["company::acme"])
+    store.add_resolutions("sam@acme.io", [resolution], fan_out_user_ids=["company::acme"])
+
+    collection = store._memory.vector_store.collection
+    rows = collection.get(include=["embeddings", "metadatas"])
+    by_scope = {}
+    for vector, payload in zip(rows["embeddings"], rows["metadatas"]):
+        by_scope.setdefault(payload["user_id"], []).append((list(vector), payload["data"]))
+
+    assert store._memory.add_calls == ["alex@acme.io", "sam@acme.io"]
+    # The second copy into the company scope is skipped: the same fact is already there.
+    assert sorted((scope, len(items)) for scope, items in by_scope.items()) == [
+        ("alex@acme.io", 1),
+        ("company::acme", 1),
+        ("sam@acme.io", 1),
+    ]
+    copied_vector, copied_fact = by_scope["company::acme"][0]
+    assert copied_fact == "Customer had a duplicate card charge reversed."
+    assert copied_vector == by_scope["alex@acme.io"][0][0]
+
+
+def test_reconciled_updates_fall_back_to_an_add_per_scope(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    store._memory.updated_ids = ["existing-memory"]
+    resolution = {"ticket_subject": "Refund", "ticket_description": "Late refund.", "accepted_draft": "Refunded."}
+
+    store.add_resolutions("alex@acme.io", [resolution], fan_out_user_ids=["company::acme", "company::globex"])
+
+    # The customer scope reconciled an existing fact, so each shared scope reconciles its own copy.
+    assert store._memory.add_calls == ["alex@acme.io", "company::acme", "company::globex"]
+
+
+def test_list_memories_pages_in_the_vector_store_and_caches_until_a_write(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    store._memory.vector_store.insert(
+        vectors=[[0.1, 0.2, float(index)] for index in range(5)],
+        payloads=[
+            {"data": f"fact {index}", "user_id": "company::acme", "type": "resolution"} for index in range(5)
+        ],
+        ids=[f"m{index}" for index in range(5)],
+    )
+    collection = store._memory.vector_store.collection
+    fetches: list[dict] = []
+    original_get = collection.get
+    collection.get = lambda **kwargs: fetches.append(kwargs) or original_get(**kwargs)
+
+    first = store.list_memories("company::acme", limit=2)
+    second = store.list_memories("company::acme", limit=2, offset=2)
+    assert [hit["memory"] for hit in first + second] == ["fact 0", "fact 1", "fact 2", "fact 3"]
+    assert first[0]["metadata"] == {"type": "resolution"}
+    assert [(fetch["limit"], fetch["offset"]) for fetch in fetches] == [(2, 0), (2, 2)]
+
+    assert store.list_memories("company::acme", limit=2) == first
+    assert len(fetches) == 2
+
+    store.add_resolutions(
+        "company::acme",
+        [{"ticket_subject": "Refund", "ticket_description": "Late refund.", "accepted_draft": "Refunded."}],
+    )
+    assert len(store.list_memories("company::acme", limit=10)) == 6
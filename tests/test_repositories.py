@@ -0,0 +1,176 @@
+from pathlib import Path
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from customer_support_agent.core.settings import Settings
+from customer_support_agent.repositories.sqlite import (
+    CustomersRepository,
+    TicketsRepository,
+    close_pool,
+    configure_pool,
+    get_pool,
+    init_db,
+)
+from customer_support_agent.integrations.tools.support_tools import lookup_open_ticket_load
+from customer_support_agent.repositories.sqlite.migrations import current_version, run_migrations
+
+
+@pytest.fixture
+def settings(tmp_path: Path) -> Settings:
+    config = Settings(
+        workspace_dir=tmp_path,
+        data_dir=Path("data"),
+        db_path=Path("data/support.db"),
+        chroma_rag_dir=Path("data/chroma_rag"),
+        chroma_mem0_dir=Path("data/chroma_mem0"),
+        knowledge_base_dir=Path("knowledge_base"),
+        sqlite_pool_size=2,
+    )
+    configure_pool(config)
+    init_db()
+    yield config
+    close_pool()
+
+
+def test_pool_reuses_connections_in_wal_mode(settings: Settings) -> None:
+    customers = CustomersRepository()
+    tickets = TicketsRepository()
+
+    customer = customers.create_or_get(email="alex@acme.io", name="Alex", company="Acme")
+    for index in range(5):
+        tickets.create(customer_id=customer["id"], subject=f"Issue {index}", description="Card declined at ATM")
+
+    stats = get_pool().stats()
+    assert stats["journal_mode"] == "wal"
+    assert stats["created"] == 1
+    assert stats["in_use"] == 0
+    assert stats["acquisitions"] >= 6
+    assert tickets.count_open_for_customer("alex@acme.io") == 5
+
+
+def test_pool_caps_connections_across_threads(settings: Settings) -> None:
+    customers = CustomersRepository()
+    errors: list[Exception] = []
+
+    def worker(index: int) -> None:
+        try:
+            for offset in range(10):
+                customers.create_or_get(email=f"user{index}-{offset}@acme.io")
+        except Exception as exc:  # pragma: no cover - surfaced by assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = get_pool().stats()
+    assert not errors
+    assert stats["created"] <= settings.sqlite_pool_size
+    assert stats["in_use"] == 0
+    assert customers.get_by_id(60) is not None
+
+
+def test_init_db_applies_versioned_migrations_once(settings: Settings) -> None:
+    with get_pool().connection() as conn:
+        versions = [row["version"] for row in conn.execute("SELECT version FROM schema_migrations")]
+        indexes = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        triggers = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+    assert versions == sorted(versions) and versions[-1] >= 2
+    assert {"idx_tickets_created_at_id", "idx_tickets_customer_status", "idx_drafts_ticket_created_id"} <= indexes
+    assert "tickets_updated_at_trigger" not in triggers
+    assert init_db() == []
+
+
+def test_customer_ticket_counters_follow_ticket_writes(settings: Settings) -> None:
+    customers = CustomersRepository()
+    tickets = TicketsRepository()
+    alex = customers.create_or_get(email="alex@acme.io", company="Acme")
+    sam = customers.create_or_get(email="sam@acme.io", company="Acme")
+
+    created = [
+        tickets.create(customer_id=alex["id"], subject=f"Issue {index}", description="Declined")
+        for index in range(3)
+    ]
+    tickets.create_many(
+        [
+            {"customer_email": "sam@acme.io", "subject": "Bulk", "description": "Refund"},
+            {"customer_email": "alex@acme.io", "subject": "Bulk", "description": "Refund", "status": "pending"},
+        ]
+    )
+    tickets.set_status(created[0]["id"], "resolved")
+    tickets.set_status(created[0]["id"], "resolved")
+    tickets.set_status(created[1]["id"], "pending")
+
+    assert customers.get_ticket_stats(alex["id"]) == {
+        "customer_id": alex["id"],
+        "customer_email": "alex@acme.io",
+        "total_ticket_count": 4,
+        "open_ticket_count": 1,
+        "resolved_ticket_count": 1,
+        "other_ticket_count": 2,
+    }
+    assert customers.get_ticket_stats(sam["id"])["open_ticket_count"] == 1
+    assert tickets.count_open_for_customer("alex@acme.io") == 1
+    assert customers.get_ticket_stats(999) is None
+
+    result = json.loads(lookup_open_ticket_load.invoke({"customer_email": "alex@acme.io"}))
+    assert result["details"] == {"customer_found": True, "open_tickets": 1, "load_band": "light"}
+
+
+def test_counter_migration_backfills_existing_tickets(tmp_path: Path) -> None:
+    conn = sqlite3.connect(str(tmp_path / "legacy.db"))
+    run_migrations(conn, target_version=4)
+    conn.execute("INSERT INTO customers (email) VALUES ('alex@acme.io')")
+    conn.executemany(
+        "INSERT INTO tickets (customer_id, subject, description, status) VALUES (1, 'ATM', 'No cash', ?)",
+        [("open",), ("open",), ("resolved",), ("pending",)],
+    )
+    conn.commit()
+
+    assert 5 in run_migrations(conn)
+    row = conn.execute(
+        "SELECT total_ticket_count, open_ticket_count, resolved_ticket_count FROM customers WHERE id = 1"
+    ).fetchone()
+    conn.close()
+    assert row == (4, 2, 1)
+
+
+def test_concurrent_migrations_apply_each_version_once(tmp_path: Path) -> None:
+    db_file = tmp_path / "race.db"
+    blocker = sqlite3.connect(str(db_file), isolation_level=None)
+    assert current_version(blocker) == 0
+    blocker.execute("BEGIN IMMEDIATE")
+    results: list[list[int]] = []
+    errors: list[Exception] = []
+
+    def migrate() -> None:
+        conn = sqlite3.connect(str(db_file), timeout=10, check_same_thread=False)
+        try:
+            results.append(run_migrations(conn))
+        except RuntimeError as exc:
+            errors.append(exc)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=migrate) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    # Both callers have read version 0 and now wait for the write lock the blocker holds.
+    time.sleep(0.3)
+    blocker.execute("COMMIT")
+    blocker.close()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(version for applied in results for version in applied) == [1, 2, 3, 4, 5]
@@ -1,27 +1,78 @@
 from pathlib import Path
+import logging
+import subprocess
 import sys
 
 from fastapi.testclient import TestClient
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from customer_support_agent.api.app_factory import create_app
+from customer_support_agent.api.app_factory import build_startup_warmup, create_app
 from customer_support_agent.core.settings import Settings
+from customer_support_agent.services.warmup import StartupWarmup
 
+ROOT = Path(__file__).resolve().parents[1]
 
-def test_health_endpoint_returns_ok(tmp_path: Path) -> None:
-    settings = Settings(
+
+def _settings(tmp_path: Path, **overrides) -> Settings:
+    return Settings(
         workspace_dir=tmp_path,
         data_dir=Path("data"),
         db_path=Path("data/support.db"),
         chroma_rag_dir=Path("data/chroma_rag"),
         chroma_mem0_dir=Path("data/chroma_mem0"),
         knowledge_base_dir=Path("knowledge_base"),
+        startup_warmup_enabled=False,
+        **overrides,
     )
 
-    app = create_app(settings=settings)
+
+def test_health_endpoint_returns_ok(tmp_path: Path) -> None:
+    app = create_app(settings=_settings(tmp_path))
     with TestClient(app) as client:
         response = client.get("/health")
 
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_ready_reports_warmup_progress(tmp_path: Path) -> None:
+    def fail() -> None:
+        raise RuntimeError("model download failed")
+
+    with TestClient(create_app(settings=_settings(tmp_path))) as client:
+        assert client.get("/ready").json()["warmup"] == "disabled"
+
+        warmup = StartupWarmup(steps=[("noop", lambda: None), ("copilot", None)], logger=logging.getLogger("test"))
+        client.app.state.warmup = warmup
+        assert client.get("/ready").status_code == 503
+        warmup.start()
+        assert warmup.wait(timeout=5)
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert [step["status"] for step in response.json()["steps"]] == ["done", "disabled"]
+
+        warmup = StartupWarmup(steps=[("model", fail), ("after", lambda: None)], logger=logging.getLogger("test"))
+        client.app.state.warmup = warmup
+        warmup.start()
+        assert warmup.wait(timeout=5)
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "failed"
+        assert [step["status"] for step in response.json()["steps"]] == ["failed", "skipped"]
+        assert response.json()["steps"][0]["error"] == "model download failed"
+
+
+def test_warmup_disables_the_copilot_step_without_a_groq_key(tmp_path: Path) -> None:
+    steps = build_startup_warmup(_settings(tmp_path, groq_api_key="")).status()["steps"]
+    assert {step["name"]: step["status"] for step in steps}["copilot"] == "disabled"
+
+
+def test_importing_the_app_does_not_load_the_llm_stack() -> None:
+    script = (
+        "import sys, main; "
+        "print(sorted({name.split('.')[0] for name in sys.modules} "
+        "& {'langchain', 'langchain_groq', 'langgraph', 'chromadb', 'mem0'}))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,313 @@
+import json
+from pathlib import Path
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from customer_support_agent.api.app_factory import create_app
+from customer_support_agent.api.dependencies import (
+    get_copilot_or_503,
+    get_knowledge_base_or_503,
+    get_settings_dep,
+)
+from customer_support_agent.core.settings import Settings
+
+
+@pytest.fixture
+def client(tmp_path: Path) -> TestClient:
+    settings = Settings(
+        workspace_dir=tmp_path,
+        data_dir=Path("data"),
+        db_path=Path("data/support.db"),
+        chroma_rag_dir=Path("data/chroma_rag"),
+        chroma_mem0_dir=Path("data/chroma_mem0"),
+        knowledge_base_dir=Path("knowledge_base"),
+        startup_warmup_enabled=False,
+    )
+    with TestClient(create_app(settings=settings)) as test_client:
+        yield test_client
+
+
+def _create_ticket(client: TestClient, index: int, **overrides) -> dict:
+    payload = {
+        "customer_email": f"customer{index % 2}@acme.io",
+        "customer_company": "Acme" if index % 2 else "Globex",
+        "subject": f"ATM issue {index}",
+        "description": "Cash was not dispensed but my account was debited.",
+        "priority": "urgent" if index % 3 == 0 else "low",
+        "auto_generate": False,
+        **overrides,
+    }
+    response = client.post("/api/tickets", json=payload)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_list_tickets_keyset_pages_cover_every_ticket(client: TestClient) -> None:
+    created = [_create_ticket(client, index) for index in range(7)]
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/tickets", params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == sorted((ticket["id"] for ticket in created), reverse=True)
+
+
+def test_list_tickets_filters_and_projects_fields(client: TestClient) -> None:
+    for index in range(6):
+        _create_ticket(client, index)
+
+    response = client.get(
+        "/api/tickets",
+        params={"priority": "urgent", "company": "Globex", "fields": "subject,status"},
+    )
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["subject"] for item in items] == ["ATM issue 0"]
+    assert set(items[0]) == {"id", "subject", "status"}
+
+    assert client.get("/api/tickets", params={"fields": "password"}).status_code == 400
+    assert client.get("/api/tickets", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_bulk_create_upserts_customers_in_one_request(client: TestClient) -> None:
+    existing = _create_ticket(client, 0, customer_email="alex@acme.io", customer_company=None)
+    tickets = [
+        {
+            "customer_email": "alex@acme.io" if index % 2 else f"new{index}@acme.io",
+            "customer_company": "Acme",
+            "subject": f"Bulk issue {index}",
+            "description": "Minimum balance charge applied incorrectly.",
+            "auto_generate": False,
+        }
+        for index in range(5)
+    ]
+
+    response = client.post("/api/tickets/bulk", json={"tickets": tickets})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created_count"] == 5
+    assert body["drafts_queued"] == 0
+    assert body["ticket_ids"] == list(range(existing["id"] + 1, existing["id"] + 6))
+
+    listed = client.get("/api/tickets", params={"customer_id": existing["customer_id"]}).json()
+    assert {item["subject"] for item in listed} == {"ATM issue 0", "Bulk issue 1", "Bulk issue 3"}
+    assert {item["customer_company"] for item in listed} == {"Acme"}
+
+
+def test_auto_generate_enqueues_a_durable_draft_job(client: TestClient) -> None:
+    ticket = _create_ticket(client, 0, auto_generate=True)
+    assert ticket["draft_job_id"] is not None
+
+    response = client.get(f"/api/jobs/{ticket['draft_job_id']}")
+    assert response.status_code == 200
+    job = response.json()
+    assert job["kind"] == "generate_draft"
+    assert job["resource"] == f"ticket:{ticket['id']}"
+    assert job["priority"] == 0
+    assert client.get("/api/jobs/999999").status_code == 404
+
+
+def test_auto_generate_respects_the_draft_backlog_cap(client: TestClient) -> None:
+    capped = Settings(**{**get_settings_dep().model_dump(), "draft_queue_max_pending": 1})
+    client.app.dependency_overrides[get_settings_dep] = lambda: capped
+
+    first = _create_ticket(client, 0, auto_generate=True)
+    second = _create_ticket(client, 1, auto_generate=True)
+
+    assert first["draft_job_id"] is not None
+    assert second["draft_job_id"] is None
+
+
+def test_customer_stats_reflect_ticket_status(client: TestClient) -> None:
+    first = _create_ticket(client, 0)
+    _create_ticket(client, 2)
+
+    stats = client.get(f"/api/customers/{first['customer_id']}/stats").json()
+    assert stats["customer_email"] == "customer0@acme.io"
+    assert (stats["total_ticket_count"], stats["open_ticket_count"]) == (2, 2)
+    assert client.get("/api/customers/999999/stats").status_code == 404
+
+
+class StreamingCopilot:
+    def stream_draft(self, ticket: dict, customer: dict):
+        yield {"event": "retrieval", "data": {"memory_hit_count": 0, "knowledge_hit_count": 1}}
+        for token in ("Hi ", "there"):
+            yield {"event": "token", "data": {"text": token}}
+        yield {"event": "result", "data": {"draft": "Hi there", "context_used": {"version": 2}}}
+
+
+def test_generate_draft_stream_sends_events_and_persists_draft(client: TestClient) -> None:
+    ticket = _create_ticket(client, 0)
+    client.app.dependency_overrides[get_copilot_or_503] = StreamingCopilot
+
+    with client.stream("GET", f"/api/tickets/{ticket['id']}/generate-draft/stream") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in body.strip().split("\n\n")
+        if block.startswith("event: ")
+    ]
+    assert [name for name, _ in events] == ["retrieval", "token", "token", "draft"]
+    draft = events[-1][1]
+    assert draft["content"] == "Hi there" and draft["status"] == "pending"
+    assert client.get(f"/api/drafts/{ticket['id']}").json()["id"] == draft["id"]
+    assert client.get("/api/tickets/999999/generate-draft/stream").status_code == 404
+    metrics = client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    families = {family.name: family for family in text_string_to_metric_families(metrics.text)}
+    stages = families["support_stage_duration_seconds"]
+    assert stages.type == "histogram"
+    db_write = {
+        sample.labels.get("le", sample.name): sample.value
+        for sample in stages.samples
+        if sample.labels["stage"] == "db_write"
+    }
+    assert db_write["+Inf"] == db_write["support_stage_duration_seconds_count"] >= 1
+
+
+def test_accepting_a_draft_queues_a_memory_write(client: TestClient) -> None:
+    ticket = _create_ticket(client, 1)
+    client.app.dependency_overrides[get_copilot_or_503] = StreamingCopilot
+    with client.stream("GET", f"/api/tickets/{ticket['id']}/generate-draft/stream") as response:
+        response.read()
+    draft = client.get(f"/api/drafts/{ticket['id']}").json()
+    assert draft["memory_write"] is None
+
+    response = client.patch(f"/api/drafts/{draft['id']}", json={"content": "Hi there!", "status": "accepted"})
+    assert response.status_code == 200
+    accepted = response.json()
+    assert accepted["status"] == "accepted"
+    memory_write = accepted["memory_write"]
+    assert memory_write["status"] in {"queued", "running", "failed"}
+
+    job = client.get(f"/api/jobs/{memory_write['job_id']}").json()
+    assert job["kind"] == "memory_write"
+    assert job["resource"] == f"draft:{draft['id']}"
+    assert job["payload"]["content"] == "Hi there!"
+    assert job["payload"]["customer_company"] == "Acme"
+    assert client.get(f"/api/drafts/{ticket['id']}").json()["memory_write"]["job_id"] == memory_write["job_id"]
+    assert client.get(f"/api/tickets/{ticket['id']}").json()["status"] == "resolved"
+
+
+class PagingCopilot:
+    def list_customer_memories(self, customer_email, customer_company=None, limit=20, cursor=None):
+        scope_index, offset = cursor or (0, 0)
+        return {
+            "memories": [{"memory": f"fact {scope_index}.{offset}", "score": None, "metadata": {}}],
+            "next_cursor": None if scope_index else (1, 0),
+        }
+
+
+def test_customer_memories_paginate_with_a_cursor(client: TestClient) -> None:
+    ticket = _create_ticket(client, 0)
+    client.app.dependency_overrides[get_copilot_or_503] = PagingCopilot
+    url = f"/api/customers/{ticket['customer_id']}/memories"
+
+    first = client.get(url, params={"limit": 1}).json()
+    assert first["memories"][0]["memory"] == "fact 0.0"
+    second = client.get(url, params={"limit": 1, "cursor": first["next_cursor"]}).json()
+    assert second["memories"][0]["memory"] == "fact 1.0"
+    assert second["next_cursor"] is None
+    assert client.get(url, params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get(url, params={"limit": 0}).status_code == 422
+
+
+def test_traffic_capture_records_hashed_requests(tmp_path: Path) -> None:
+    settings = Settings(
+        workspace_dir=tmp_path,
+        data_dir=Path("data"),
+        db_path=Path("data/support.db"),
+        chroma_rag_dir=Path("data/chroma_rag"),
+        chroma_mem0_dir=Path("data/chroma_mem0"),
+        knowledge_base_dir=Path("knowledge_base"),
+        traffic_capture_enabled=True,
+        traffic_capture_salt="test-salt",
+        startup_warmup_enabled=False,
+    )
+    with TestClient(create_app(settings=settings)) as client:
+        ticket = _create_ticket(client, 0, description="Reach me at alex@acme.io please.")
+        client.get(f"/api/tickets/{ticket['id']}")
+        client.get("/health")
+
+    records = [json.loads(line) for line in settings.traffic_capture_file.read_text().splitlines()]
+    assert [(record["method"], record["path"]) for record in records] == [
+        ("POST", "/api/tickets"),
+        ("GET", f"/api/tickets/{ticket['id']}"),
+    ]
+    body = records[0]["body"]
+    assert body["customer_email"].endswith("@example.com") and "customer0" not in body["customer_email"]
+    assert "alex@acme.io" not in body["description"] and body["description"].startswith("Reach me at u")
+    assert records[0]["response"]["status"] == 200
+    assert records[0]["response"]["ids"] == {"id": ticket["id"], "customer_id": ticket["customer_id"]}
+
+
+def test_traffic_capture_requires_a_salt(tmp_path: Path) -> None:
+    settings = Settings(
+        workspace_dir=tmp_path,
+        data_dir=Path("data"),
+        traffic_capture_enabled=True,
+        startup_warmup_enabled=False,
+    )
+    with pytest.raises(ValueError, match="TRAFFIC_CAPTURE_SALT"):
+        create_app(settings=settings)
+    assert not settings.traffic_capture_file.exists()
+
+
+class FakeKnowledgeBase:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def search_many(self, queries: list[str], top_k=None, mmr=None, merge_adjacent=None) -> list[list[dict]]:
+        self.calls.append((queries, top_k, mmr, merge_adjacent))
+        return [[{"content": f"About {query}", "source": "kb.md", "distance": 0.1}] for query in queries]
+
+
+def test_knowledge_search_batches_queries(client: TestClient) -> None:
+    knowledge_base = FakeKnowledgeBase()
+    client.app.dependency_overrides[get_knowledge_base_or_503] = lambda: knowledge_base
+
+    response = client.post("/api/knowledge/search", json={"queries": ["ATM refund", "KYC"], "top_k": 3, "mmr": True})
+
+    assert response.status_code == 200
+    assert [result["query"] for result in response.json()["results"]] == ["ATM refund", "KYC"]
+    assert response.json()["results"][1]["hits"][0]["content"] == "About KYC"
+    assert knowledge_base.calls == [(["ATM refund", "KYC"], 3, True, None)]
+    assert client.post("/api/knowledge/search", json={"queries": []}).status_code == 422
+    assert client.post("/api/knowledge/search", json={"queries": [""]}).status_code == 422
+
+
+def test_batch_generate_queues_one_job_for_matching_tickets(client: TestClient) -> None:
+    created = [_create_ticket(client, index) for index in range(5)]
+
+    assert client.post("/api/drafts/batch-generate", json={}).status_code == 422
+    assert client.post("/api/drafts/batch-generate", json={"ticket_ids": [999]}).status_code == 404
+
+    response = client.post("/api/drafts/batch-generate", json={"status": "open", "limit": 4})
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "queued"
+    assert body["progress"] == {"total": 4, "processed": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+
+    job = client.get(f"/api/jobs/{body['job_id']}").json()
+    assert job["kind"] == "draft_batch"
+    urgent = [ticket["id"] for ticket in created if ticket["priority"] == "urgent"]
+    assert job["payload"]["ticket_ids"] == [*urgent, created[1]["id"], created[2]["id"]]
+
+    by_id = client.post("/api/drafts/batch-generate", json={"ticket_ids": [created[4]["id"], 999]})
+    assert by_id.json()["progress"]["total"] == 1